@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Fill in latitude/longitude for listings that only have a `location` string.
+
+Coordinates come from a local lookup table (data/geocodes.csv by default), so
+no geocoding service is called. A listing's location is split on commas and
+each part is tried in turn, most specific first: "Bellagio, Lake Como, Italy"
+tries "Bellagio", then "Lake Como", then "Italy". Matching is accent- and
+case-insensitive.
+
+Usage:
+    python geocode_backfill.py [--table data/geocodes.csv] [--overwrite] [--dry-run]
+"""
+
+import argparse
+import asyncio
+import csv
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+from pymongo import UpdateOne
+
+from server import clear_property_caches, client, collection_versions, db, geo_point, location_tokens
+
+DEFAULT_TABLE = Path(__file__).parent / "data" / "geocodes.csv"
+
+
+def place_key(text: str) -> str:
+    return " ".join(location_tokens(text))
+
+
+def load_table(path: Path) -> dict:
+    with open(path, newline="", encoding="utf-8") as f:
+        return {place_key(row["place"]): (float(row["latitude"]), float(row["longitude"])) for row in csv.DictReader(f)}
+
+
+def geocode(location: str, table: dict):
+    for part in location.split(","):
+        coordinates = table.get(place_key(part))
+        if coordinates:
+            return coordinates
+    return table.get(place_key(location))
+
+
+async def backfill(table: dict, overwrite: bool, dry_run: bool, batch_size: int = 500) -> dict:
+    query = {} if overwrite else {"$or": [{"latitude": None}, {"longitude": None}]}
+    stats = {"matched": 0, "unmatched": 0}
+    unmatched = set()
+    batch = []
+    async for doc in db.properties.find(query, {"_id": 1, "location": 1}):
+        coordinates = geocode(doc.get("location", ""), table)
+        if coordinates is None:
+            stats["unmatched"] += 1
+            unmatched.add(doc.get("location", ""))
+            continue
+        stats["matched"] += 1
+        latitude, longitude = coordinates
+        # A new version and updated_at change the listing's ETag and let the similarity index and change feed see it
+        batch.append(UpdateOne({"_id": doc["_id"]}, {
+            "$set": {
+                "latitude": latitude,
+                "longitude": longitude,
+                "geo": geo_point(latitude, longitude),
+                "updated_at": datetime.now(timezone.utc),
+            },
+            "$inc": {"version": 1},
+        }))
+        if len(batch) >= batch_size and not dry_run:
+            await db.properties.bulk_write(batch, ordered=False)
+            batch = []
+    if batch and not dry_run:
+        await db.properties.bulk_write(batch, ordered=False)
+    if stats["matched"] and not dry_run:
+        # Changes the list ETags too; running servers drop their caches when they next read the version
+        await collection_versions.bump("properties")
+        clear_property_caches()
+    stats["unmatched_locations"] = sorted(unmatched)
+    return stats
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--table", type=Path, default=DEFAULT_TABLE, help="CSV with place,latitude,longitude columns")
+    parser.add_argument("--overwrite", action="store_true", help="also re-geocode listings that already have coordinates")
+    parser.add_argument("--dry-run", action="store_true", help="report matches without writing")
+    args = parser.parse_args()
+
+    stats = asyncio.run(backfill(load_table(args.table), args.overwrite, args.dry_run))
+    action = "Would geocode" if args.dry_run else "Geocoded"
+    print(f"{action} {stats['matched']} listing(s); {stats['unmatched']} had no match in {args.table}")
+    for location in stats["unmatched_locations"]:
+        print(f"  no match: {location}")
+    client.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
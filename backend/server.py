@@ -1,32 +1,179 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Query
+from fastapi import FastAPI, APIRouter, HTTPException, Query, Header, Request, Response, File, UploadFile
+from fastapi.responses import FileResponse, ORJSONResponse, PlainTextResponse, StreamingResponse
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, GEOSPHERE, IndexModel, InsertOne, ReturnDocument, UpdateOne, monitoring
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure, PyMongoError
 import os
 import logging
 import asyncio
+import base64
+import bisect
+import codecs
+import csv
+import email.utils
+import hashlib
+import html
+import io
+import json
+import math
+import random
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from pydantic import BaseModel, Field, ConfigDict, EmailStr
-from typing import List, Optional
+from pydantic import BaseModel, Field, ConfigDict, EmailStr, ValidationError
+from typing import Dict, List, Optional, Union
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+import numpy as np
+import orjson
 import resend
+from PIL import Image, ImageOps, UnidentifiedImageError
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# MongoDB connection pool, sized per worker process
+MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', '100'))
+MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', '0'))
+MONGO_MAX_IDLE_MS = int(os.environ.get('MONGO_MAX_IDLE_MS', '0')) or None  # 0 keeps idle connections open
+MONGO_CONNECT_TIMEOUT_MS = int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', '10000'))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', '10000'))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS', '0')) or None  # 0 waits forever
+MONGO_COMPRESSORS = os.environ.get('MONGO_COMPRESSORS', '')  # e.g. "zstd,snappy,zlib"
+# Connections opened at startup so the first requests don't pay for the handshake
+MONGO_WARMUP_CONNECTIONS = int(os.environ.get('MONGO_WARMUP_CONNECTIONS', str(max(MONGO_MIN_POOL_SIZE, 4))))
 
 # Resend configuration
 resend.api_key = os.environ.get('RESEND_API_KEY', '')
 SENDER_EMAIL = os.environ.get('SENDER_EMAIL', 'onboarding@resend.dev')
 NOTIFICATION_EMAIL = os.environ.get('NOTIFICATION_EMAIL', '')
+# "resend" delivers through Resend when configured, "log" only logs (local development)
+EMAIL_SENDER = os.environ.get('EMAIL_SENDER', 'resend')
+
+# Bulk import
+IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', '500'))
+IMPORT_MAX_ERRORS = 1000  # per-row errors reported back; the rest are only counted
+IMPORT_MAX_LINE = 1024 * 1024
+
+# Admin bulk endpoints: ids accepted per request
+BULK_MAX_IDS = int(os.environ.get('BULK_MAX_IDS', '1000'))
+
+# Listings resolved per /properties/batch request
+PROPERTY_BATCH_MAX_IDS = int(os.environ.get('PROPERTY_BATCH_MAX_IDS', '500'))
+
+# Synthetic data for load testing: rows per insert_many, batches in flight, and the per-request cap of /seed/synthetic
+SYNTHETIC_BATCH_SIZE = int(os.environ.get('SYNTHETIC_BATCH_SIZE', '1000'))
+SYNTHETIC_CONCURRENCY = int(os.environ.get('SYNTHETIC_CONCURRENCY', '4'))
+SYNTHETIC_MAX_ROWS = int(os.environ.get('SYNTHETIC_MAX_ROWS', '1000000'))
+
+# Uploaded listing images and their resized variants
+MEDIA_ROOT = Path(os.environ.get('MEDIA_ROOT', str(ROOT_DIR / 'media')))
+MEDIA_URL = os.environ.get('MEDIA_URL', '/api/media')  # point at a CDN in front of /api/media if there is one
+IMAGE_MAX_BYTES = int(os.environ.get('IMAGE_MAX_BYTES', str(20 * 1024 * 1024)))
+IMAGE_WORKERS = int(os.environ.get('IMAGE_WORKERS', str(os.cpu_count() or 2)))
+
+# Radius applied to `near` searches that don't pass one
+NEAR_DEFAULT_RADIUS_KM = float(os.environ.get('NEAR_DEFAULT_RADIUS_KM', '50'))
+
+# Similar listings: `features` vocabulary kept in the in-memory matrix (rarer ones are ignored)
+SIMILAR_MAX_FEATURES = int(os.environ.get('SIMILAR_MAX_FEATURES', '512'))
+
+# Server-sent change feed (/api/changes)
+CHANGE_FEED_POLL_INTERVAL = float(os.environ.get('CHANGE_FEED_POLL_INTERVAL', '2'))  # standalone mongod only
+CHANGE_FEED_HISTORY = int(os.environ.get('CHANGE_FEED_HISTORY', '1000'))  # events kept for Last-Event-ID replay
+CHANGE_FEED_QUEUE = int(os.environ.get('CHANGE_FEED_QUEUE', '500'))  # per-client backlog before it is reset
+CHANGE_FEED_HEARTBEAT = float(os.environ.get('CHANGE_FEED_HEARTBEAT', '15'))
+CHANGE_FEED_MAX_AGE = float(os.environ.get('CHANGE_FEED_MAX_AGE', '300'))  # streams are closed and resumed after this
+CHANGE_FEED_IDLE_GRACE = float(os.environ.get('CHANGE_FEED_IDLE_GRACE', '30'))  # covers EventSource reconnects
+# Delete tombstones only need to outlive the longest client reconnect
+DELETION_TTL = int(os.environ.get('DELETION_TTL', str(24 * 3600)))
+
+# Streaming export
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', '500'))
+
+# Inquiry abuse protection. Limits are "<burst>/<seconds>": that many at once, refilled evenly over the period
+INQUIRY_LIMIT_PER_IP = os.environ.get('INQUIRY_LIMIT_PER_IP', '5/300')
+INQUIRY_LIMIT_PER_EMAIL = os.environ.get('INQUIRY_LIMIT_PER_EMAIL', '3/3600')
+# "memory" keeps rate limits and idempotency keys per process, "mongo" also shares them between workers
+RATE_LIMIT_STORE = os.environ.get('RATE_LIMIT_STORE', 'memory')
+RATE_LIMIT_MAX_KEYS = int(os.environ.get('RATE_LIMIT_MAX_KEYS', '100000'))
+# Reverse proxies in front of the app that append to X-Forwarded-For. The default of 0 uses the
+# socket peer; deployments behind proxies must set it, but never higher than the real number of
+# hops, or clients can pick their own rate limit bucket by sending the header themselves
+PROXY_HOPS = int(os.environ.get('PROXY_HOPS', '0'))
+IDEMPOTENCY_TTL = float(os.environ.get('IDEMPOTENCY_TTL', str(24 * 3600)))
+IDEMPOTENCY_CACHE_SIZE = int(os.environ.get('IDEMPOTENCY_CACHE_SIZE', '10000'))
+
+# Email outbox worker
+OUTBOX_BATCH_SIZE = int(os.environ.get('OUTBOX_BATCH_SIZE', '20'))  # Resend accepts up to 100
+OUTBOX_CONCURRENCY = int(os.environ.get('OUTBOX_CONCURRENCY', '2'))
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get('OUTBOX_MAX_ATTEMPTS', '8'))
+OUTBOX_POLL_INTERVAL = float(os.environ.get('OUTBOX_POLL_INTERVAL', '5'))
+
+# Run explain() on the canonical queries at startup and refuse to boot on a COLLSCAN
+VERIFY_QUERY_PLANS = os.environ.get('VERIFY_QUERY_PLANS', '').lower() in ('1', 'true', 'yes')
+
+# Property read cache sizing
+PROPERTY_CACHE_SIZE = int(os.environ.get('PROPERTY_CACHE_SIZE', '1024'))
+PROPERTY_CACHE_TTL = float(os.environ.get('PROPERTY_CACHE_TTL', '300'))
+
+# How long a process trusts its copy of a collection version before re-reading it
+COLLECTION_VERSION_TTL = float(os.environ.get('COLLECTION_VERSION_TTL', '1'))
+
+# Request/Mongo instrumentation served on /metrics; when off nothing is hooked in
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '').lower() in ('1', 'true', 'yes')
+# Mongo commands slower than this are logged with the shape of their filter
+MONGO_SLOW_MS = float(os.environ.get('MONGO_SLOW_MS', '100'))
+
+# ==================== LIFESPAN ====================
+
+async def warm_up_pool():
+    """Open MONGO_WARMUP_CONNECTIONS connections with concurrent pings."""
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(client.admin.command("ping") for _ in range(MONGO_WARMUP_CONNECTIONS)))
+    except Exception as e:
+        logger.warning(f"MongoDB warm-up failed: {str(e)}")
+        return
+    logger.info(f"MongoDB pool warmed with {MONGO_WARMUP_CONNECTIONS} connection(s) in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global client, client_pid, db
+    if client_pid != os.getpid():
+        # Forked after import: never share the parent's client
+        client = create_mongo_client()
+        client_pid = os.getpid()
+        db = client[os.environ['DB_NAME']]
+    await warm_up_pool()
+    await ensure_indexes()
+    await migrate_created_at()
+    await backfill_location_keys()
+    await backfill_inquiry_keys()
+    await backfill_versions()
+    await backfill_updated_at()
+    await similar_index.sync()
+    if VERIFY_QUERY_PLANS:
+        await verify_query_plans()
+    await detect_transactions()
+    if mail_sender:
+        outbox_worker.start()
+    app.state.ready = True
+    yield
+    app.state.ready = False
+    await change_feed.stop()
+    await outbox_worker.stop()
+    client.close()
 
 # Create the main app
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -38,6 +185,289 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# ==================== METRICS ====================
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+def label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", " ").replace('"', '\\"')
+
+def format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{label_value(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Counter:
+    """Monotonic counter per label set, rendered in Prometheus text format."""
+
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = list(self._values.items())
+        lines.extend(f"{self.name}{format_labels(self.labels, key)} {value}" for key, value in values)
+        return lines
+
+class Histogram:
+    """Bucketed observations per label set, rendered as a Prometheus histogram.
+
+    observe() is called from Motor's worker threads by the command listener,
+    so updates take a lock; each one is a bisect and three additions.
+    """
+
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}  # label values -> [per-bucket counts (last is +Inf), sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [(key, list(counts), total, count) for key, (counts, total, count) in self._series.items()]
+        for key, counts, total, count in snapshot:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += bucket_count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{format_labels(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(self.labels, key)} {total}")
+            lines.append(f"{self.name}_count{format_labels(self.labels, key)} {count}")
+        return lines
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route", "status"))
+http_response_size = Histogram(
+    "http_response_size_bytes", "HTTP response body size by route template.", ("method", "route"), SIZE_BUCKETS)
+mongo_command_duration = Histogram(
+    "mongo_command_duration_seconds", "MongoDB command latency by collection and command.", ("collection", "command"))
+mongo_command_failures = Counter(
+    "mongo_command_failures_total", "MongoDB commands that returned an error.", ("collection", "command"))
+mongo_slow_commands = Counter(
+    "mongo_slow_commands_total", f"MongoDB commands slower than MONGO_SLOW_MS ({MONGO_SLOW_MS:g} ms).", ("collection", "command"))
+email_enqueue_duration = Histogram(
+    "email_enqueue_duration_seconds", "Time create_inquiry spends storing the inquiry and queueing its notification.")
+email_send_duration = Histogram(
+    "email_send_duration_seconds", "Mail provider call duration per outbox batch.", ("outcome",))
+rate_limit_rejections = Counter(
+    "rate_limit_rejections_total", "Requests refused by a rate limit.", ("limit",))
+
+METRICS = [
+    http_request_duration, http_response_size, mongo_command_duration, mongo_command_failures,
+    mongo_slow_commands, email_enqueue_duration, email_send_duration, rate_limit_rejections,
+]
+
+# Where each command keeps its filter, for the slow query log
+COMMAND_FILTERS = {
+    "find": lambda cmd: cmd.get("filter"),
+    "count": lambda cmd: cmd.get("query"),
+    "distinct": lambda cmd: cmd.get("query"),
+    "findAndModify": lambda cmd: cmd.get("query"),
+    "update": lambda cmd: cmd["updates"][0].get("q") if cmd.get("updates") else None,
+    "delete": lambda cmd: cmd["deletes"][0].get("q") if cmd.get("deletes") else None,
+    "aggregate": lambda cmd: [next(iter(stage)) for stage in cmd.get("pipeline", [])],
+}
+
+def query_shape(value):
+    """Replace literal values with '?', keeping field names and operators."""
+    if isinstance(value, dict):
+        return {key: query_shape(item) for key, item in value.items()}
+    if isinstance(value, list) and value and all(isinstance(item, (dict, list)) for item in value):
+        return [query_shape(item) for item in value]
+    if isinstance(value, list) and value and all(isinstance(item, str) and item.startswith("$") for item in value):
+        return value  # aggregate stage names
+    return "?"
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Times every Mongo command by collection and command name, logging slow ones."""
+
+    def __init__(self):
+        self._pending = {}
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        self._pending[(event.connection_id, event.request_id)] = (
+            collection if isinstance(collection, str) else "-",
+            event.command,
+        )
+
+    def succeeded(self, event):
+        self._finish(event, failed=False)
+
+    def failed(self, event):
+        self._finish(event, failed=True)
+
+    def _finish(self, event, failed: bool):
+        collection, command = self._pending.pop((event.connection_id, event.request_id), ("-", None))
+        seconds = event.duration_micros / 1e6
+        mongo_command_duration.observe(seconds, collection, event.command_name)
+        if failed:
+            mongo_command_failures.inc(collection, event.command_name)
+        if seconds * 1000 >= MONGO_SLOW_MS:
+            mongo_slow_commands.inc(collection, event.command_name)
+            get_filter = COMMAND_FILTERS.get(event.command_name)
+            shape = query_shape(get_filter(command)) if get_filter and command is not None else None
+            logger.warning(f"Slow Mongo {event.command_name} on {collection} took {seconds * 1000:.1f} ms, filter shape: {shape}")
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, status and body size per route template.
+
+    Routes are labelled with their path template (/api/properties/{property_id}),
+    not the raw URL, to keep the number of series bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._routes = None
+
+    def route_label(self, scope) -> str:
+        if self._routes is None:
+            self._routes = {getattr(route, "endpoint", None): route.path for route in app.routes}
+        return self._routes.get(scope.get("endpoint"), "unmatched")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_with_metrics(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            route = self.route_label(scope)
+            http_request_duration.observe(time.perf_counter() - start, scope["method"], route, status)
+            http_response_size.observe(size, scope["method"], route)
+
+def render_metrics() -> str:
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    caches = {"properties": property_cache, "listings": listing_cache, "facets": facet_cache}
+    for field in ("hits", "misses", "evictions"):
+        lines.append(f"# TYPE cache_{field}_total counter")
+        lines.extend(f'cache_{field}_total{{cache="{name}"}} {getattr(cache, field)}' for name, cache in caches.items())
+    lines.append("# TYPE cache_entries gauge")
+    lines.extend(f'cache_entries{{cache="{name}"}} {len(cache._data)}' for name, cache in caches.items())
+    lines.append("# TYPE similar_index_rows gauge")
+    lines.append(f"similar_index_rows {len(similar_index)}")
+    return "\n".join(lines) + "\n"
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """Connection counts per server, reported by /healthz and /readyz."""
+
+    def __init__(self):
+        self._servers = {}
+        self._lock = threading.Lock()
+
+    def _bump(self, address, field: str, amount: int = 1):
+        key = f"{address[0]}:{address[1]}"
+        with self._lock:
+            server = self._servers.setdefault(key, {"open": 0, "in_use": 0, "checkout_failures": 0})
+            server[field] += amount
+
+    def connection_created(self, event):
+        self._bump(event.address, "open")
+
+    def connection_closed(self, event):
+        self._bump(event.address, "open", -1)
+
+    def connection_checked_out(self, event):
+        self._bump(event.address, "in_use")
+
+    def connection_checked_in(self, event):
+        self._bump(event.address, "in_use", -1)
+
+    def connection_check_out_failed(self, event):
+        self._bump(event.address, "checkout_failures")
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        with self._lock:
+            self._servers.pop(f"{event.address[0]}:{event.address[1]}", None)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            servers = {address: dict(counts) for address, counts in self._servers.items()}
+        return {"max_pool_size": MONGO_MAX_POOL_SIZE, "min_pool_size": MONGO_MIN_POOL_SIZE, "servers": servers}
+
+# MongoDB connection
+mongo_url = os.environ['MONGO_URL']
+
+def create_mongo_client() -> AsyncIOMotorClient:
+    """Build a client without connecting; sockets and monitor threads start on first use.
+
+    Nothing is opened at import time, so a server that forks workers after
+    importing the app (gunicorn --preload) hands each child a clean client.
+    """
+    global pool_stats
+    pool_stats = PoolStats()
+    listeners = [pool_stats]
+    if METRICS_ENABLED:
+        listeners.append(MongoCommandMetrics())
+    options = {
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": MONGO_MAX_IDLE_MS,
+        "connectTimeoutMS": MONGO_CONNECT_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "waitQueueTimeoutMS": MONGO_WAIT_QUEUE_TIMEOUT_MS,
+    }
+    if MONGO_COMPRESSORS:
+        options["compressors"] = MONGO_COMPRESSORS
+    return AsyncIOMotorClient(mongo_url, tz_aware=True, connect=False, event_listeners=listeners, **options)
+
+client = create_mongo_client()
+client_pid = os.getpid()
+db = client[os.environ['DB_NAME']]
+
 # ==================== MODELS ====================
 
 class PropertyBase(BaseModel):
@@ -52,6 +482,9 @@ class PropertyBase(BaseModel):
     features: List[str] = []
     images: List[str] = []
     featured: bool = False
+    external_id: Optional[str] = None  # listing id in a brokerage feed, used to upsert imports
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
 
 class PropertyCreate(PropertyBase):
     pass
@@ -68,11 +501,47 @@ class PropertyUpdate(BaseModel):
     features: Optional[List[str]] = None
     images: Optional[List[str]] = None
     featured: Optional[bool] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
+
+class ImageVariant(BaseModel):
+    width: int
+    height: int
+    webp: str
+    jpeg: str
+
+class ListingImage(BaseModel):
+    """Resized renditions of an uploaded image; `src` is its entry in `images`."""
+    src: str
+    width: int
+    height: int
+    variants: Dict[str, ImageVariant] = {}  # keyed by IMAGE_VARIANTS name
 
 class Property(PropertyBase):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    version: int = 1  # bumped on every update, checked against If-Match
+    image_variants: List[ListingImage] = []  # only uploaded images have an entry
+
+class PropertySummary(BaseModel):
+    """Card-sized listing: no description or features, and only the cover image."""
+    model_config = ConfigDict(extra="ignore")
+    id: str
+    title: str
+    location: str
+    price: int
+    property_type: str
+    bedrooms: int
+    bathrooms: int
+    area: int
+    images: List[str] = []
+    image_variants: List[ListingImage] = []  # grid-sized variants only
+    featured: bool = False
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    created_at: datetime
 
 class InquiryCreate(BaseModel):
     property_id: Optional[str] = None
@@ -87,21 +556,799 @@ class Inquiry(InquiryCreate):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+class BulkIds(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=BULK_MAX_IDS)
+
+class PropertyBulkUpdate(BulkIds):
+    """One change applied to every listing in `ids`.
+
+    The price is either set outright, scaled by `price_percent` (-5 is a 5% cut)
+    or moved by `price_delta`; at most one of the three may be given.
+    """
+    featured: Optional[bool] = None
+    property_type: Optional[str] = None
+    price: Optional[int] = Field(None, gt=0)
+    price_percent: Optional[float] = Field(None, gt=-100, le=1000)
+    price_delta: Optional[int] = None
+
+class InquiryBulkDelete(BaseModel):
+    """Inquiries to delete by id, by created_at window, or both."""
+    ids: Optional[List[str]] = Field(None, min_length=1, max_length=BULK_MAX_IDS)
+    since: Optional[datetime] = None  # inclusive
+    until: Optional[datetime] = None  # exclusive
+
+class PropertyBatchRequest(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=PROPERTY_BATCH_MAX_IDS)
+    view: str = Field("full", pattern="^(full|summary)$")
+
+class SyntheticDataRequest(BaseModel):
+    properties: int = Field(1000, ge=0, le=SYNTHETIC_MAX_ROWS)
+    inquiries: int = Field(0, ge=0, le=SYNTHETIC_MAX_ROWS)
+    seed: Optional[int] = Field(None, ge=0)  # same seed, same listings and inquiries (ids and timestamps aside)
+
+# ==================== LOCATION SEARCH ====================
+
+def location_tokens(text: str) -> List[str]:
+    """Normalize a location into lowercase, accent-free word tokens.
+
+    "Villa Serenità, Lake Como" -> ["villa", "serenita", "lake", "como"]
+    """
+    folded = unicodedata.normalize("NFKD", text or "").encode("ascii", "ignore").decode().lower()
+    tokens = []
+    for token in re.split(r"[^a-z0-9]+", folded):
+        if token and token not in tokens:
+            tokens.append(token)
+    return tokens
+
+def location_filter(location: str) -> Optional[dict]:
+    """Every search token must prefix-match one of the stored location keys.
+
+    Anchored, escaped prefix regexes on a lowercase field become index range
+    scans on `location_keys`, and user input can never be run as a pattern.
+    """
+    tokens = location_tokens(location)
+    if not tokens:
+        return None
+    clauses = [{"location_keys": {"$regex": "^" + re.escape(token)}} for token in tokens]
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+# ==================== INQUIRY SEARCH ====================
+
+# Too common in inquiries to narrow a search, so they are left out of search_keys
+SEARCH_STOPWORDS = frozenset(
+    "a an and are at be but by can do for from have i if in is it me my of on or our so that the this to "
+    "we with would you your".split()
+)
+INQUIRY_SEARCH_MAX_KEYS = 200
+
+def search_tokens(text: str) -> List[str]:
+    """Word tokens worth indexing: location_tokens() minus single characters and stopwords."""
+    return [token for token in location_tokens(text) if len(token) > 1 and token not in SEARCH_STOPWORDS]
+
+def inquiry_keys(doc: dict) -> dict:
+    """Lookup fields stored alongside an inquiry for the admin inbox filters."""
+    return {
+        "email_key": (doc.get("email") or "").strip().lower(),
+        "search_keys": search_tokens(f"{doc.get('name') or ''} {doc.get('message') or ''}")[:INQUIRY_SEARCH_MAX_KEYS],
+    }
+
+def build_inquiry_query(
+    property_id: Optional[str] = None,
+    email: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    q: Optional[str] = None,
+) -> dict:
+    """Inbox filter. Every search word must appear in the name or message.
+
+    Each shape has an index ending in (created_at, id), so results come back
+    newest first straight off the index and keyset pages stay cheap.
+    """
+    query = {}
+    if property_id:
+        query["property_id"] = property_id
+    if email:
+        query["email_key"] = email.strip().lower()
+    if since or until:
+        query["created_at"] = {}
+        if since:
+            query["created_at"]["$gte"] = since
+        if until:
+            query["created_at"]["$lt"] = until
+    tokens = search_tokens(q)
+    if tokens:
+        query["search_keys"] = tokens[0] if len(tokens) == 1 else {"$all": tokens}
+    return query
+
+# ==================== GEO SEARCH ====================
+
+EARTH_RADIUS_KM = 6378.1
+MAX_RADIUS_KM = 20000  # half the circumference; anything larger is the whole planet
+# Rows read past a sort=distance page so listings tied on distance can be ordered by id
+DISTANCE_TIE_WINDOW = 16
+
+def geo_point(latitude: Optional[float], longitude: Optional[float]) -> Optional[dict]:
+    """GeoJSON point stored in `geo` for the 2dsphere index; None without coordinates."""
+    if latitude is None or longitude is None:
+        return None
+    return {"type": "Point", "coordinates": [longitude, latitude]}
+
+def parse_near(near: Optional[str]) -> Optional[tuple]:
+    """Parse a `near` parameter of the form "lat,lng"."""
+    if near is None:
+        return None
+    try:
+        latitude, longitude = (float(part) for part in near.split(","))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="near must be 'latitude,longitude'")
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise HTTPException(status_code=400, detail="near is out of range")
+    return latitude, longitude
+
+def parse_bbox(bbox: Optional[str]) -> Optional[tuple]:
+    """Parse a `bbox` parameter in GeoJSON order: "west,south,east,north"."""
+    if bbox is None:
+        return None
+    try:
+        west, south, east, north = (float(part) for part in bbox.split(","))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="bbox must be 'west,south,east,north'")
+    if not (-180 <= west < east <= 180 and -90 <= south < north <= 90):
+        raise HTTPException(status_code=400, detail="bbox is out of range or crosses the antimeridian")
+    # Polygon edges are great-circle arcs, which run the short way round from 180 degrees of longitude on
+    if east - west >= 180:
+        raise HTTPException(status_code=400, detail="bbox must span less than 180 degrees of longitude")
+    return west, south, east, north
+
+def geo_filter(near: Optional[tuple], radius: Optional[float], bbox: Optional[tuple]) -> Optional[dict]:
+    """$geoWithin clauses for a radius around `near` and/or a bounding box."""
+    clauses = []
+    if near:
+        latitude, longitude = near
+        clauses.append({"geo": {"$geoWithin": {"$centerSphere": [[longitude, latitude], radius / EARTH_RADIUS_KM]}}})
+    if bbox:
+        west, south, east, north = bbox
+        ring = [[west, south], [east, south], [east, north], [west, north], [west, south]]
+        clauses.append({"geo": {"$geoWithin": {"$geometry": {"type": "Polygon", "coordinates": [ring]}}}})
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+def distance_km(a: tuple, b: tuple) -> float:
+    """Great-circle distance between two (lat, lng) pairs."""
+    lat1, lng1, lat2, lng2 = map(math.radians, (*a, *b))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(h)))
+
+def unit_vector(latitude: float, longitude: float) -> tuple:
+    lat, lng = math.radians(latitude), math.radians(longitude)
+    return math.cos(lat) * math.cos(lng), math.cos(lat) * math.sin(lng), math.sin(lat)
+
+def in_bbox(latitude: float, longitude: float, bbox: tuple) -> bool:
+    """Whether a point is inside the bbox polygon as Mongo reads it.
+
+    GeoJSON polygon edges are great-circle arcs, not parallels, so the top and
+    bottom edges bulge towards the poles: (61, 0) is inside (-60, 0, 60, 60).
+    With less than 180 degrees of longitude the polygon is convex, so a point
+    is inside when it lies left of every edge of the counter-clockwise ring.
+    """
+    west, south, east, north = bbox
+    ring = [unit_vector(lat, lng) for lng, lat in ((west, south), (east, south), (east, north), (west, north))]
+    x, y, z = unit_vector(latitude, longitude)
+    for (ax, ay, az), (bx, by, bz) in zip(ring, ring[1:] + ring[:1]):
+        # (a x b) . p, with a small tolerance so points on an edge count as inside
+        if (ay * bz - az * by) * x + (az * bx - ax * bz) * y + (ax * by - ay * bx) * z < -1e-12:
+            return False
+    return True
+
+def geo_matches(prop: dict, near: Optional[tuple], radius: Optional[float], bbox: Optional[tuple]) -> bool:
+    """In-process twin of geo_filter() for cache invalidation."""
+    if not near and not bbox:
+        return True
+    latitude, longitude = prop.get("latitude"), prop.get("longitude")
+    if latitude is None or longitude is None:
+        return False
+    if near and distance_km(near, (latitude, longitude)) > radius:
+        return False
+    if bbox:
+        return in_bbox(latitude, longitude, bbox)
+    return True
+
+# ==================== INDEXES ====================
+
+# Each compound index ends in `id` so keyset pagination can walk it without a sort stage
+# Covers the conditional-GET lookup of a listing's version and updated_at
+PROPERTY_VALIDATOR_INDEX = [("id", ASCENDING), ("version", ASCENDING), ("updated_at", ASCENDING)]
+
+PROPERTY_INDEXES = [
+    IndexModel([("id", ASCENDING)], unique=True),
+    IndexModel(PROPERTY_VALIDATOR_INDEX),
+    # Catch-up reads of the similarity index and the polling change feed
+    IndexModel([("updated_at", ASCENDING)]),
+    IndexModel([("created_at", DESCENDING), ("id", DESCENDING)]),
+    IndexModel([("price", ASCENDING), ("id", ASCENDING)]),
+    IndexModel([("area", ASCENDING), ("id", ASCENDING)]),
+    IndexModel([("featured", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)]),
+    IndexModel([("property_type", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)]),
+    IndexModel([("property_type", ASCENDING), ("price", ASCENDING), ("id", ASCENDING)]),
+    IndexModel([("location_keys", ASCENDING)]),
+    # Listings without coordinates have no `geo` and are left out of the index
+    IndexModel([("geo", GEOSPHERE), ("property_type", ASCENDING), ("price", ASCENDING)]),
+    IndexModel([("external_id", ASCENDING)], unique=True,
+               partialFilterExpression={"external_id": {"$type": "string"}}),
+]
+
+INQUIRY_INDEXES = [
+    IndexModel([("id", ASCENDING)], unique=True),
+    IndexModel([("created_at", DESCENDING), ("id", DESCENDING)]),
+    IndexModel([("property_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)]),
+    IndexModel([("email_key", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)]),
+    IndexModel([("search_keys", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)]),
+    # Only inquiries still waiting for their outbox record carry the field
+    IndexModel([("notification_pending", ASCENDING)], sparse=True),
+]
+
+DELETION_INDEXES = [
+    IndexModel([("deleted_at", ASCENDING)], expireAfterSeconds=DELETION_TTL),
+]
+
+# Shared rate limit buckets and idempotency keys (RATE_LIMIT_STORE=mongo)
+EXPIRING_INDEXES = [
+    IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+]
+
+OUTBOX_INDEXES = [
+    IndexModel([("status", ASCENDING), ("next_attempt_at", ASCENDING)]),
+    IndexModel([("claim", ASCENDING)], sparse=True),
+    # Delivered notifications are kept for a week for troubleshooting
+    IndexModel([("sent_at", ASCENDING)], expireAfterSeconds=7 * 24 * 3600),
+]
+
+# (collection, filter, sort) for every query shape the API issues
+CANONICAL_QUERIES = [
+    ("properties", {"id": "00000000-0000-0000-0000-000000000000"}, None),
+    ("properties", {"id": {"$in": ["00000000-0000-0000-0000-000000000000", "00000000-0000-0000-0000-000000000001"]}}, None),
+    ("properties", {}, [("created_at", DESCENDING), ("id", DESCENDING)]),
+    ("properties", {}, [("price", ASCENDING), ("id", ASCENDING)]),
+    ("properties", {}, [("area", DESCENDING), ("id", DESCENDING)]),
+    ("properties", {"featured": True}, [("created_at", DESCENDING), ("id", DESCENDING)]),
+    ("properties", {"property_type": "villa"}, [("created_at", DESCENDING), ("id", DESCENDING)]),
+    ("properties", {"property_type": "villa"}, [("price", ASCENDING), ("id", ASCENDING)]),
+    ("properties", {"price": {"$gte": 10000000, "$lte": 40000000}}, [("price", ASCENDING), ("id", ASCENDING)]),
+    ("properties", {"bedrooms": {"$gte": 4}}, [("created_at", DESCENDING), ("id", DESCENDING)]),
+    ("properties", {"location_keys": {"$regex": "^como"}}, None),
+    ("properties", geo_filter((45.98, 9.26), 20, None), None),
+    ("properties", {"updated_at": {"$gt": datetime(2024, 1, 1, tzinfo=timezone.utc)}}, [("updated_at", ASCENDING)]),
+    ("inquiries", {"id": "00000000-0000-0000-0000-000000000000"}, None),
+    ("inquiries", {}, [("created_at", DESCENDING), ("id", DESCENDING)]),
+    ("inquiries", {"property_id": "00000000-0000-0000-0000-000000000000"}, [("created_at", DESCENDING), ("id", DESCENDING)]),
+    ("inquiries", {"email_key": "someone@example.com"}, [("created_at", DESCENDING), ("id", DESCENDING)]),
+    ("inquiries", {"search_keys": "viewing"}, [("created_at", DESCENDING), ("id", DESCENDING)]),
+    ("inquiries", {"search_keys": {"$all": ["private", "viewing"]}}, [("created_at", DESCENDING), ("id", DESCENDING)]),
+    ("inquiries", {"created_at": {"$gte": datetime(2024, 1, 1, tzinfo=timezone.utc)}},
+     [("created_at", DESCENDING), ("id", DESCENDING)]),
+]
+
+async def ensure_indexes():
+    """Create every index the API relies on. Existing indexes are left untouched."""
+    await db.properties.create_indexes(PROPERTY_INDEXES)
+    await db.inquiries.create_indexes(INQUIRY_INDEXES)
+    await db.outbox.create_indexes(OUTBOX_INDEXES)
+    await db.deletions.create_indexes(DELETION_INDEXES)
+    if RATE_LIMIT_STORE == "mongo":
+        await db.rate_limits.create_indexes(EXPIRING_INDEXES)
+        await db.idempotency_keys.create_indexes(EXPIRING_INDEXES)
+
+def plan_stages(plan):
+    """Yield every stage name in an explain() plan tree."""
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from plan_stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from plan_stages(item)
+
+async def verify_query_plans():
+    """Explain each canonical query and raise if any of them scans the whole collection."""
+    failures = []
+    for collection, query, sort in CANONICAL_QUERIES:
+        find_cursor = db[collection].find(query, {"_id": 0}).limit(24)
+        if sort:
+            find_cursor = find_cursor.sort(sort)
+        explained = await find_cursor.explain()
+        stages = set(plan_stages(explained.get("queryPlanner", {}).get("winningPlan", {})))
+        logger.info(f"Query plan for {collection} {query} sort={sort}: {sorted(stages)}")
+        if "COLLSCAN" in stages:
+            failures.append(f"{collection} {query} sort={sort}")
+    if failures:
+        raise RuntimeError("Queries fell back to COLLSCAN: " + "; ".join(failures))
+
+# ==================== SERIALIZATION ====================
+
+class FastJSONResponse(ORJSONResponse):
+    """Encode Mongo documents straight to JSON, skipping response_model validation.
+
+    Documents come out of Motor with native datetimes, so they are already in
+    their wire shape; UTC datetimes render with a trailing Z like pydantic's.
+    """
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+
+# ==================== PROJECTIONS ====================
+
+SUMMARY_FIELDS = [name for name in PropertySummary.model_fields if name not in ("images", "image_variants")]
+# Cards only ever render the small variants
+SUMMARY_VARIANT_FIELDS = {
+    "image_variants.src": 1,
+    "image_variants.width": 1,
+    "image_variants.height": 1,
+    "image_variants.variants.thumb": 1,
+    "image_variants.variants.card": 1,
+}
+
+# Projections for find(); aggregation pipelines need the $slice expression form
+FULL_PROJECTION = {"_id": 0, "location_keys": 0, "geo": 0}
+INQUIRY_PROJECTION = {"_id": 0, "email_key": 0, "search_keys": 0, "notification_pending": 0}
+SUMMARY_PROJECTION = {"_id": 0, **{name: 1 for name in SUMMARY_FIELDS}, **SUMMARY_VARIANT_FIELDS, "images": {"$slice": 1}}
+SUMMARY_PIPELINE_PROJECTION = {
+    "_id": 0, **{name: 1 for name in SUMMARY_FIELDS}, **SUMMARY_VARIANT_FIELDS, "_score": 1, "distance": 1,
+    "images": {"$slice": ["$images", 1]},
+}
+
+# ==================== MIGRATIONS ====================
+
+async def backfill_location_keys(batch_size: int = 500):
+    """Populate location_keys on listings written before location search existed."""
+    batch = []
+    async for doc in db.properties.find({"location_keys": {"$exists": False}}, {"_id": 1, "location": 1}):
+        batch.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"location_keys": location_tokens(doc.get("location", ""))}}))
+        if len(batch) >= batch_size:
+            await db.properties.bulk_write(batch, ordered=False)
+            batch = []
+    if batch:
+        await db.properties.bulk_write(batch, ordered=False)
+
+async def backfill_inquiry_keys(batch_size: int = 500):
+    """Populate email_key and search_keys on inquiries written before inbox search existed."""
+    batch = []
+    async for doc in db.inquiries.find({"search_keys": {"$exists": False}}, {"_id": 1, "name": 1, "email": 1, "message": 1}):
+        batch.append(UpdateOne({"_id": doc["_id"]}, {"$set": inquiry_keys(doc)}))
+        if len(batch) >= batch_size:
+            await db.inquiries.bulk_write(batch, ordered=False)
+            batch = []
+    if batch:
+        await db.inquiries.bulk_write(batch, ordered=False)
+
+async def backfill_versions():
+    """Give listings created before optimistic concurrency existed a starting version."""
+    await db.properties.update_many({"version": {"$exists": False}}, {"$set": {"version": 1}})
+
+async def backfill_updated_at():
+    """Listings written before updated_at existed were last modified when created."""
+    await db.properties.update_many({"updated_at": {"$exists": False}}, [{"$set": {"updated_at": "$created_at"}}])
+
+async def migrate_created_at(batch_size: int = 500):
+    """Convert ISO-8601 string created_at values to native BSON datetimes."""
+    for collection in (db.properties, db.inquiries):
+        batch = []
+        async for doc in collection.find({"created_at": {"$type": "string"}}, {"_id": 1, "created_at": 1}):
+            batch.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"created_at": datetime.fromisoformat(doc["created_at"])}}))
+            if len(batch) >= batch_size:
+                await collection.bulk_write(batch, ordered=False)
+                batch = []
+        if batch:
+            await collection.bulk_write(batch, ordered=False)
+
+# ==================== PAGINATION ====================
+
+PROPERTY_SORT_PATTERN = r"^(-?(price|created_at|area)|relevance|distance)$"
+
+def _cursor_default(value):
+    if isinstance(value, datetime):
+        return {"$date": value.isoformat()}
+    raise TypeError(f"Cannot encode {type(value).__name__} in a cursor")
+
+def _cursor_object_hook(obj: dict):
+    if obj.keys() == {"$date"}:
+        return datetime.fromisoformat(obj["$date"])
+    return obj
+
+def encode_cursor(sort_value, property_id: str) -> str:
+    """Build an opaque cursor from the last row's sort key and id."""
+    raw = json.dumps([sort_value, property_id], separators=(",", ":"), default=_cursor_default).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort_value, property_id = json.loads(raw, object_hook=_cursor_object_hook)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return sort_value, property_id
+
+def keyset_filter(sort_field: str, direction: int, cursor: str) -> dict:
+    """Match rows strictly after the cursor in (sort_field, id) order."""
+    sort_value, property_id = decode_cursor(cursor)
+    op = "$gt" if direction == 1 else "$lt"
+    return {"$or": [
+        {sort_field: {op: sort_value}},
+        {sort_field: sort_value, "id": {op: property_id}},
+    ]}
+
+# ==================== CACHE ====================
+
+class TTLCache:
+    """Bounded LRU cache whose entries also expire after a fixed TTL."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        entry = self._data.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._data[key]
+                self.evictions += 1
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key):
+        self._data.pop(key, None)
+
+    def items(self):
+        """Live (key, value) pairs, without touching recency or the counters."""
+        now = time.monotonic()
+        return [(key, entry[1]) for key, entry in self._data.items() if entry[0] >= now]
+
+    def discard_where(self, predicate):
+        for key in [k for k in self._data if predicate(k)]:
+            del self._data[key]
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+# Keyed on property id
+property_cache = TTLCache(PROPERTY_CACHE_SIZE, PROPERTY_CACHE_TTL)
+# Keyed on the normalized get_properties arguments, see listing_key()
+listing_cache = TTLCache(PROPERTY_CACHE_SIZE, PROPERTY_CACHE_TTL)
+# Keyed on the filter part of listing_key(); entries are patched in place on writes
+facet_cache = TTLCache(PROPERTY_CACHE_SIZE, PROPERTY_CACHE_TTL)
+# Keyed on the inquiries version, so a new or deleted inquiry invalidates it
+inquiry_summary_cache = TTLCache(64, PROPERTY_CACHE_TTL)
+
+# listing_key() starts with this many filter fields, followed by sort and paging
+LISTING_FILTERS = 9
+
+def listing_key(property_type, min_price, max_price, location, bedrooms, featured, near, radius, bbox,
+                sort, limit, cursor, view):
+    return (
+        property_type or None,
+        min_price,
+        max_price,
+        tuple(location_tokens(location)) or None,
+        bedrooms or None,
+        featured,
+        near,
+        radius if near else None,
+        bbox,
+        sort,
+        limit,
+        cursor,
+        view,
+    )
+
+def listing_matches(key, prop: dict) -> bool:
+    """Whether a property document satisfies the filters of a cached listing."""
+    property_type, min_price, max_price, location, bedrooms, featured, near, radius, bbox = key[:LISTING_FILTERS]
+    if property_type is not None and prop.get("property_type") != property_type:
+        return False
+    if min_price is not None and prop.get("price", 0) < min_price:
+        return False
+    if max_price is not None and prop.get("price", 0) > max_price:
+        return False
+    if bedrooms is not None and prop.get("bedrooms", 0) < bedrooms:
+        return False
+    if featured is not None and prop.get("featured") != featured:
+        return False
+    if not geo_matches(prop, near, radius, bbox):
+        return False
+    if location is not None:
+        keys = location_tokens(prop.get("location", ""))
+        return all(any(k.startswith(token) for k in keys) for token in location)
+    return True
+
+def invalidate_property(*docs):
+    """Drop cache entries that may contain any of the given property versions."""
+    for doc in docs:
+        if doc:
+            property_cache.pop(doc["id"])
+            listing_cache.discard_where(lambda key: listing_matches(key, doc))
+
+def property_changed(old: Optional[dict], new: Optional[dict]):
+    """Bring the caches and the similarity index up to date after a single-listing create, update or delete."""
+    invalidate_property(old, new)
+    if new:
+        similar_index.upsert(new)
+    elif old:
+        similar_index.remove(old["id"])
+    for key, counts in facet_cache.items():
+        if old and listing_matches(key, old):
+            apply_facet_delta(counts, old, -1)
+        if new and listing_matches(key, new):
+            apply_facet_delta(counts, new, 1)
+
+def clear_property_caches():
+    """Forget everything cached about listings, for writes that touch many at once."""
+    property_cache.clear()
+    listing_cache.clear()
+    facet_cache.clear()
+
+def properties_changed(changes: List[tuple]):
+    """property_changed() for many (old, new) pairs: the caches are dropped rather than patched row by row."""
+    clear_property_caches()
+    for old, new in changes:
+        if new:
+            similar_index.upsert(new)
+        elif old:
+            similar_index.remove(old["id"])
+
+# ==================== FACETS ====================
+
+# Lower bounds of the price histogram bands; the last band is open-ended
+PRICE_BAND_BOUNDARIES = [0, 5000000, 10000000, 20000000, 30000000, 40000000, 50000000]
+
+def price_band(price: int) -> int:
+    return PRICE_BAND_BOUNDARIES[max(0, bisect.bisect_right(PRICE_BAND_BOUNDARIES, price) - 1)]
+
+async def compute_facets(query: dict) -> dict:
+    """Count every facet of the matching listings in a single $facet aggregation."""
+    pipeline = [
+        {"$match": query},
+        {"$facet": {
+            "total": [{"$count": "count"}],
+            "property_type": [{"$group": {"_id": "$property_type", "count": {"$sum": 1}}}],
+            "bedrooms": [{"$group": {"_id": "$bedrooms", "count": {"$sum": 1}}}],
+            "price_band": [{"$bucket": {
+                "groupBy": "$price",
+                "boundaries": PRICE_BAND_BOUNDARIES,
+                "default": PRICE_BAND_BOUNDARIES[-1],
+                "output": {"count": {"$sum": 1}},
+            }}],
+        }},
+    ]
+    result = (await db.properties.aggregate(pipeline).to_list(1))[0]
+    return {
+        "total": result["total"][0]["count"] if result["total"] else 0,
+        "property_type": {row["_id"]: row["count"] for row in result["property_type"]},
+        "bedrooms": {row["_id"]: row["count"] for row in result["bedrooms"]},
+        "price_band": {row["_id"]: row["count"] for row in result["price_band"]},
+    }
+
+def apply_facet_delta(counts: dict, prop: dict, sign: int):
+    """Add (sign=1) or remove (sign=-1) one listing from cached facet counts."""
+    counts["total"] += sign
+    for facet, value in (
+        ("property_type", prop.get("property_type")),
+        ("bedrooms", prop.get("bedrooms")),
+        ("price_band", price_band(prop.get("price", 0))),
+    ):
+        counts[facet][value] = counts[facet].get(value, 0) + sign
+        if counts[facet][value] <= 0:
+            del counts[facet][value]
+
+def format_facets(counts: dict) -> dict:
+    bands = []
+    for i, lower in enumerate(PRICE_BAND_BOUNDARIES):
+        upper = PRICE_BAND_BOUNDARIES[i + 1] if i + 1 < len(PRICE_BAND_BOUNDARIES) else None
+        bands.append({"min": lower, "max": upper, "count": counts["price_band"].get(lower, 0)})
+    return {
+        "total": counts["total"],
+        "property_type": [
+            {"value": value, "count": count}
+            for value, count in sorted(counts["property_type"].items(), key=lambda item: -item[1])
+        ],
+        "price_bands": bands,
+        "bedrooms": [{"value": value, "count": count} for value, count in sorted(counts["bedrooms"].items())],
+    }
+
+# ==================== EXPORT ====================
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+# Image variants are derived files, not listing data, and don't survive a re-import
+PROPERTY_EXPORT_FIELDS = [name for name in Property.model_fields if name != "image_variants"]
+
+def export_cell(value):
+    if isinstance(value, list):
+        return "|".join(str(item) for item in value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return "" if value is None else value
+
+async def stream_export(find_cursor, format: str, fields: List[str]):
+    """Encode a Motor cursor chunk by chunk, holding at most one batch in memory."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    chunk = []
+    if format == "csv":
+        writer.writerow(fields)
+    async for doc in find_cursor:
+        if format == "csv":
+            writer.writerow([export_cell(doc.get(field)) for field in fields])
+        else:
+            chunk.append(orjson.dumps({field: doc.get(field) for field in fields}, option=orjson.OPT_UTC_Z))
+        if len(chunk) >= EXPORT_BATCH_SIZE or buffer.tell() >= EXPORT_BATCH_SIZE * 512:
+            yield flush_export(buffer, chunk)
+    yield flush_export(buffer, chunk)
+
+def flush_export(buffer: io.StringIO, chunk: List[bytes]) -> bytes:
+    if chunk:
+        data = b"\n".join(chunk) + b"\n"
+        chunk.clear()
+        return data
+    data = buffer.getvalue().encode()
+    buffer.seek(0)
+    buffer.truncate()
+    return data
+
+def export_response(collection, name: str, fields: List[str], format: str, since: Optional[datetime], sort):
+    query = {}
+    if since is not None:
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        query["created_at"] = {"$gte": since}
+    find_cursor = collection.find(query, {"_id": 0}).sort(sort).batch_size(EXPORT_BATCH_SIZE)
+    return StreamingResponse(
+        stream_export(find_cursor, format, fields),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{format}"'},
+    )
+
+@api_router.get("/properties/export")
+async def export_properties(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    since: Optional[datetime] = Query(None)
+):
+    """Stream every listing created at or after `since`, oldest first."""
+    return export_response(db.properties, "properties", PROPERTY_EXPORT_FIELDS, format, since,
+                           [("created_at", ASCENDING), ("id", ASCENDING)])
+
+@api_router.get("/inquiries/export")
+async def export_inquiries(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    since: Optional[datetime] = Query(None)
+):
+    """Stream every inquiry created at or after `since`, oldest first."""
+    return export_response(db.inquiries, "inquiries", list(Inquiry.model_fields), format, since,
+                           [("created_at", ASCENDING)])
+
+# ==================== CONDITIONAL GET ====================
+
+CACHE_CONTROL_PROPERTY_LIST = "public, no-cache"
+CACHE_CONTROL_PROPERTY = "public, no-cache"
+CACHE_CONTROL_FACETS = "public, max-age=60"
+CACHE_CONTROL_INQUIRIES = "private, no-cache"
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+class CollectionVersions:
+    """Per-collection change counters in the `counters` collection.
+
+    Every write bumps the counter, so "<collection>-<version>" is a strong ETag
+    for any read of that collection. Each process keeps the last value it saw
+    for `ttl` seconds, which makes validating a request free in the common case.
+
+    A jump this process did not make itself means another worker wrote, so
+    the callbacks registered with on_external_change() drop whatever this
+    process cached from the collection before it is served under the new ETag.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._local = {}
+        self._listeners = {}
+
+    def on_external_change(self, name: str, callback):
+        self._listeners.setdefault(name, []).append(callback)
+
+    def _remember(self, name: str, doc: Optional[dict], written: bool = False):
+        version = doc["version"] if doc else 0
+        updated_at = doc["updated_at"] if doc else EPOCH
+        previous = self._local.get(name)
+        if previous and version != previous[1] + written:
+            for callback in self._listeners.get(name, ()):
+                callback()
+        self._local[name] = (time.monotonic() + self.ttl, version, updated_at)
+        return version, updated_at
+
+    async def get(self, name: str):
+        entry = self._local.get(name)
+        if entry and entry[0] >= time.monotonic():
+            return entry[1], entry[2]
+        return self._remember(name, await db.counters.find_one({"_id": name}))
+
+    async def bump(self, name: str):
+        doc = await db.counters.find_one_and_update(
+            {"_id": name},
+            {"$inc": {"version": 1}, "$set": {"updated_at": datetime.now(timezone.utc)}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        self._remember(name, doc, written=True)
+
+collection_versions = CollectionVersions(COLLECTION_VERSION_TTL)
+collection_versions.on_external_change("properties", clear_property_caches)
+
+def as_utc(value: datetime) -> datetime:
+    """Treat naive datetimes as UTC, which is how they are stored."""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+def cache_validators(etag: str, last_modified: Optional[datetime], cache_control: str) -> dict:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified:
+        headers["Last-Modified"] = email.utils.format_datetime(as_utc(last_modified), usegmt=True)
+    return headers
+
+def not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """Evaluate If-None-Match, or If-Modified-Since when no If-None-Match was sent."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            since = email.utils.parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return as_utc(last_modified).replace(microsecond=0) <= as_utc(since)
+    return False
+
+def has_conditional_headers(request: Request) -> bool:
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+def property_validators(version: int, updated_at: Optional[datetime]) -> dict:
+    # The same version the If-Match precondition on PUT compares against
+    return cache_validators(f'"{version}"', updated_at, CACHE_CONTROL_PROPERTY)
+
 # ==================== PROPERTY ENDPOINTS ====================
 
 @api_router.get("/")
 async def root():
     return {"message": "Quiet Wealth Real Estate API"}
 
-@api_router.get("/properties", response_model=List[Property])
-async def get_properties(
-    property_type: Optional[str] = Query(None),
-    min_price: Optional[int] = Query(None),
-    max_price: Optional[int] = Query(None),
-    location: Optional[str] = Query(None),
-    bedrooms: Optional[int] = Query(None),
-    featured: Optional[bool] = Query(None)
-):
+def build_property_query(property_type, min_price, max_price, location, bedrooms, featured,
+                         near=None, radius=None, bbox=None) -> dict:
+    """Translate the listing filters shared by the property read endpoints into a Mongo filter."""
     query = {}
     if property_type:
         query["property_type"] = property_type
@@ -113,113 +1360,2170 @@ async def get_properties(
         else:
             query["price"] = {"$lte": max_price}
     if location:
-        query["location"] = {"$regex": location, "$options": "i"}
+        location_match = location_filter(location)
+        if location_match:
+            query.update(location_match)
     if bedrooms:
         query["bedrooms"] = {"$gte": bedrooms}
     if featured is not None:
         query["featured"] = featured
+    geo_match = geo_filter(near, radius, bbox)
+    if geo_match and "$and" in geo_match and "$and" in query:
+        query["$and"] += geo_match["$and"]
+    elif geo_match:
+        query.update(geo_match)
+    return query
+
+def parse_geo_params(near: Optional[str], radius: Optional[float], bbox: Optional[str]):
+    """Validate near/radius/bbox; `near` without a radius searches NEAR_DEFAULT_RADIUS_KM."""
+    point = parse_near(near)
+    if radius is not None and point is None:
+        raise HTTPException(status_code=400, detail="radius requires near")
+    if point is not None and radius is None:
+        radius = NEAR_DEFAULT_RADIUS_KM
+    return point, radius, parse_bbox(bbox)
+
+@api_router.get("/properties", response_model=Union[List[Property], List[PropertySummary]])
+async def get_properties(
+    request: Request,
+    property_type: Optional[str] = Query(None),
+    min_price: Optional[int] = Query(None),
+    max_price: Optional[int] = Query(None),
+    location: Optional[str] = Query(None),
+    bedrooms: Optional[int] = Query(None),
+    featured: Optional[bool] = Query(None),
+    near: Optional[str] = Query(None, description="latitude,longitude"),
+    radius: Optional[float] = Query(None, gt=0, le=MAX_RADIUS_KM, description="km around near"),
+    bbox: Optional[str] = Query(None, description="west,south,east,north"),
+    sort: str = Query("-created_at", pattern=PROPERTY_SORT_PATTERN),
+    limit: int = Query(24, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+    view: str = Query("full", pattern="^(full|summary)$")
+):
+    near, radius, bbox = parse_geo_params(near, radius, bbox)
+    if sort == "distance" and near is None:
+        raise HTTPException(status_code=400, detail="sort=distance requires near")
+    version, last_modified = await collection_versions.get("properties")
+    etag = f'"properties-{version}"'
+    headers = cache_validators(etag, last_modified, CACHE_CONTROL_PROPERTY_LIST)
+    if not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
     
-    properties = await db.properties.find(query, {"_id": 0}).to_list(100)
-    for prop in properties:
-        if isinstance(prop.get('created_at'), str):
-            prop['created_at'] = datetime.fromisoformat(prop['created_at'])
-    return properties
+    cache_key = listing_key(property_type, min_price, max_price, location, bedrooms, featured, near, radius, bbox,
+                            sort, limit, cursor, view)
+    cached = listing_cache.get(cache_key)
+    if cached is not None:
+        properties, next_cursor = cached
+        if next_cursor:
+            headers["X-Next-Cursor"] = next_cursor
+        return FastJSONResponse(properties, headers=headers)
+    
+    summary = view == "summary"
+    projection = SUMMARY_PROJECTION if summary else FULL_PROJECTION
+    
+    if sort == "distance":
+        # $geoNear walks the 2dsphere index outward from `near` and applies the
+        # radius itself, so the other filters go in its query without geo_filter()
+        query = build_property_query(property_type, min_price, max_price, location, bedrooms, featured, bbox=bbox)
+        sort_field, direction = "distance", 1
+        latitude, longitude = near
+        geo_near = {
+            "near": {"type": "Point", "coordinates": [longitude, latitude]},
+            "distanceField": "distance",
+            "maxDistance": radius * 1000,
+            "query": query,
+            "key": "geo",
+            "spherical": True,
+        }
+        pipeline = [{"$geoNear": geo_near}]
+        if cursor:
+            # Skip straight past the previous page's radius, then break ties by id
+            geo_near["minDistance"] = decode_cursor(cursor)[0]
+            pipeline.append({"$match": keyset_filter(sort_field, direction, cursor)})
+        project = {"$project": SUMMARY_PIPELINE_PROJECTION if summary else FULL_PROJECTION}
+        # $geoNear already emits by distance, so a $sort would read every listing
+        # in the radius; read just past the page and order ties by id here instead
+        window = limit + 1 + DISTANCE_TIE_WINDOW
+        properties = await db.properties.aggregate(pipeline + [{"$limit": window}, project]).to_list(window)
+        properties.sort(key=lambda prop: (prop["distance"], prop["id"]))
+        if len(properties) == window and properties[-1]["distance"] == properties[limit - 1]["distance"]:
+            # The tie at the page boundary runs past the window: order all of it
+            properties = await db.properties.aggregate(
+                pipeline + [{"$sort": {"distance": 1, "id": 1}}, {"$limit": limit + 1}, project]
+            ).to_list(limit + 1)
+        properties = properties[:limit + 1]
+    elif sort == "relevance":
+        query = build_property_query(property_type, min_price, max_price, location, bedrooms, featured, near, radius, bbox)
+        if not location_tokens(location):
+            raise HTTPException(status_code=400, detail="sort=relevance requires a location")
+        # Score = number of search tokens that match a location key exactly
+        sort_field, direction = "_score", -1
+        pipeline = [
+            {"$match": query},
+            {"$addFields": {"_score": {"$size": {"$setIntersection": ["$location_keys", location_tokens(location)]}}}},
+        ]
+        if cursor:
+            pipeline.append({"$match": keyset_filter(sort_field, direction, cursor)})
+        pipeline += [
+            {"$sort": {"_score": -1, "id": -1}},
+            {"$limit": limit + 1},
+            {"$project": SUMMARY_PIPELINE_PROJECTION if summary else FULL_PROJECTION},
+        ]
+        properties = await db.properties.aggregate(pipeline).to_list(limit + 1)
+    else:
+        query = build_property_query(property_type, min_price, max_price, location, bedrooms, featured, near, radius, bbox)
+        sort_field = sort.lstrip("-")
+        direction = -1 if sort.startswith("-") else 1
+        if cursor:
+            after = keyset_filter(sort_field, direction, cursor)
+            query = {"$and": [query, after]} if query else after
+        # Fetch one extra row to learn whether another page exists
+        properties = await db.properties.find(query, projection).sort(
+            [(sort_field, direction), ("id", direction)]
+        ).limit(limit + 1).to_list(limit + 1)
+    next_cursor = None
+    if len(properties) > limit:
+        properties = properties[:limit]
+        last = properties[-1]
+        next_cursor = encode_cursor(last.get(sort_field), last["id"])
+    if sort == "relevance":
+        for prop in properties:
+            prop.pop("_score", None)
+    elif sort == "distance":
+        for prop in properties:
+            prop["distance_km"] = round(prop.pop("distance") / 1000, 3)
+    listing_cache.set(cache_key, (properties, next_cursor))
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    return FastJSONResponse(properties, headers=headers)
+
+@api_router.get("/properties/facets")
+async def get_property_facets(
+    request: Request,
+    property_type: Optional[str] = Query(None),
+    min_price: Optional[int] = Query(None),
+    max_price: Optional[int] = Query(None),
+    location: Optional[str] = Query(None),
+    bedrooms: Optional[int] = Query(None),
+    featured: Optional[bool] = Query(None),
+    near: Optional[str] = Query(None, description="latitude,longitude"),
+    radius: Optional[float] = Query(None, gt=0, le=MAX_RADIUS_KM, description="km around near"),
+    bbox: Optional[str] = Query(None, description="west,south,east,north")
+):
+    """Counts per property type, price band and bedroom count for the filtered listings."""
+    near, radius, bbox = parse_geo_params(near, radius, bbox)
+    version, last_modified = await collection_versions.get("properties")
+    etag = f'"properties-{version}"'
+    headers = cache_validators(etag, last_modified, CACHE_CONTROL_FACETS)
+    if not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    
+    cache_key = listing_key(property_type, min_price, max_price, location, bedrooms, featured, near, radius, bbox,
+                            None, None, None, None)[:LISTING_FILTERS]
+    counts = facet_cache.get(cache_key)
+    if counts is None:
+        counts = await compute_facets(build_property_query(
+            property_type, min_price, max_price, location, bedrooms, featured, near, radius, bbox))
+        facet_cache.set(cache_key, counts)
+    return FastJSONResponse(format_facets(counts), headers=headers)
 
 @api_router.get("/properties/{property_id}", response_model=Property)
-async def get_property(property_id: str):
-    prop = await db.properties.find_one({"id": property_id}, {"_id": 0})
-    if not prop:
-        raise HTTPException(status_code=404, detail="Property not found")
-    if isinstance(prop.get('created_at'), str):
-        prop['created_at'] = datetime.fromisoformat(prop['created_at'])
-    return prop
+async def get_property(property_id: str, request: Request):
+    # Revalidating the version first drops entries another worker has since rewritten
+    await collection_versions.get("properties")
+    prop = property_cache.get(property_id)
+    if prop is None and has_conditional_headers(request):
+        # Answered from the validator index alone, without fetching the document
+        meta = await db.properties.find(
+            {"id": property_id}, {"_id": 0, "version": 1, "updated_at": 1}
+        ).hint(PROPERTY_VALIDATOR_INDEX).limit(1).to_list(1)
+        if meta:
+            headers = property_validators(meta[0].get("version", 1), meta[0].get("updated_at"))
+            if not_modified(request, headers["ETag"], meta[0].get("updated_at")):
+                return Response(status_code=304, headers=headers)
+    if prop is None:
+        prop = await db.properties.find_one({"id": property_id}, FULL_PROJECTION)
+        if not prop:
+            raise HTTPException(status_code=404, detail="Property not found")
+        property_cache.set(property_id, prop)
+    headers = property_validators(prop.get("version", 1), prop.get("updated_at"))
+    if not_modified(request, headers["ETag"], prop.get("updated_at")):
+        return Response(status_code=304, headers=headers)
+    return FastJSONResponse(prop, headers=headers)
+
+# Batch reads currently running, keyed on (properties version, view, ids)
+property_batches_in_flight: Dict[tuple, asyncio.Task] = {}
+
+async def fetch_properties(ids: List[str], summary: bool) -> List[dict]:
+    """Resolve ids with one $in query; full documents come from property_cache where they can."""
+    if summary:
+        return await db.properties.find({"id": {"$in": ids}}, SUMMARY_PROJECTION).to_list(len(ids))
+    found, misses = [], []
+    for property_id in ids:
+        prop = property_cache.get(property_id)
+        if prop is None:
+            misses.append(property_id)
+        else:
+            found.append(prop)
+    if misses:
+        docs = await db.properties.find({"id": {"$in": misses}}, FULL_PROJECTION).to_list(len(misses))
+        for doc in docs:
+            property_cache.set(doc["id"], doc)
+        found += docs
+    return found
+
+async def fetch_properties_coalesced(ids: List[str], summary: bool) -> List[dict]:
+    """fetch_properties(), sharing one query between identical requests that overlap."""
+    version, _ = await collection_versions.get("properties")
+    key = (version, summary, tuple(ids))
+    task = property_batches_in_flight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(fetch_properties(ids, summary))
+        property_batches_in_flight[key] = task
+        task.add_done_callback(lambda _: property_batches_in_flight.pop(key, None))
+    # A client that disconnects must not cancel the query for the others waiting on it
+    return await asyncio.shield(task)
+
+@api_router.post("/properties/batch")
+async def get_properties_batch(batch: PropertyBatchRequest):
+    """Listings for a list of ids, in the order requested, plus the ids that do not exist."""
+    ids = unique_ids(batch.ids)
+    found = {doc["id"]: doc for doc in await fetch_properties_coalesced(ids, batch.view == "summary")}
+    return FastJSONResponse({
+        "items": [found[property_id] for property_id in ids if property_id in found],
+        "missing": [property_id for property_id in ids if property_id not in found],
+    })
 
 @api_router.post("/properties", response_model=Property)
 async def create_property(property_data: PropertyCreate):
     prop = Property(**property_data.model_dump())
     doc = prop.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
+    doc['updated_at'] = doc['created_at']
+    doc['location_keys'] = location_tokens(doc['location'])
+    doc['geo'] = geo_point(doc['latitude'], doc['longitude'])
     await db.properties.insert_one(doc)
+    property_changed(None, doc)
+    await collection_versions.bump("properties")
     return prop
 
+def parse_if_match(value: Optional[str]) -> Optional[int]:
+    """Read the expected property version from an If-Match header ("3", W/"3" or 3)."""
+    if value is None or value.strip() == "*":
+        return None
+    tag = value.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    try:
+        return int(tag.strip('"'))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid If-Match header")
+
 @api_router.put("/properties/{property_id}", response_model=Property)
-async def update_property(property_id: str, property_data: PropertyUpdate):
-    existing = await db.properties.find_one({"id": property_id}, {"_id": 0})
-    if not existing:
-        raise HTTPException(status_code=404, detail="Property not found")
+async def update_property(
+    property_id: str,
+    property_data: PropertyUpdate,
+    if_match: Optional[str] = Header(None)
+):
+    query = {"id": property_id}
+    expected_version = parse_if_match(if_match)
+    if expected_version is not None:
+        query["version"] = expected_version
     
     update_data = {k: v for k, v in property_data.model_dump().items() if v is not None}
+    if 'location' in update_data:
+        update_data['location_keys'] = location_tokens(update_data['location'])
+    if ('latitude' in update_data) != ('longitude' in update_data):
+        raise HTTPException(status_code=400, detail="latitude and longitude must be updated together")
+    if 'latitude' in update_data:
+        update_data['geo'] = geo_point(update_data['latitude'], update_data['longitude'])
     if update_data:
-        await db.properties.update_one({"id": property_id}, {"$set": update_data})
+        update_data['updated_at'] = datetime.now(timezone.utc)
+        # Ask for the pre-image: the post-image is exactly it plus this $set/$inc,
+        # and the old values are needed to invalidate listings it used to match
+        update = {"$set": update_data, "$inc": {"version": 1}}
+        if 'images' in update_data:
+            # Forget the variants of images that were removed from the listing
+            update["$pull"] = {"image_variants": {"src": {"$nin": update_data['images']}}}
+        existing = await db.properties.find_one_and_update(
+            query,
+            update,
+            projection={"_id": 0},
+            return_document=ReturnDocument.BEFORE,
+        )
+    else:
+        existing = await db.properties.find_one(query, {"_id": 0})
     
-    updated = await db.properties.find_one({"id": property_id}, {"_id": 0})
-    if isinstance(updated.get('created_at'), str):
-        updated['created_at'] = datetime.fromisoformat(updated['created_at'])
-    return updated
+    if not existing:
+        if expected_version is not None and await db.properties.count_documents({"id": property_id}, limit=1):
+            raise HTTPException(status_code=412, detail="Property was modified by someone else")
+        raise HTTPException(status_code=404, detail="Property not found")
+    
+    updated = {**existing, **update_data}
+    if update_data:
+        updated["version"] = existing.get("version", 0) + 1
+    if 'images' in update_data and existing.get("image_variants"):
+        updated["image_variants"] = [v for v in existing["image_variants"] if v["src"] in update_data['images']]
+    property_changed(existing, updated)
+    if update_data:
+        await collection_versions.bump("properties")
+    updated.pop("location_keys", None)
+    updated.pop("geo", None)
+    return FastJSONResponse(updated, headers=property_validators(updated.get("version", 1), updated.get("updated_at")))
 
 @api_router.delete("/properties/{property_id}")
 async def delete_property(property_id: str):
-    result = await db.properties.delete_one({"id": property_id})
-    if result.deleted_count == 0:
+    deleted = await db.properties.find_one_and_delete({"id": property_id}, {"_id": 0})
+    if not deleted:
         raise HTTPException(status_code=404, detail="Property not found")
+    property_changed(deleted, None)
+    await record_deletions("properties", [property_id])
+    await collection_versions.bump("properties")
     return {"message": "Property deleted successfully"}
 
+# ==================== SIMILAR LISTINGS ====================
+
+# Share of the similarity score carried by each group of columns; the score is in [0, 1]
+SIMILARITY_WEIGHTS = {"numeric": 0.5, "type": 0.2, "features": 0.3}
+# price and area are compared on a log scale, the room counts as they are
+SIMILAR_NUMERIC_FIELDS = ("price", "area", "bedrooms", "bathrooms")
+SIMILAR_PROJECTION = {"_id": 0, "id": 1, "property_type": 1, "features": 1, **{name: 1 for name in SIMILAR_NUMERIC_FIELDS}}
+# Other processes' writes are found by updated_at; re-read this far back to allow for clock skew
+SIMILAR_SYNC_OVERLAP = timedelta(seconds=5)
+# Extra neighbours fetched in case another process deleted some of them
+SIMILAR_SPARES = 4
+
+def feature_key(name: str) -> str:
+    return " ".join(str(name).casefold().split())
+
+def similar_numeric_row(doc: dict) -> List[float]:
+    return [
+        math.log1p(max(doc.get("price") or 0, 0)),
+        math.log1p(max(doc.get("area") or 0, 0)),
+        doc.get("bedrooms") or 0,
+        doc.get("bathrooms") or 0,
+    ]
+
+class SimilarityIndex:
+    """Feature matrix over every listing, scored against one row in a single vectorized pass.
+
+    A row holds log price, log area, bedrooms and bathrooms, a property type
+    code and a multi-hot vector of `features`. Writes made by this process
+    are applied as they happen; sync() picks up everybody else's by re-reading
+    the listings updated since the last sync whenever the properties
+    collection version moves. Deletes made elsewhere are noticed when a
+    neighbour can no longer be fetched.
+    """
+
+    def __init__(self, max_features: int):
+        self.max_features = max_features
+        self.ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.type_codes: Dict[str, int] = {}
+        self.feature_codes: Dict[str, int] = {}
+        self.numeric = np.zeros((0, len(SIMILAR_NUMERIC_FIELDS)), np.float32)
+        self.types = np.zeros(0, np.int16)
+        # Column-major, so reading the handful of columns one listing has set is contiguous
+        self.features = np.zeros((0, 0), np.bool_, order="F")
+        self.feature_counts = np.zeros(0, np.float32)
+        self.inv_var = np.ones(len(SIMILAR_NUMERIC_FIELDS), np.float32)
+        self.version = None
+        self.synced_at = None
+        self.dropped_features = 0
+        self._lock = asyncio.Lock()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, property_id):
+        return property_id in self.rows
+
+    def _reserve(self, rows: int, columns: int):
+        """Make room for more rows (doubling) or feature columns (64 at a time, as new ones are rare)."""
+        capacity, width = self.features.shape
+        if rows <= capacity and columns <= width:
+            return
+        if rows > capacity:
+            capacity = max(rows, capacity * 2, 1024)
+        if columns > width:
+            width = min(max(columns, width + 64), self.max_features)
+        n = len(self.ids)
+        numeric = np.zeros((capacity, self.numeric.shape[1]), np.float32)
+        numeric[:n] = self.numeric[:n]
+        types = np.full(capacity, -1, np.int16)
+        types[:n] = self.types[:n]
+        features = np.zeros((capacity, width), np.bool_, order="F")
+        features[:n, :self.features.shape[1]] = self.features[:n]
+        feature_counts = np.zeros(capacity, np.float32)
+        feature_counts[:n] = self.feature_counts[:n]
+        self.numeric, self.types, self.features, self.feature_counts = numeric, types, features, feature_counts
+
+    def _feature_columns(self, features) -> List[int]:
+        columns = set()
+        for name in features or []:
+            key = feature_key(name)
+            code = self.feature_codes.get(key)
+            if code is None:
+                if len(self.feature_codes) >= self.max_features:
+                    self.dropped_features += 1
+                    continue
+                code = self.feature_codes[key] = len(self.feature_codes)
+            columns.add(code)
+        return sorted(columns)
+
+    def upsert(self, doc: dict):
+        columns = self._feature_columns(doc.get("features"))
+        row = self.rows.get(doc["id"])
+        if row is None:
+            row = len(self.ids)
+            self._reserve(row + 1, len(self.feature_codes))
+            self.ids.append(doc["id"])
+            self.rows[doc["id"]] = row
+        else:
+            self._reserve(len(self.ids), len(self.feature_codes))
+            self.features[row] = False
+        property_type = doc.get("property_type")
+        self.numeric[row] = similar_numeric_row(doc)
+        self.types[row] = self.type_codes.setdefault(property_type, len(self.type_codes)) if property_type else -1
+        self.features[row, columns] = True
+        self.feature_counts[row] = len(columns)
+
+    def remove(self, property_id: str):
+        """Drop a listing by moving the last row into its slot."""
+        row = self.rows.pop(property_id, None)
+        if row is None:
+            return
+        last = len(self.ids) - 1
+        if row != last:
+            moved = self.ids[last]
+            self.ids[row] = moved
+            self.rows[moved] = row
+            self.numeric[row] = self.numeric[last]
+            self.types[row] = self.types[last]
+            self.features[row] = self.features[last]
+            self.feature_counts[row] = self.feature_counts[last]
+        self.features[last] = False
+        self.ids.pop()
+
+    def fit(self):
+        """Rescale the numeric columns to unit variance over the current listings."""
+        std = self.numeric[:len(self.ids)].std(axis=0) if self.ids else np.ones(len(SIMILAR_NUMERIC_FIELDS))
+        std[std < 1e-6] = 1
+        self.inv_var = (1 / (std * std)).astype(np.float32)
+
+    def similar(self, property_id: str, k: int) -> List[tuple]:
+        """(id, score) of the k listings most like this one, best first."""
+        row = self.rows[property_id]
+        n = len(self.ids)
+        k = min(k, n - 1)
+        if k <= 0:
+            return []
+        diff = self.numeric[:n] - self.numeric[row]
+        distance = (diff * diff) @ self.inv_var / len(SIMILAR_NUMERIC_FIELDS)
+        score = SIMILARITY_WEIGHTS["numeric"] / (1 + distance)
+        if self.types[row] >= 0:
+            score += SIMILARITY_WEIGHTS["type"] * (self.types[:n] == self.types[row])
+        columns = np.flatnonzero(self.features[row])
+        if columns.size:
+            # Cosine similarity of the multi-hot vectors
+            overlap = self.features[:n, columns].sum(axis=1, dtype=np.float32)
+            norms = np.sqrt(np.maximum(self.feature_counts[:n], 1) * columns.size)
+            score += SIMILARITY_WEIGHTS["features"] * overlap / norms
+        score[row] = -np.inf
+        top = np.argpartition(score, n - k)[n - k:]
+        top = top[np.argsort(-score[top], kind="stable")]
+        return [(self.ids[i], float(score[i])) for i in top]
+
+    async def sync(self):
+        """Catch up with writes made since the last sync; the first call loads every listing."""
+        version, _ = await collection_versions.get("properties")
+        if version == self.version:
+            return
+        async with self._lock:
+            if version == self.version:
+                return
+            started = datetime.now(timezone.utc)
+            query = {} if self.synced_at is None else {"updated_at": {"$gte": self.synced_at - SIMILAR_SYNC_OVERLAP}}
+            changed = 0
+            async for doc in db.properties.find(query, SIMILAR_PROJECTION).batch_size(EXPORT_BATCH_SIZE):
+                self.upsert(doc)
+                changed += 1
+            if changed:
+                self.fit()
+            if self.synced_at is None:
+                logger.info(f"Similarity index built over {len(self.ids)} listings "
+                            f"in {(datetime.now(timezone.utc) - started).total_seconds() * 1000:.0f} ms")
+            self.version = version
+            self.synced_at = started
+
+    def stats(self) -> dict:
+        return {
+            "rows": len(self.ids),
+            "property_types": len(self.type_codes),
+            "features": len(self.feature_codes),
+            "dropped_features": self.dropped_features,
+            "bytes": self.numeric.nbytes + self.types.nbytes + self.features.nbytes + self.feature_counts.nbytes,
+            "version": self.version,
+        }
+
+similar_index = SimilarityIndex(SIMILAR_MAX_FEATURES)
+
+@api_router.get("/properties/{property_id}/similar", response_model=List[PropertySummary])
+async def get_similar_properties(
+    property_id: str,
+    request: Request,
+    k: int = Query(6, ge=1, le=24)
+):
+    """The k listings closest to this one by price, size, rooms, type and features."""
+    version, last_modified = await collection_versions.get("properties")
+    etag = f'"properties-{version}"'
+    headers = cache_validators(etag, last_modified, CACHE_CONTROL_PROPERTY_LIST)
+    if not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    
+    await similar_index.sync()
+    if property_id not in similar_index:
+        raise HTTPException(status_code=404, detail="Property not found")
+    neighbours = similar_index.similar(property_id, k + SIMILAR_SPARES)
+    ids = [property_id] + [neighbour_id for neighbour_id, _ in neighbours]
+    docs = {doc["id"]: doc for doc in await db.properties.find({"id": {"$in": ids}}, SUMMARY_PROJECTION).to_list(len(ids))}
+    if property_id not in docs:
+        similar_index.remove(property_id)
+        raise HTTPException(status_code=404, detail="Property not found")
+    
+    similar = []
+    for neighbour_id, score in neighbours:
+        doc = docs.get(neighbour_id)
+        if doc is None:
+            similar_index.remove(neighbour_id)
+            continue
+        doc["similarity"] = round(score, 4)
+        similar.append(doc)
+        if len(similar) == k:
+            break
+    return FastJSONResponse(similar, headers=headers)
+
+# ==================== TRANSACTIONS ====================
+
+# Multi-document transactions need a replica set or mongos; set at startup
+TRANSACTIONS_SUPPORTED = False
+
+async def detect_transactions():
+    global TRANSACTIONS_SUPPORTED
+    try:
+        hello = await client.admin.command("hello")
+    except Exception as e:
+        logger.warning(f"Could not detect MongoDB topology: {str(e)}")
+        return
+    TRANSACTIONS_SUPPORTED = "setName" in hello or hello.get("msg") == "isdbgrid"
+
+# ==================== EMAIL OUTBOX ====================
+
+def inquiry_email_params(inquiry: Inquiry) -> dict:
+    property_info = ""
+    if inquiry.property_title:
+        property_info = f"<p><strong>Property:</strong> {html.escape(inquiry.property_title)}</p>"
+    
+    html_content = f"""
+    <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
+        <h2 style="color: #050505;">New Property Inquiry</h2>
+        {property_info}
+        <p><strong>Name:</strong> {html.escape(inquiry.name)}</p>
+        <p><strong>Email:</strong> {html.escape(inquiry.email)}</p>
+        <p><strong>Phone:</strong> {html.escape(inquiry.phone or 'Not provided')}</p>
+        <p><strong>Message:</strong></p>
+        <p style="background: #f5f5f4; padding: 15px; border-left: 3px solid #E5D0AC;">{html.escape(inquiry.message)}</p>
+    </div>
+    """
+    
+    return {
+        "from": SENDER_EMAIL,
+        "to": [NOTIFICATION_EMAIL],
+        "subject": f"New Inquiry: {inquiry.property_title or 'General Contact'}",
+        "html": html_content
+    }
+
+class ResendMailSender:
+    """Sends through the Resend batch API on a dedicated thread pool."""
+
+    def __init__(self, concurrency: int):
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="resend")
+
+    async def send_batch(self, messages: List[dict], idempotency_key: str):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            self._executor,
+            lambda: resend.Batch.send(messages, {"idempotency_key": idempotency_key}),
+        )
+
+class LogMailSender:
+    """Local stand-in that logs messages instead of sending them and keeps them in `sent`."""
+
+    def __init__(self):
+        self.sent = []
+
+    async def send_batch(self, messages: List[dict], idempotency_key: str):
+        self.sent.extend(messages)
+        for message in messages:
+            logger.info(f"[{EMAIL_SENDER}] Email to {message['to']}: {message['subject']}")
+
+def build_mail_sender():
+    if EMAIL_SENDER == "log":
+        return LogMailSender()
+    if resend.api_key and NOTIFICATION_EMAIL:
+        return ResendMailSender(OUTBOX_CONCURRENCY)
+    return None
+
+class OutboxWorker:
+    """Background drainer for the `outbox` collection.
+
+    Each record is keyed by a deduplication key, so enqueueing the same
+    notification twice is a no-op. Up to `concurrency` drain loops each claim
+    a batch with a claim token, send it in one call and then mark it sent or
+    schedule a retry with exponential backoff. A claim also pushes
+    next_attempt_at out by `lease` seconds, so batches held by a crashed
+    worker become claimable again.
+
+    When a loop finds nothing to send it awaits `sweep`, if given, which
+    enqueues records whose writer failed between its own write and the
+    outbox's; the sweep returns how many it queued.
+    """
+
+    def __init__(self, sender, batch_size: int = 20, concurrency: int = 2, max_attempts: int = 8,
+                 poll_interval: float = 5.0, base_backoff: float = 2.0, max_backoff: float = 3600.0,
+                 lease: float = 120.0, sweep=None):
+        self.sender = sender
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.lease = lease
+        self.sweep = sweep
+        self._wakeup = asyncio.Event()
+        self._tasks = []
+        self._stopping = False
+
+    async def enqueue(self, params: dict, key: str, session=None):
+        now = datetime.now(timezone.utc)
+        await db.outbox.update_one(
+            {"_id": key},
+            {"$setOnInsert": {
+                "params": params,
+                "status": "pending",
+                "attempts": 0,
+                "next_attempt_at": now,
+                "created_at": now,
+            }},
+            upsert=True,
+            session=session,
+        )
+
+    def notify(self):
+        """Wake idle drain loops instead of waiting for the next poll."""
+        self._wakeup.set()
+
+    def start(self):
+        if not self._tasks:
+            self._stopping = False
+            self._tasks = [asyncio.create_task(self._run()) for _ in range(self.concurrency)]
+
+    async def stop(self):
+        # wait_for can swallow a cancellation that races with notify(), so the
+        # loops also check the flag before waiting again
+        self._stopping = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _run(self):
+        while not self._stopping:
+            self._wakeup.clear()
+            try:
+                claimed = await self.drain_once()
+                if not claimed and self.sweep:
+                    claimed = await self.sweep()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Outbox drain failed: {str(e)}")
+                claimed = 0
+            if not claimed:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _claim(self) -> List[dict]:
+        now = datetime.now(timezone.utc)
+        due = {"status": "pending", "next_attempt_at": {"$lte": now}}
+        candidates = await db.outbox.find(due, {"_id": 1}).sort("next_attempt_at", 1).limit(self.batch_size).to_list(self.batch_size)
+        if not candidates:
+            return []
+        claim = str(uuid.uuid4())
+        await db.outbox.update_many(
+            {"_id": {"$in": [c["_id"] for c in candidates]}, **due},
+            {"$set": {"claim": claim, "next_attempt_at": now + timedelta(seconds=self.lease)}, "$inc": {"attempts": 1}},
+        )
+        return await db.outbox.find({"claim": claim}).to_list(self.batch_size)
+
+    def _backoff(self, attempts: int) -> float:
+        delay = min(self.max_backoff, self.base_backoff * 2 ** (attempts - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    async def drain_once(self) -> int:
+        """Claim and send one batch; returns the number of records claimed."""
+        batch = await self._claim()
+        if not batch:
+            return 0
+        ids = sorted(record["_id"] for record in batch)
+        idempotency_key = hashlib.sha256("|".join(ids).encode()).hexdigest()
+        started = time.perf_counter()
+        try:
+            await self.sender.send_batch([record["params"] for record in batch], idempotency_key)
+        except Exception as e:
+            email_send_duration.observe(time.perf_counter() - started, "error")
+            logger.error(f"Failed to send {len(batch)} email notification(s): {str(e)}")
+            now = datetime.now(timezone.utc)
+            updates = []
+            for record in batch:
+                if record["attempts"] >= self.max_attempts:
+                    change = {"status": "failed", "last_error": str(e)}
+                else:
+                    retry_at = now + timedelta(seconds=self._backoff(record["attempts"]))
+                    change = {"next_attempt_at": retry_at, "last_error": str(e)}
+                updates.append(UpdateOne({"_id": record["_id"]}, {"$set": change, "$unset": {"claim": ""}}))
+            await db.outbox.bulk_write(updates, ordered=False)
+        else:
+            email_send_duration.observe(time.perf_counter() - started, "sent")
+            await db.outbox.update_many(
+                {"_id": {"$in": ids}},
+                {"$set": {"status": "sent", "sent_at": datetime.now(timezone.utc)}, "$unset": {"claim": ""}},
+            )
+            logger.info(f"Email notification sent for {', '.join(ids)}")
+        return len(batch)
+
+async def enqueue_inquiry_notification(inquiry: Inquiry):
+    await outbox_worker.enqueue(inquiry_email_params(inquiry), key=f"inquiry:{inquiry.id}")
+    await db.inquiries.update_one({"id": inquiry.id}, {"$unset": {"notification_pending": ""}})
+
+async def sweep_inquiry_notifications() -> int:
+    """Enqueue notifications for inquiries saved without a transaction whose enqueue never landed."""
+    docs = await db.inquiries.find({"notification_pending": True}, INQUIRY_PROJECTION).limit(OUTBOX_BATCH_SIZE).to_list(OUTBOX_BATCH_SIZE)
+    for doc in docs:
+        await enqueue_inquiry_notification(Inquiry(**doc))
+    return len(docs)
+
+mail_sender = build_mail_sender()
+outbox_worker = OutboxWorker(
+    mail_sender,
+    batch_size=OUTBOX_BATCH_SIZE,
+    concurrency=OUTBOX_CONCURRENCY,
+    max_attempts=OUTBOX_MAX_ATTEMPTS,
+    poll_interval=OUTBOX_POLL_INTERVAL,
+    sweep=sweep_inquiry_notifications,
+)
+
+# ==================== IMAGES ====================
+
+# Longest edge of each rendition; smaller originals are never upscaled
+IMAGE_VARIANTS = {"thumb": 320, "card": 800, "hero": 1600}
+IMAGE_FORMATS = {"JPEG": "jpg", "PNG": "png", "WEBP": "webp"}
+CACHE_CONTROL_MEDIA = "public, max-age=31536000, immutable"
+MEDIA_NAME = re.compile(r"^[0-9a-f]{40}\.(jpg|png|webp)$")
+
+# Pillow releases the GIL while decoding, resizing and encoding, so threads scale
+image_executor = ThreadPoolExecutor(max_workers=IMAGE_WORKERS, thread_name_prefix="images")
+
+def store_media(data: bytes, ext: str) -> str:
+    """Write bytes under their content hash and return the public URL.
+
+    The name changes whenever the content does, which is what makes the
+    immutable cache header on /api/media safe.
+    """
+    digest = hashlib.sha256(data).hexdigest()[:40]
+    path = MEDIA_ROOT / digest[:2] / f"{digest}.{ext}"
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    return f"{MEDIA_URL}/{digest[:2]}/{digest}.{ext}"
+
+def encode_image(image: Image.Image, fmt: str) -> bytes:
+    buffer = io.BytesIO()
+    if fmt == "JPEG":
+        image.convert("RGB").save(buffer, "JPEG", quality=82, optimize=True, progressive=True)
+    else:
+        image.save(buffer, "WEBP", quality=80, method=4)
+    return buffer.getvalue()
+
+def render_image_variants(data: bytes) -> dict:
+    """Store an upload and its variants; runs in image_executor, off the event loop."""
+    try:
+        with Image.open(io.BytesIO(data)) as original:
+            fmt = original.format
+            if fmt not in IMAGE_FORMATS:
+                raise HTTPException(status_code=415, detail=f"Unsupported image format: {fmt}")
+            image = ImageOps.exif_transpose(original)
+            image.load()
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid image: {str(e)}")
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB")
+
+    entry = {"src": "", "width": image.width, "height": image.height, "variants": {}}
+    for name, edge in IMAGE_VARIANTS.items():
+        scale = min(1.0, edge / max(image.width, image.height))
+        size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+        resized = image if size == image.size else image.resize(size, Image.LANCZOS, reducing_gap=3.0)
+        entry["variants"][name] = {
+            "width": size[0],
+            "height": size[1],
+            "webp": store_media(encode_image(resized, "WEBP"), "webp"),
+            "jpeg": store_media(encode_image(resized, "JPEG"), "jpg"),
+        }
+    store_media(data, IMAGE_FORMATS[fmt])
+    # Existing clients render `images` directly, so list the widely supported hero JPEG
+    entry["src"] = entry["variants"]["hero"]["jpeg"]
+    return entry
+
+async def read_upload(upload: UploadFile) -> bytes:
+    chunks, size = [], 0
+    while chunk := await upload.read(1024 * 1024):
+        size += len(chunk)
+        if size > IMAGE_MAX_BYTES:
+            raise HTTPException(status_code=413, detail=f"{upload.filename} is larger than {IMAGE_MAX_BYTES} bytes")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+@api_router.post("/properties/{property_id}/images")
+async def upload_property_images(
+    property_id: str,
+    files: List[UploadFile] = File(...),
+    if_match: Optional[str] = Header(None)
+):
+    """Append uploaded images to a listing, with thumb/card/hero variants in WebP and JPEG."""
+    query = {"id": property_id}
+    expected_version = parse_if_match(if_match)
+    if expected_version is not None:
+        query["version"] = expected_version
+    if not await db.properties.count_documents({"id": property_id}, limit=1):
+        raise HTTPException(status_code=404, detail="Property not found")
+
+    loop = asyncio.get_running_loop()
+    uploads = [await read_upload(upload) for upload in files]
+    entries = await asyncio.gather(*(loop.run_in_executor(image_executor, render_image_variants, data) for data in uploads))
+
+    now = datetime.now(timezone.utc)
+    existing = await db.properties.find_one_and_update(
+        query,
+        {
+            "$push": {"images": {"$each": [e["src"] for e in entries]}, "image_variants": {"$each": entries}},
+            "$set": {"updated_at": now},
+            "$inc": {"version": 1},
+        },
+        projection={"_id": 0},
+        return_document=ReturnDocument.BEFORE,
+    )
+    if not existing:
+        if expected_version is not None and await db.properties.count_documents({"id": property_id}, limit=1):
+            raise HTTPException(status_code=412, detail="Property was modified by someone else")
+        raise HTTPException(status_code=404, detail="Property not found")
+
+    updated = {
+        **existing,
+        "images": existing.get("images", []) + [e["src"] for e in entries],
+        "image_variants": existing.get("image_variants", []) + list(entries),
+        "updated_at": now,
+        "version": existing.get("version", 0) + 1,
+    }
+    property_changed(existing, updated)
+    await collection_versions.bump("properties")
+    updated.pop("location_keys", None)
+    updated.pop("geo", None)
+    return FastJSONResponse(updated, headers=property_validators(updated["version"], now))
+
+@api_router.get("/media/{shard}/{name}")
+async def get_media(shard: str, name: str):
+    if not MEDIA_NAME.match(name) or name[:2] != shard:
+        raise HTTPException(status_code=404, detail="Not found")
+    path = MEDIA_ROOT / shard / name
+    if not path.is_file():
+        raise HTTPException(status_code=404, detail="Not found")
+    return FileResponse(path, headers={"Cache-Control": CACHE_CONTROL_MEDIA})
+
+# ==================== BULK IMPORT ====================
+
+# CSV list columns hold several values separated by "|"
+CSV_LIST_FIELDS = ("features", "images")
+# A quote only opens a quoted field at the start of a field; anywhere else csv reads it literally
+CSV_QUOTE_OPEN = re.compile(r'(?<![^,])"')
+
+async def iter_body_lines(request: Request):
+    """Yield the request body line by line as it arrives, never buffering more than one line."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    async for chunk in request.stream():
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+        if len(pending) > IMPORT_MAX_LINE:
+            raise HTTPException(status_code=413, detail="Import line too long")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+async def iter_ndjson_rows(lines):
+    """Yield (row, error) pairs so one malformed line does not end the stream."""
+    async for line in lines:
+        if line.strip():
+            try:
+                yield orjson.loads(line), None
+            except orjson.JSONDecodeError as e:
+                yield None, f"Invalid JSON: {e}"
+
+def csv_quote_open(line: str, quoted: bool) -> bool:
+    """Whether a CSV record is inside a quoted field after `line`, given whether it was before it."""
+    pos = 0
+    while True:
+        if quoted:
+            end = line.find('"', pos)
+            if end < 0:
+                return True
+            if line.startswith('"', end + 1):
+                pos = end + 2  # escaped quote
+                continue
+            quoted, pos = False, end + 1
+        else:
+            start = CSV_QUOTE_OPEN.search(line, pos)
+            if start is None:
+                return False
+            quoted, pos = True, start.end()
+
+async def iter_csv_rows(lines):
+    """Yield (row, error) pairs; a record continues over newlines while it has an open quote.
+
+    Quote state is carried from line to line, so each line is scanned once. A
+    record still open after IMPORT_MAX_LINE characters is reported as one bad
+    row and parsing resumes on the next line.
+    """
+    header = None
+    record = []
+    size = 0
+    quoted = False
+    async for line in lines:
+        record.append(line)
+        size += len(line) + 1
+        quoted = csv_quote_open(line, quoted)
+        if quoted:
+            if size > IMPORT_MAX_LINE:
+                record, size, quoted = [], 0, False
+                yield None, f"Invalid CSV: quoted field runs past {IMPORT_MAX_LINE} characters"
+            continue
+        joined = "\n".join(record)
+        record, size = [], 0
+        if not joined.strip():
+            continue
+        try:
+            values = next(csv.reader([joined]))
+        except csv.Error as e:
+            yield None, f"Invalid CSV: {e}"
+            continue
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        row = {name: value.strip() for name, value in zip(header, values) if value.strip() != ""}
+        for field in CSV_LIST_FIELDS:
+            if field in row:
+                row[field] = [item.strip() for item in row[field].split("|") if item.strip()]
+        yield row, None
+    if record:
+        yield None, "Invalid CSV: unterminated quoted field"
+
+class PropertyImport:
+    """Accumulates validated rows and writes them in unordered bulk batches."""
+
+    def __init__(self, batch_size: int):
+        self.batch_size = batch_size
+        self.ops = []
+        self.op_rows = []
+        self.received = 0
+        self.inserted = 0
+        self.updated = 0
+        self.failed = 0
+        self.errors = []
+
+    def fail(self, row: int, error: str):
+        self.failed += 1
+        if len(self.errors) < IMPORT_MAX_ERRORS:
+            self.errors.append({"row": row, "error": error})
+
+    async def add(self, row: int, raw):
+        self.received += 1
+        try:
+            if not isinstance(raw, dict):
+                raise ValueError("Row must be an object")
+            data = PropertyCreate.model_validate(raw).model_dump()
+        except ValidationError as e:
+            self.fail(row, "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()))
+            return
+        except ValueError as e:
+            self.fail(row, str(e))
+            return
+        data["location_keys"] = location_tokens(data["location"])
+        data["geo"] = geo_point(data["latitude"], data["longitude"])
+        data["updated_at"] = datetime.now(timezone.utc)
+        if data["external_id"]:
+            self.ops.append(UpdateOne(
+                {"external_id": data["external_id"]},
+                {
+                    "$set": data,
+                    "$inc": {"version": 1},
+                    "$setOnInsert": {"id": str(uuid.uuid4()), "created_at": datetime.now(timezone.utc)},
+                },
+                upsert=True,
+            ))
+        else:
+            prop = Property(**data)
+            self.ops.append(InsertOne({
+                **prop.model_dump(),
+                "created_at": data["updated_at"],
+                "location_keys": data["location_keys"],
+                "geo": data["geo"],
+            }))
+        self.op_rows.append(row)
+        if len(self.ops) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self):
+        if not self.ops:
+            return
+        ops, rows = self.ops, self.op_rows
+        self.ops, self.op_rows = [], []
+        try:
+            result = await db.properties.bulk_write(ops, ordered=False)
+            details = result.bulk_api_result
+        except BulkWriteError as e:
+            details = e.details
+            for write_error in details.get("writeErrors", []):
+                self.fail(rows[write_error["index"]], write_error.get("errmsg", "Write failed"))
+        self.inserted += details.get("nInserted", 0) + details.get("nUpserted", 0)
+        self.updated += details.get("nMatched", 0)
+
+    def summary(self) -> dict:
+        return {
+            "received": self.received,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+@api_router.post("/properties/import")
+async def import_properties(
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(ndjson|csv)$")
+):
+    """Stream an NDJSON or CSV body of listings into the catalogue.
+
+    Rows with an external_id upsert the listing with that id; rows without one
+    are inserted. Invalid rows are reported by their 1-based data row number.
+    """
+    if format is None:
+        format = "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+    lines = iter_body_lines(request)
+    rows = iter_csv_rows(lines) if format == "csv" else iter_ndjson_rows(lines)
+    
+    job = PropertyImport(IMPORT_BATCH_SIZE)
+    row_number = 0
+    try:
+        async for raw, error in rows:
+            row_number += 1
+            if error:
+                job.received += 1
+                job.fail(row_number, error)
+                continue
+            await job.add(row_number, raw)
+        await job.flush()
+    finally:
+        if job.inserted or job.updated:
+            clear_property_caches()
+            await collection_versions.bump("properties")
+    return job.summary()
+
+# ==================== RATE LIMITING ====================
+
+def parse_rate(text: str) -> Optional[tuple]:
+    """"<burst>/<seconds>" -> (capacity, tokens refilled per second); empty or "0" turns the limit off."""
+    if not text or text.strip() == "0":
+        return None
+    burst, _, seconds = text.partition("/")
+    capacity = float(burst)
+    return capacity, capacity / float(seconds or 1)
+
+def client_ip(request: Request) -> str:
+    """The caller's address: PROXY_HOPS entries from the right of X-Forwarded-For, else the peer."""
+    forwarded = request.headers.get("x-forwarded-for")
+    if PROXY_HOPS and forwarded:
+        hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()]
+        if hops:
+            return hops[-min(PROXY_HOPS, len(hops))]
+    return request.client.host if request.client else "unknown"
+
+class RateLimiter:
+    """Token buckets keyed by caller, kept in a bounded LRU.
+
+    Each bucket holds up to `capacity` tokens and refills continuously; a
+    request takes one or is refused with the seconds until one is available.
+    Evicting a bucket only ever forgives a caller, never blocks one. With
+    `shared`, buckets also live in the `rate_limits` collection so the limit
+    holds across workers; the local bucket is still checked first and a
+    shared refusal is remembered locally, so refused callers don't reach Mongo.
+    """
+
+    def __init__(self, max_keys: int, shared: bool = False):
+        self.max_keys = max_keys
+        self.shared = shared
+        self._buckets = OrderedDict()  # key -> (tokens, monotonic time, blocked until)
+
+    def _take_local(self, key: str, rate: tuple, now: float) -> float:
+        capacity, refill = rate
+        tokens, updated, blocked_until = self._buckets.pop(key, (capacity, now, 0.0))
+        tokens = min(capacity, tokens + (now - updated) * refill)
+        retry_after = max(blocked_until - now, 0.0)
+        if not retry_after:
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                retry_after = (1 - tokens) / refill
+        self._buckets[key] = (tokens, now, blocked_until)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+    async def _take_shared(self, key: str, rate: tuple) -> float:
+        capacity, refill = rate
+        now = datetime.now(timezone.utc)
+        elapsed = {"$divide": [{"$subtract": [now, {"$ifNull": ["$updated_at", now]}]}, 1000]}
+        bucket = await db.rate_limits.find_one_and_update(
+            {"_id": key},
+            [
+                {"$set": {
+                    "tokens": {"$min": [capacity, {"$add": [{"$ifNull": ["$tokens", capacity]}, {"$multiply": [elapsed, refill]}]}]},
+                    "updated_at": now,
+                    # Gone once it would have refilled completely anyway
+                    "expires_at": now + timedelta(seconds=capacity / refill),
+                }},
+                {"$set": {
+                    "allowed": {"$gte": ["$tokens", 1]},
+                    "tokens": {"$cond": [{"$gte": ["$tokens", 1]}, {"$subtract": ["$tokens", 1]}, "$tokens"]},
+                }},
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        return 0.0 if bucket["allowed"] else (1 - bucket["tokens"]) / refill
+
+    async def check(self, key: str, rate: Optional[tuple]) -> float:
+        """Take a token for `key`; returns 0 if allowed, else the seconds to wait."""
+        if rate is None:
+            return 0.0
+        now = time.monotonic()
+        retry_after = self._take_local(key, rate, now)
+        if retry_after or not self.shared:
+            return retry_after
+        retry_after = await self._take_shared(key, rate)
+        if retry_after:
+            tokens, updated, _ = self._buckets[key]
+            self._buckets[key] = (tokens, updated, now + retry_after)
+        return retry_after
+
+    def stats(self) -> dict:
+        return {"keys": len(self._buckets), "max_keys": self.max_keys, "shared": self.shared}
+
+class IdempotencyStore:
+    """Responses remembered per Idempotency-Key for `ttl` seconds.
+
+    A repeat of a finished request gets the stored response; a repeat of one
+    still running waits for it; reusing a key with a different body is a 422.
+    With `shared`, keys are also claimed in the `idempotency_keys` collection
+    so a retry that lands on another worker is recognised as well.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, shared: bool = False):
+        self.ttl = ttl
+        self.shared = shared
+        self.responses = TTLCache(maxsize, ttl)  # key -> (fingerprint, status, body)
+        self.pending = {}  # key -> (fingerprint, future of (status, body))
+
+    @staticmethod
+    def _check(stored: str, fingerprint: str):
+        if stored != fingerprint:
+            raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+
+    async def lookup(self, key: str, fingerprint: str) -> Optional[tuple]:
+        """(status, body) already known to this process for `key`, waiting for it if still in flight."""
+        stored = self.responses.get(key)
+        if stored is not None:
+            self._check(stored[0], fingerprint)
+            return stored[1:]
+        pending = self.pending.get(key)
+        if pending is not None:
+            self._check(pending[0], fingerprint)
+            return await asyncio.shield(pending[1])
+        return None
+
+    async def claim(self, key: str, fingerprint: str) -> Optional[tuple]:
+        """Reserve `key` for this request, or return the response to replay if someone else holds it."""
+        if key in self.pending or self.responses.get(key) is not None:
+            return await self.lookup(key, fingerprint)
+        self.pending[key] = (fingerprint, asyncio.get_running_loop().create_future())
+        if not self.shared:
+            return None
+        try:
+            try:
+                await db.idempotency_keys.insert_one({
+                    "_id": key,
+                    "fingerprint": fingerprint,
+                    "status": None,
+                    "expires_at": datetime.now(timezone.utc) + timedelta(seconds=self.ttl),
+                })
+                return None
+            except DuplicateKeyError:
+                doc = await db.idempotency_keys.find_one({"_id": key})
+        except BaseException as e:
+            # Never leave the key pending, not even when cancelled: retries would wait on it forever
+            await asyncio.shield(self.fail(key, e))
+            raise
+        if doc is None:
+            return None  # expired in between; this request goes ahead
+        try:
+            self._check(doc["fingerprint"], fingerprint)
+            if doc["status"] is None:
+                raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+        except HTTPException as e:
+            await self.fail(key, e, release=False)
+            raise
+        await self.complete(key, doc["status"], doc["body"], store=False)
+        return doc["status"], doc["body"]
+
+    async def complete(self, key: str, status: int, body, store: bool = True):
+        fingerprint, future = self.pending.pop(key)
+        self.responses.set(key, (fingerprint, status, body))
+        future.set_result((status, body))
+        if self.shared and store:
+            await db.idempotency_keys.update_one({"_id": key}, {"$set": {"status": status, "body": body}})
+
+    async def fail(self, key: str, error: BaseException, release: bool = True):
+        """Let the key be retried after the request failed; waiting duplicates get the same error."""
+        if not isinstance(error, Exception):
+            # Cancelled: duplicates waiting on it should retry, not be cancelled along with it
+            error = HTTPException(status_code=409, detail="The request with this Idempotency-Key was interrupted, please retry")
+        _, future = self.pending.pop(key)
+        future.set_exception(error)
+        future.exception()  # retrieved, even if nobody was waiting
+        if self.shared and release:
+            await db.idempotency_keys.delete_one({"_id": key, "status": None})
+
+inquiry_limits = {"ip": parse_rate(INQUIRY_LIMIT_PER_IP), "email": parse_rate(INQUIRY_LIMIT_PER_EMAIL)}
+rate_limiter = RateLimiter(RATE_LIMIT_MAX_KEYS, shared=RATE_LIMIT_STORE == "mongo")
+idempotency_store = IdempotencyStore(IDEMPOTENCY_CACHE_SIZE, IDEMPOTENCY_TTL, shared=RATE_LIMIT_STORE == "mongo")
+
+async def enforce_rate_limit(limit: str, key: str):
+    retry_after = await rate_limiter.check(f"{limit}:{key}", inquiry_limits[limit])
+    if retry_after:
+        rate_limit_rejections.inc(limit)
+        raise HTTPException(status_code=429, detail="Too many requests, please try again later",
+                            headers={"Retry-After": str(math.ceil(retry_after))})
+
 # ==================== INQUIRY ENDPOINTS ====================
 
-@api_router.post("/inquiries", response_model=Inquiry)
-async def create_inquiry(inquiry_data: InquiryCreate):
+async def save_inquiry(inquiry_data: InquiryCreate) -> Inquiry:
     inquiry = Inquiry(**inquiry_data.model_dump())
     doc = inquiry.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
-    await db.inquiries.insert_one(doc)
+    doc.update(inquiry_keys(doc))
     
-    # Send email notification if configured
-    if resend.api_key and NOTIFICATION_EMAIL:
+    # Queue the email notification (if configured) with the inquiry; the outbox
+    # worker sends it, so a slow or failing mail provider never blocks the form
+    started = time.perf_counter()
+    if not mail_sender:
+        await db.inquiries.insert_one(doc)
+    elif TRANSACTIONS_SUPPORTED:
+        async with await client.start_session() as session:
+            async with session.start_transaction():
+                await db.inquiries.insert_one(doc, session=session)
+                await outbox_worker.enqueue(inquiry_email_params(inquiry), key=f"inquiry:{inquiry.id}", session=session)
+        outbox_worker.notify()
+    else:
+        # Without transactions the inquiry is marked until its outbox record
+        # exists, so a failed enqueue is left to the worker's sweep instead of
+        # failing a request whose inquiry is already saved
+        doc["notification_pending"] = True
+        await db.inquiries.insert_one(doc)
         try:
-            property_info = ""
-            if inquiry_data.property_title:
-                property_info = f"<p><strong>Property:</strong> {inquiry_data.property_title}</p>"
-            
-            html_content = f"""
-            <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
-                <h2 style="color: #050505;">New Property Inquiry</h2>
-                {property_info}
-                <p><strong>Name:</strong> {inquiry_data.name}</p>
-                <p><strong>Email:</strong> {inquiry_data.email}</p>
-                <p><strong>Phone:</strong> {inquiry_data.phone or 'Not provided'}</p>
-                <p><strong>Message:</strong></p>
-                <p style="background: #f5f5f4; padding: 15px; border-left: 3px solid #E5D0AC;">{inquiry_data.message}</p>
-            </div>
-            """
-            
-            params = {
-                "from": SENDER_EMAIL,
-                "to": [NOTIFICATION_EMAIL],
-                "subject": f"New Inquiry: {inquiry_data.property_title or 'General Contact'}",
-                "html": html_content
-            }
-            await asyncio.to_thread(resend.Emails.send, params)
-            logger.info(f"Email notification sent for inquiry {inquiry.id}")
-        except Exception as e:
-            logger.error(f"Failed to send email notification: {str(e)}")
+            await enqueue_inquiry_notification(inquiry)
+        except PyMongoError as e:
+            logger.error(f"Queueing the notification for inquiry {inquiry.id} failed, leaving it to the sweep: {str(e)}")
+        outbox_worker.notify()
+    if mail_sender:
+        email_enqueue_duration.observe(time.perf_counter() - started)
+    
+    await collection_versions.bump("inquiries")
+    return inquiry
+
+def idempotent_replay(status: int, body) -> Response:
+    return FastJSONResponse(body, status_code=status, headers={"Idempotent-Replayed": "true"})
+
+@api_router.post("/inquiries", response_model=Inquiry)
+async def create_inquiry(
+    inquiry_data: InquiryCreate,
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, max_length=255)
+):
+    key = fingerprint = None
+    if idempotency_key:
+        key = f"inquiries:{idempotency_key}"
+        fingerprint = hashlib.sha256(inquiry_data.model_dump_json().encode()).hexdigest()
+        replay = await idempotency_store.lookup(key, fingerprint)
+        if replay:
+            return idempotent_replay(*replay)
+    # Refused before anything is written or sent
+    await enforce_rate_limit("ip", client_ip(request))
+    await enforce_rate_limit("email", inquiry_data.email.lower())
+    if key:
+        replay = await idempotency_store.claim(key, fingerprint)
+        if replay:
+            return idempotent_replay(*replay)
     
+    try:
+        inquiry = await save_inquiry(inquiry_data)
+    except BaseException as e:
+        # Including cancellation (client gone, worker stopping), which would otherwise
+        # hold the key until it expires and refuse every retry
+        if key:
+            await asyncio.shield(idempotency_store.fail(key, e))
+        raise
+    if key:
+        await idempotency_store.complete(key, 200, inquiry.model_dump(mode="json"))
     return inquiry
 
 @api_router.get("/inquiries", response_model=List[Inquiry])
-async def get_inquiries():
-    inquiries = await db.inquiries.find({}, {"_id": 0}).sort("created_at", -1).to_list(100)
-    for inq in inquiries:
-        if isinstance(inq.get('created_at'), str):
-            inq['created_at'] = datetime.fromisoformat(inq['created_at'])
-    return inquiries
+async def get_inquiries(
+    request: Request,
+    property_id: Optional[str] = Query(None),
+    email: Optional[str] = Query(None),
+    since: Optional[datetime] = Query(None, description="inclusive"),
+    until: Optional[datetime] = Query(None, description="exclusive"),
+    q: Optional[str] = Query(None, max_length=200, description="words from the name or message"),
+    limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(None)
+):
+    version, last_modified = await collection_versions.get("inquiries")
+    etag = f'"inquiries-{version}"'
+    headers = cache_validators(etag, last_modified, CACHE_CONTROL_INQUIRIES)
+    if not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    
+    query = build_inquiry_query(property_id, email, since, until, q)
+    if cursor:
+        after = keyset_filter("created_at", -1, cursor)
+        query = {"$and": [query, after]} if query else after
+    # Fetch one extra row to learn whether another page exists
+    inquiries = await db.inquiries.find(query, INQUIRY_PROJECTION).sort(
+        [("created_at", -1), ("id", -1)]
+    ).limit(limit + 1).to_list(limit + 1)
+    if len(inquiries) > limit:
+        inquiries = inquiries[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(inquiries[-1]["created_at"], inquiries[-1]["id"])
+    return FastJSONResponse(inquiries, headers=headers)
+
+@api_router.get("/inquiries/summary")
+async def get_inquiry_summary(
+    request: Request,
+    since: Optional[datetime] = Query(None, description="inclusive"),
+    until: Optional[datetime] = Query(None, description="exclusive"),
+    limit: int = Query(100, ge=1, le=1000)
+):
+    """Inquiry count and latest inquiry per listing, busiest first, in one aggregation."""
+    version, last_modified = await collection_versions.get("inquiries")
+    property_version, _ = await collection_versions.get("properties")
+    etag = f'"inquiries-{version}-properties-{property_version}"'
+    headers = cache_validators(etag, last_modified, CACHE_CONTROL_INQUIRIES)
+    if not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    
+    cache_key = (version, property_version, since, until, limit)
+    summary = inquiry_summary_cache.get(cache_key)
+    if summary is None:
+        pipeline = [
+            {"$match": build_inquiry_query(since=since, until=until)},
+            # Sorting on property_id first lets the group read the (property_id,
+            # created_at, id) index alone instead of fetching every inquiry
+            {"$sort": {"property_id": 1, "created_at": -1}},
+            {"$group": {"_id": "$property_id", "count": {"$sum": 1}, "latest": {"$first": "$created_at"}}},
+            {"$sort": {"count": -1, "_id": 1}},
+            {"$limit": limit},
+            {"$lookup": {
+                "from": "properties",
+                "localField": "_id",
+                "foreignField": "id",
+                "as": "property",
+            }},
+            {"$project": {
+                "_id": 0,
+                "property_id": "$_id",
+                "title": {"$arrayElemAt": ["$property.title", 0]},
+                "count": 1,
+                "latest": 1,
+            }},
+        ]
+        summary = await db.inquiries.aggregate(pipeline).to_list(limit)
+        inquiry_summary_cache.set(cache_key, summary)
+    return FastJSONResponse(summary, headers=headers)
 
 @api_router.delete("/inquiries/{inquiry_id}")
 async def delete_inquiry(inquiry_id: str):
     result = await db.inquiries.delete_one({"id": inquiry_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Inquiry not found")
+    await record_deletions("inquiries", [inquiry_id])
+    await collection_versions.bump("inquiries")
     return {"message": "Inquiry deleted successfully"}
 
+# ==================== BULK ADMIN ====================
+
+def unique_ids(ids: List[str]) -> List[str]:
+    return list(dict.fromkeys(ids))
+
+def bulk_price(price: int, change: PropertyBulkUpdate) -> int:
+    if change.price is not None:
+        return change.price
+    if change.price_percent is not None:
+        return round(price * (1 + change.price_percent / 100))
+    return price + change.price_delta
+
+@api_router.post("/properties/bulk-update")
+async def bulk_update_properties(change: PropertyBulkUpdate):
+    """Apply one change to many listings in a single unordered bulk write.
+
+    Each listing is only written if its version is still the one that was read,
+    so a relative price change is never applied on top of a price that moved in
+    between. Unknown ids and listings changed concurrently are returned in
+    `errors`; `items` carries the new version, price and flags of the rest.
+    """
+    price_changes = [v for v in (change.price, change.price_percent, change.price_delta) if v is not None]
+    if len(price_changes) > 1:
+        raise HTTPException(status_code=400, detail="Give only one of price, price_percent and price_delta")
+    fields = {k: v for k, v in change.model_dump(include={"featured", "property_type"}).items() if v is not None}
+    if not fields and not price_changes:
+        raise HTTPException(status_code=400, detail="Nothing to update")
+    
+    ids = unique_ids(change.ids)
+    existing = {doc["id"]: doc for doc in await db.properties.find({"id": {"$in": ids}}, {"_id": 0}).to_list(len(ids))}
+    now = datetime.now(timezone.utc)
+    errors = []
+    ops = []
+    changes = []
+    for property_id in ids:
+        doc = existing.get(property_id)
+        if doc is None:
+            errors.append({"id": property_id, "error": "Property not found"})
+            continue
+        update_data = dict(fields)
+        if price_changes:
+            update_data["price"] = bulk_price(doc.get("price", 0), change)
+            if update_data["price"] <= 0:
+                errors.append({"id": property_id, "error": "Price must stay above zero"})
+                continue
+        update_data["updated_at"] = now
+        version = doc.get("version", 1)
+        ops.append(UpdateOne({"id": property_id, "version": version}, {"$set": update_data, "$inc": {"version": 1}}))
+        changes.append((doc, {**doc, **update_data, "version": version + 1}))
+    
+    if ops:
+        try:
+            matched = (await db.properties.bulk_write(ops, ordered=False)).matched_count
+        except BulkWriteError as e:
+            failed = {write_error["index"]: write_error.get("errmsg", "Write failed") for write_error in e.details.get("writeErrors", [])}
+            errors += [{"id": changes[index][0]["id"], "error": message} for index, message in failed.items()]
+            changes = [pair for index, pair in enumerate(changes) if index not in failed]
+            matched = e.details.get("nMatched", 0)
+        if matched < len(changes):
+            # Some were written by someone else after they were read: those didn't match
+            current = {doc["id"]: doc.get("version") for doc in await db.properties.find(
+                {"id": {"$in": [old["id"] for old, _ in changes]}}, {"_id": 0, "id": 1, "version": 1}
+            ).to_list(len(changes))}
+            errors += [{"id": old["id"], "error": "Property was modified by someone else"}
+                       for old, new in changes if current.get(old["id"]) != new["version"]]
+            changes = [(old, new) for old, new in changes if current.get(old["id"]) == new["version"]]
+        if changes:
+            properties_changed(changes)
+            await collection_versions.bump("properties")
+    return {
+        "requested": len(ids),
+        "updated": len(changes),
+        "failed": len(errors),
+        "errors": errors,
+        "items": [
+            {key: new.get(key) for key in ("id", "version", "price", "featured", "property_type", "updated_at")}
+            for _, new in changes
+        ],
+    }
+
+@api_router.post("/properties/bulk-delete")
+async def bulk_delete_properties(body: BulkIds):
+    """Delete many listings with one delete_many; unknown ids are returned in `errors`."""
+    ids = unique_ids(body.ids)
+    found = await db.properties.find({"id": {"$in": ids}}, {"_id": 0, "id": 1}).to_list(len(ids))
+    found_ids = {doc["id"] for doc in found}
+    errors = [{"id": property_id, "error": "Property not found"} for property_id in ids if property_id not in found_ids]
+    deleted = 0
+    if found_ids:
+        deleted = (await db.properties.delete_many({"id": {"$in": list(found_ids)}})).deleted_count
+        properties_changed([(doc, None) for doc in found])
+        await record_deletions("properties", list(found_ids))
+        await collection_versions.bump("properties")
+    return {"requested": len(ids), "deleted": deleted, "failed": len(errors), "errors": errors}
+
+@api_router.post("/inquiries/bulk-delete")
+async def bulk_delete_inquiries(body: InquiryBulkDelete):
+    """Delete inquiries by id, by created_at window, or the ids within a window.
+
+    Listed ids that don't exist (or fall outside the window) are returned in `errors`.
+    """
+    if body.ids is None and body.since is None and body.until is None:
+        raise HTTPException(status_code=400, detail="Give ids, since or until")
+    query = {}
+    if body.since is not None or body.until is not None:
+        query["created_at"] = {}
+        if body.since is not None:
+            query["created_at"]["$gte"] = as_utc(body.since)
+        if body.until is not None:
+            query["created_at"]["$lt"] = as_utc(body.until)
+    if body.ids is None:
+        # A window can cover most of the inbox: delete it in one statement and
+        # leave a single range tombstone instead of one per inquiry
+        deleted = (await db.inquiries.delete_many(query)).deleted_count
+        if deleted:
+            await record_range_deletion("inquiries", body.since, body.until)
+            await collection_versions.bump("inquiries")
+        return {"deleted": deleted, "failed": 0, "errors": []}
+    ids = unique_ids(body.ids)
+    query["id"] = {"$in": ids}
+    # At most BULK_MAX_IDS, and the ids are needed anyway for the change feed's tombstones
+    found_ids = [doc["id"] for doc in await db.inquiries.find(query, {"_id": 0, "id": 1}).to_list(None)]
+    found = set(found_ids)
+    errors = [{"id": inquiry_id, "error": "Inquiry not found"} for inquiry_id in ids if inquiry_id not in found]
+    deleted = 0
+    if found_ids:
+        deleted = (await db.inquiries.delete_many({"id": {"$in": found_ids}})).deleted_count
+        await record_deletions("inquiries", found_ids)
+        await collection_versions.bump("inquiries")
+    return {"deleted": deleted, "failed": len(errors), "errors": errors}
+
+# ==================== CHANGE FEED ====================
+
+# Collections clients can follow, with the field that stamps their writes (used when polling)
+CHANGE_FEED_COLLECTIONS = {"properties": "updated_at", "inquiries": "created_at"}
+CHANGE_FEED_HIDDEN = ("_id", "location_keys", "geo", "email_key", "search_keys", "notification_pending")
+# Polling re-reads this far behind its watermark to catch writes stamped by a lagging clock
+CHANGE_FEED_POLL_OVERLAP = timedelta(seconds=5)
+
+async def record_deletions(collection: str, ids: List[str]):
+    """Leave tombstones for the change feed; a change stream's delete event only carries the Mongo _id."""
+    if ids:
+        now = datetime.now(timezone.utc)
+        await db.deletions.insert_many([{"collection": collection, "id": doc_id, "deleted_at": now} for doc_id in ids])
+
+async def record_range_deletion(collection: str, since: Optional[datetime], until: Optional[datetime]):
+    """One tombstone for a created_at window; the feed turns it into a reset for that collection."""
+    await db.deletions.insert_one({
+        "collection": collection, "id": None, "since": since, "until": until, "deleted_at": datetime.now(timezone.utc),
+    })
+
+def deletion_event(doc: dict) -> dict:
+    if doc.get("id") is None:
+        return {"op": "reset", "collection": doc["collection"], "since": doc.get("since"), "until": doc.get("until")}
+    return {"op": "delete", "collection": doc["collection"], "id": doc["id"]}
+
+def feed_document(doc: dict) -> dict:
+    return {key: value for key, value in doc.items() if key not in CHANGE_FEED_HIDDEN}
+
+def sse_message(event_id: str, event: dict) -> bytes:
+    return b"id: %s\nevent: %s\ndata: %s\n\n" % (event_id.encode(), event["op"].encode(), orjson.dumps(event))
+
+def sse_keep_alive(event_id: Optional[str]) -> bytes:
+    """A comment that also moves the client's Last-Event-ID up to `event_id`."""
+    if event_id is None:
+        return b": keep-alive\n\n"
+    return b"id: %s\n: keep-alive\n\n" % event_id.encode()
+
+class FeedSubscriber:
+    """One SSE client: a bounded backlog that collapses into a reset when the client falls behind."""
+
+    def __init__(self, collections: set, maxsize: int):
+        self.collections = collections
+        self.maxsize = maxsize
+        self.events = deque()
+        self.reset = False
+        self.closed = False
+        self.ready = asyncio.Event()
+
+    def push(self, event_id: str, event: dict):
+        if event["collection"] not in self.collections:
+            return
+        if len(self.events) >= self.maxsize:
+            self.push_reset()
+            return
+        self.events.append((event_id, event))
+        self.ready.set()
+
+    def push_reset(self):
+        self.events.clear()
+        self.reset = True
+        self.ready.set()
+
+    def close(self):
+        self.closed = True
+        self.ready.set()
+
+class ChangeFeed:
+    """Fans one stream of insert/update/delete deltas out to every SSE client of this process.
+
+    On a replica set or mongos the deltas come from a change stream and its
+    resume tokens are the SSE event ids; on a standalone mongod the
+    collections are polled by their write stamps instead. Deletes are read
+    from the `deletions` tombstones in both modes. The last `history` events
+    are kept so a reconnecting client replays what it missed after its
+    Last-Event-ID; a client further behind than that is sent a reset and
+    refetches. History starts with an origin entry carrying no event, so
+    `head` always names a point a client can resume from, even before the
+    first delta. The feed runs while someone is listening and stops
+    `idle_grace` seconds after the last client leaves, forgetting its history.
+    """
+
+    def __init__(self, history: int = 1000, queue_size: int = 500, poll_interval: float = 2.0,
+                 idle_grace: float = 30.0):
+        self.history = deque(maxlen=history)
+        self.queue_size = queue_size
+        self.poll_interval = poll_interval
+        self.idle_grace = idle_grace
+        self.subscribers = set()
+        self.mode = None
+        self._task = None
+        self._idle_timer = None
+        self._resume_token = None
+        self._epoch = uuid.uuid4().hex[:8]  # keeps polling event ids unique across restarts
+        self._sequence = 0
+
+    def subscribe(self, collections: set, last_event_id: Optional[str]) -> FeedSubscriber:
+        subscriber = FeedSubscriber(collections, self.queue_size)
+        if last_event_id is not None:
+            ids = [event_id for event_id, _ in self.history]
+            if last_event_id in ids:
+                for event_id, event in list(self.history)[ids.index(last_event_id) + 1:]:
+                    if event is not None:
+                        subscriber.push(event_id, event)
+            else:
+                subscriber.push_reset()
+        self.subscribers.add(subscriber)
+        if self._idle_timer:
+            self._idle_timer.cancel()
+            self._idle_timer = None
+        if self._task is None or self._task.done():
+            self._mark_origin()
+            self._task = asyncio.create_task(self._run())
+        return subscriber
+
+    @property
+    def head(self) -> Optional[str]:
+        """Id of the newest history entry; a client that has seen everything can resume from it."""
+        return self.history[-1][0] if self.history else None
+
+    def _mark_origin(self):
+        self._sequence += 1
+        self.history.append((f"{self._epoch}-{self._sequence}", None))
+
+    def unsubscribe(self, subscriber: FeedSubscriber):
+        self.subscribers.discard(subscriber)
+        if not self.subscribers and self._task and not self._idle_timer:
+            self._idle_timer = asyncio.get_running_loop().call_later(self.idle_grace, self._stop_if_idle)
+
+    def _stop_if_idle(self):
+        self._idle_timer = None
+        if self.subscribers or not self._task:
+            return
+        self._task.cancel()
+        self._task = None
+        # Nothing is recorded while stopped, so old event ids can no longer be replayed
+        self._resume_token = None
+        self.history.clear()
+        logger.info("Change feed stopped: no subscribers")
+
+    def publish(self, event_id: str, event: dict):
+        self.history.append((event_id, event))
+        for subscriber in list(self.subscribers):
+            subscriber.push(event_id, event)
+
+    def reset(self):
+        """Tell every client its view may have gaps, e.g. after losing the change stream's place."""
+        self.history.clear()
+        self._mark_origin()
+        for subscriber in list(self.subscribers):
+            subscriber.push_reset()
+
+    async def stop(self):
+        for subscriber in list(self.subscribers):
+            subscriber.close()
+        if self._idle_timer:
+            self._idle_timer.cancel()
+            self._idle_timer = None
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        # Change streams need the same replica set or mongos as transactions
+        self.mode = "change_stream" if TRANSACTIONS_SUPPORTED else "polling"
+        logger.info(f"Change feed started ({self.mode})")
+        while True:
+            try:
+                if self.mode == "change_stream":
+                    await self._watch()
+                else:
+                    await self._poll()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Change feed {self.mode} failed: {str(e)}")
+                if isinstance(e, OperationFailure) and self._resume_token is not None:
+                    # Most likely the token fell off the oplog: start again from now
+                    self._resume_token = None
+                    self.reset()
+                await asyncio.sleep(self.poll_interval)
+
+    async def _watch(self):
+        pipeline = [{"$match": {
+            "ns.coll": {"$in": [*CHANGE_FEED_COLLECTIONS, "deletions"]},
+            "operationType": {"$in": ["insert", "update", "replace"]},
+        }}]
+        async with db.watch(pipeline, full_document="updateLookup", resume_after=self._resume_token) as stream:
+            async for change in stream:
+                self._resume_token = change["_id"]
+                event = self._change_event(change)
+                if event:
+                    self.publish(change["_id"]["_data"], event)
+
+    def _change_event(self, change: dict) -> Optional[dict]:
+        collection = change["ns"]["coll"]
+        doc = change.get("fullDocument")
+        if doc is None:
+            return None  # deleted before the update could be looked up; its tombstone follows
+        if collection == "deletions":
+            return deletion_event(doc)
+        if change["operationType"] == "insert":
+            return {"op": "insert", "collection": collection, "id": doc["id"], "doc": feed_document(doc)}
+        if change["operationType"] == "replace":
+            return {"op": "update", "collection": collection, "id": doc["id"], "fields": feed_document(doc)}
+        # Send whole top-level fields, so array pushes and dotted paths need no patching on the client
+        description = change["updateDescription"]
+        names = {path.split(".")[0] for path in [*description.get("updatedFields", {}), *description.get("removedFields", [])]}
+        fields = {name: doc[name] for name in names if name in doc and name not in CHANGE_FEED_HIDDEN}
+        if not fields:
+            return None
+        return {"op": "update", "collection": collection, "id": doc["id"], "fields": fields}
+
+    async def _poll(self):
+        sources = {**CHANGE_FEED_COLLECTIONS, "deletions": "deleted_at"}
+        watermarks = {name: datetime.now(timezone.utc) for name in sources}
+        floors = dict(watermarks)  # nothing before this is published again
+        seen = {}  # (collection, id, stamp) already published, for the overlap window
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            for name, field in sources.items():
+                since = max(watermarks[name] - CHANGE_FEED_POLL_OVERLAP, floors[name])
+                docs = await db[name].find(
+                    {field: {"$gt": since}}, FULL_PROJECTION if name == "properties" else {"_id": 0}
+                ).sort(field, ASCENDING).limit(self.queue_size + 1).to_list(self.queue_size + 1)
+                if len(docs) > self.queue_size:
+                    # A bulk write: cheaper for clients to refetch than to replay
+                    watermarks[name] = floors[name] = datetime.now(timezone.utc)
+                    self.reset()
+                    continue
+                for doc in docs:
+                    stamp = as_utc(doc[field])
+                    key = (name, doc.get("id"), stamp)
+                    watermarks[name] = max(watermarks[name], stamp)
+                    if key in seen:
+                        continue
+                    seen[key] = stamp
+                    self._sequence += 1
+                    self.publish(f"{self._epoch}-{self._sequence}", self._polled_event(name, doc))
+            horizon = min(watermarks.values()) - CHANGE_FEED_POLL_OVERLAP
+            seen = {key: stamp for key, stamp in seen.items() if stamp > horizon}
+
+    def _polled_event(self, name: str, doc: dict) -> dict:
+        if name == "deletions":
+            return deletion_event(doc)
+        if name == "properties" and doc.get("version", 1) > 1:
+            return {"op": "update", "collection": name, "id": doc["id"], "fields": feed_document(doc)}
+        return {"op": "insert", "collection": name, "id": doc["id"], "doc": feed_document(doc)}
+
+change_feed = ChangeFeed(CHANGE_FEED_HISTORY, CHANGE_FEED_QUEUE, CHANGE_FEED_POLL_INTERVAL, CHANGE_FEED_IDLE_GRACE)
+
+@api_router.get("/changes")
+async def stream_changes(
+    collections: str = Query(",".join(CHANGE_FEED_COLLECTIONS), description="comma-separated"),
+    last_event_id: Optional[str] = Header(None)
+):
+    """Server-sent insert/update/delete deltas for listings and inquiries.
+
+    Each event is named after its op and carries the document id: inserts have
+    the document, updates the changed top-level fields and deletes nothing
+    more. A `reset` event means deltas were lost, or a created_at window of the
+    collection was deleted at once, and the client should refetch.
+    Streams end after CHANGE_FEED_MAX_AGE and EventSource reconnects with
+    Last-Event-ID, which keeps workers draining on restarts. Whenever the
+    client is caught up, on connect and with each keep-alive, it is sent the
+    feed's head id, so a stream that never carried an event still resumes
+    from where it was rather than silently skipping the gap.
+    """
+    names = {name.strip() for name in collections.split(",") if name.strip()}
+    if not names or names - set(CHANGE_FEED_COLLECTIONS):
+        raise HTTPException(status_code=400, detail=f"collections must be among {', '.join(CHANGE_FEED_COLLECTIONS)}")
+    subscriber = change_feed.subscribe(names, last_event_id)
+    
+    async def events():
+        deadline = time.monotonic() + CHANGE_FEED_MAX_AGE
+        try:
+            yield b"retry: 3000\n\n"
+            if not subscriber.events and not subscriber.reset:
+                yield sse_keep_alive(change_feed.head)
+            while not subscriber.closed and time.monotonic() < deadline:
+                if not subscriber.events and not subscriber.reset:
+                    subscriber.ready.clear()
+                    try:
+                        await asyncio.wait_for(subscriber.ready.wait(), CHANGE_FEED_HEARTBEAT)
+                    except asyncio.TimeoutError:
+                        # Nothing was pushed, so the client has everything up to the head
+                        yield sse_keep_alive(change_feed.head)
+                        continue
+                if subscriber.reset:
+                    subscriber.reset = False
+                    yield b"event: reset\ndata: {}\n\n"
+                while subscriber.events:
+                    yield sse_message(*subscriber.events.popleft())
+        finally:
+            change_feed.unsubscribe(subscriber)
+    
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+# ==================== CACHE STATS ====================
+
+@api_router.get("/cache/stats")
+async def get_cache_stats():
+    return {
+        "properties": property_cache.stats(),
+        "listings": listing_cache.stats(),
+        "facets": facet_cache.stats(),
+        "inquiry_summary": inquiry_summary_cache.stats(),
+        "similar": similar_index.stats(),
+        "rate_limits": rate_limiter.stats(),
+        "idempotency": idempotency_store.responses.stats(),
+    }
+
+# ==================== SYNTHETIC DATA ====================
+
+SYNTHETIC_LOCATIONS_FILE = ROOT_DIR / "data" / "synthetic_locations.csv"
+# type: (share of listings, median area in sq ft, area spread (lognormal sigma), price multiplier, feature multiplier)
+SYNTHETIC_TYPES = {
+    "apartment": (0.35, 2200, 0.35, 1.00, 0.7),
+    "penthouse": (0.20, 5200, 0.35, 1.35, 1.0),
+    "villa": (0.30, 7500, 0.40, 1.10, 1.2),
+    "estate": (0.15, 15000, 0.45, 1.20, 1.5),
+}
+# feature: chance a mid-range listing has it
+SYNTHETIC_FEATURES = {
+    "Smart Home": 0.55, "Gym": 0.40, "Wine Cellar": 0.35, "Infinity Pool": 0.30, "Concierge": 0.30,
+    "Home Theater": 0.25, "Spa": 0.25, "Rooftop Terrace": 0.25, "Sea Views": 0.20, "Guest House": 0.20,
+    "Staff Quarters": 0.20, "Library": 0.15, "Private Elevator": 0.15, "Motor Court": 0.15,
+    "Tennis Court": 0.08, "Private Beach": 0.05, "Helipad": 0.02,
+}
+SYNTHETIC_TITLE_WORDS = ["Azure", "Obsidian", "Ivory", "Golden", "Silver", "Cedar", "Marble", "Coral",
+                         "Willow", "Amber", "Onyx", "Sapphire", "Meridian", "Solstice", "Harbour", "Alder"]
+SYNTHETIC_TITLE_NOUNS = {
+    "apartment": ["Residence", "Apartment", "Loft", "Suite"],
+    "penthouse": ["Penthouse", "Sky Residence", "Tower Suite"],
+    "villa": ["Villa", "Retreat", "House", "Pavilion"],
+    "estate": ["Estate", "Manor", "Domaine", "Ranch"],
+}
+SYNTHETIC_DESCRIPTIONS = [
+    "Floor-to-ceiling glass frames uninterrupted views across the skyline.",
+    "Hand-finished stone and timber lend every room a quiet, enduring warmth.",
+    "Landscaped gardens and a private terrace make outdoor living effortless.",
+    "Recently restored with meticulous attention to the original architecture.",
+    "Generous entertaining spaces flow onto sunlit terraces and a heated pool.",
+    "Set behind gated grounds, the residence offers complete privacy.",
+]
+SYNTHETIC_IMAGES = [
+    "https://images.unsplash.com/photo-1512917774080-9991f1c4c750?w=1200",
+    "https://images.unsplash.com/photo-1564013799919-ab600027ffc6?w=1200",
+    "https://images.unsplash.com/photo-1600047509807-ba8f99d2cdde?w=1200",
+    "https://images.unsplash.com/photo-1600210492493-0946911123ea?w=1200",
+    "https://images.unsplash.com/photo-1600566752355-35792bedcfea?w=1200",
+    "https://images.unsplash.com/photo-1600566753086-00f18fb6b3ea?w=1200",
+    "https://images.unsplash.com/photo-1600566753190-17f0baa2a6c3?w=1200",
+    "https://images.unsplash.com/photo-1600573472550-8090b5e0745e?w=1200",
+    "https://images.unsplash.com/photo-1600585154340-be6161a56a0c?w=1200",
+    "https://images.unsplash.com/photo-1600585154526-990dced4db0d?w=1200",
+    "https://images.unsplash.com/photo-1600596542815-ffad4c1539a9?w=1200",
+    "https://images.unsplash.com/photo-1600607687644-c7171b42498f?w=1200",
+    "https://images.unsplash.com/photo-1600607687939-ce8a6c25118c?w=1200",
+    "https://images.unsplash.com/photo-1613490493576-7fde63acd811?w=1200",
+]
+SYNTHETIC_FIRST_NAMES = ["Amelia", "Hugo", "Sofia", "Kenji", "Isabel", "Omar", "Clara", "Luca", "Nadia", "Felix",
+                         "Priya", "Mateo", "Ingrid", "Tariq", "Chloe", "Anders", "Yara", "Julian", "Mei", "Rafael"]
+SYNTHETIC_LAST_NAMES = ["Laurent", "Okafor", "Rossi", "Tanaka", "Moreau", "Haddad", "Lindqvist", "Novak",
+                        "Castellanos", "Whitfield", "Chen", "Albrecht", "Mensah", "Duarte", "Kowalski", "Sato"]
+SYNTHETIC_MESSAGES = [
+    "I would like to arrange a private viewing of {title}.",
+    "Could you share the floor plans and recent utility costs?",
+    "Is the seller open to offers below the asking price?",
+    "We are relocating next spring and {title} looks ideal for our family.",
+    "Please send details on financing options and closing timelines.",
+    "Is a weekend viewing possible? I will be in {city} briefly.",
+    "My broker will be in touch, but I wanted to register interest directly.",
+    "Are furnishings included in the sale?",
+]
+SYNTHETIC_MAX_AGE_DAYS = 730  # listings are spread over the last two years
+SYNTHETIC_SAMPLE_LISTINGS = 10000  # existing listings inquiries are spread over when no listings are generated
+
+def synthetic_locations() -> dict:
+    """The weighted location table as arrays, read once."""
+    global _synthetic_locations
+    if _synthetic_locations is None:
+        with open(SYNTHETIC_LOCATIONS_FILE, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        weights = np.array([float(row["weight"]) for row in rows])
+        _synthetic_locations = {
+            "names": [row["location"] for row in rows],
+            "keys": [location_tokens(row["location"]) for row in rows],
+            "latitude": np.array([float(row["latitude"]) for row in rows]),
+            "longitude": np.array([float(row["longitude"]) for row in rows]),
+            "price_per_sqft": np.array([float(row["price_per_sqft"]) for row in rows]),
+            "p": weights / weights.sum(),
+        }
+    return _synthetic_locations
+
+_synthetic_locations = None
+
+def synthetic_timestamps(seconds_ago: np.ndarray, now: datetime) -> List[datetime]:
+    base = now.timestamp()
+    return [datetime.fromtimestamp(base - s, timezone.utc) for s in seconds_ago.tolist()]
+
+def synthetic_properties(rng: np.random.Generator, count: int, now: datetime) -> List[dict]:
+    """Generate `count` listings column by column.
+
+    Area is lognormal around a per-type median; price follows area times the
+    location's price per sq ft and the type's premium, with lognormal noise.
+    Bedrooms track area, and larger types carry more features.
+    """
+    locations = synthetic_locations()
+    type_names = list(SYNTHETIC_TYPES)
+    type_params = np.array(list(SYNTHETIC_TYPES.values()))
+    feature_names = np.array(list(SYNTHETIC_FEATURES), dtype=object)
+    feature_p = np.array(list(SYNTHETIC_FEATURES.values()))
+
+    loc = rng.choice(len(locations["names"]), size=count, p=locations["p"])
+    kind = rng.choice(len(type_names), size=count, p=type_params[:, 0] / type_params[:, 0].sum())
+    area = np.clip(np.round(type_params[kind, 1] * rng.lognormal(0, type_params[kind, 2]), -1), 500, 60000)
+    bedrooms = np.clip(np.rint(1 + area / 2000 + rng.normal(0, 0.8, count)), 1, 14)
+    bathrooms = np.clip(bedrooms + rng.integers(-1, 3, count), 1, 16)
+    price = np.maximum(np.round(area * locations["price_per_sqft"][loc] * type_params[kind, 3]
+                                * rng.lognormal(0, 0.25, count), -4), 100000)
+    # The priciest listings are the ones an agency chooses to feature
+    featured = rng.random(count) < np.where(price > np.quantile(price, 0.9), 0.15, 0.01)
+    has_feature = rng.random((count, len(feature_p))) < np.minimum(np.outer(type_params[kind, 4], feature_p), 0.95)
+    features = np.split(np.nonzero(has_feature)[1], np.cumsum(has_feature.sum(axis=1))[:-1])
+    # About 1 km of scatter around each location's centre
+    latitude = np.round(locations["latitude"][loc] + rng.normal(0, 0.01, count), 5)
+    longitude = np.round(locations["longitude"][loc] + rng.normal(0, 0.01, count)
+                         / np.cos(np.radians(locations["latitude"][loc])), 5)
+    images = rng.random((count, len(SYNTHETIC_IMAGES))).argsort(axis=1)[:, :3]
+    title_word = rng.integers(0, len(SYNTHETIC_TITLE_WORDS), count)
+    title_noun = rng.integers(0, 12, count)
+    description = rng.integers(0, len(SYNTHETIC_DESCRIPTIONS), count)
+    created_at = synthetic_timestamps(rng.uniform(0, SYNTHETIC_MAX_AGE_DAYS * 86400, count), now)
+
+    properties = []
+    for i, (l, k, a, bed, bath, p, f, lat, lon) in enumerate(zip(
+        loc.tolist(), kind.tolist(), area.astype(int).tolist(), bedrooms.astype(int).tolist(),
+        bathrooms.astype(int).tolist(), price.astype(int).tolist(), featured.tolist(),
+        latitude.tolist(), longitude.tolist(),
+    )):
+        property_type = type_names[k]
+        nouns = SYNTHETIC_TITLE_NOUNS[property_type]
+        properties.append({
+            "id": str(uuid.uuid4()),
+            "title": f"{SYNTHETIC_TITLE_WORDS[title_word[i]]} {nouns[title_noun[i] % len(nouns)]}",
+            "location": locations["names"][l],
+            "location_keys": locations["keys"][l],
+            "latitude": lat,
+            "longitude": lon,
+            "geo": geo_point(lat, lon),
+            "price": p,
+            "property_type": property_type,
+            "bedrooms": bed,
+            "bathrooms": bath,
+            "area": a,
+            "description": f"A {bed}-bedroom {property_type} of {a:,} sq ft in {locations['names'][l]}. "
+                           f"{SYNTHETIC_DESCRIPTIONS[description[i]]}",
+            "features": feature_names[features[i]].tolist(),
+            "images": [SYNTHETIC_IMAGES[j] for j in images[i].tolist()],
+            "featured": f,
+            "created_at": created_at[i],
+            "updated_at": now,  # restamped when the batch is inserted, see load_synthetic_data()
+            "version": 1,
+        })
+    return properties
+
+def synthetic_inquiries(rng: np.random.Generator, count: int, listings: List[dict], now: datetime) -> List[dict]:
+    """Generate `count` inquiries about `listings`, each made after its listing was created.
+
+    Interest is heavy-tailed: a few listings draw most of the inquiries.
+    """
+    if not listings or not count:
+        return []
+    popularity = rng.pareto(1.2, len(listings)) + 0.01
+    target = rng.choice(len(listings), size=count, p=popularity / popularity.sum())
+    listed = np.array([listing["created_at"].timestamp() for listing in listings])[target]
+    seconds_ago = (now.timestamp() - listed) * rng.random(count) ** 2  # most interest comes soon after listing
+    created_at = synthetic_timestamps(seconds_ago, now)
+    first = rng.integers(0, len(SYNTHETIC_FIRST_NAMES), count)
+    last = rng.integers(0, len(SYNTHETIC_LAST_NAMES), count)
+    suffix = rng.integers(0, 100000, count)
+    phone = np.where(rng.random(count) < 0.6, rng.integers(2000000, 9999999, count), 0)
+    message = rng.random((count, len(SYNTHETIC_MESSAGES))).argsort(axis=1)[:, :3]
+    sentences = rng.integers(1, 4, count)
+    # Names and messages are built from a few parts, so search_keys are merged from per-part tokens
+    part_tokens = {}
+
+    def tokens(text: str) -> List[str]:
+        if text not in part_tokens:
+            part_tokens[text] = search_tokens(text)
+        return part_tokens[text]
+
+    inquiries = []
+    for i, t in enumerate(target.tolist()):
+        listing = listings[t]
+        first_name, last_name = SYNTHETIC_FIRST_NAMES[first[i]], SYNTHETIC_LAST_NAMES[last[i]]
+        parts = [f"{first_name} {last_name}"] + [
+            SYNTHETIC_MESSAGES[m].format(title=listing["title"], city=listing["location"].split(",")[0])
+            for m in message[i, :sentences[i]].tolist()
+        ]
+        email = f"{first_name}.{last_name}{suffix[i]}@example.com".lower()
+        inquiries.append({
+            "id": str(uuid.uuid4()),
+            "property_id": listing["id"],
+            "property_title": listing["title"],
+            "name": parts[0],
+            "email": email,
+            "phone": f"+1 555 {phone[i]:07d}" if phone[i] else None,
+            "message": " ".join(parts[1:]),
+            "created_at": created_at[i],
+            # Same result as inquiry_keys()
+            "email_key": email,
+            "search_keys": list(dict.fromkeys(token for part in parts for token in tokens(part)))[:INQUIRY_SEARCH_MAX_KEYS],
+        })
+    return inquiries
+
+async def load_synthetic_data(
+    properties: int,
+    inquiries: int,
+    seed: Optional[int] = None,
+    batch_size: int = SYNTHETIC_BATCH_SIZE,
+    concurrency: int = SYNTHETIC_CONCURRENCY,
+) -> dict:
+    """Generate listings and inquiries and stream them into Mongo in unordered batches.
+
+    Rows are generated a chunk at a time in a worker thread while up to
+    `concurrency` insert_many batches from the previous chunk are in flight,
+    so memory stays bounded by the chunk size whatever the total.
+    """
+    rng = np.random.default_rng(seed)
+    now = datetime.now(timezone.utc)
+    stats = {"properties": 0, "inquiries": 0, "failed": 0}
+    slots = asyncio.Semaphore(concurrency)
+    tasks = set()
+
+    async def insert(collection: str, docs: List[dict]):
+        if collection == "properties":
+            # The similarity index and polling change feed catch up on updated_at, so it
+            # must be when the row is written, not when a minutes-long load started
+            written_at = datetime.now(timezone.utc)
+            for doc in docs:
+                doc["updated_at"] = written_at
+        try:
+            result = await db[collection].insert_many(docs, ordered=False)
+            stats[collection] += len(result.inserted_ids)
+        except BulkWriteError as e:
+            stats[collection] += e.details["nInserted"]
+            stats["failed"] += len(e.details["writeErrors"])
+        finally:
+            slots.release()
+
+    async def enqueue(collection: str, docs: List[dict]):
+        for start in range(0, len(docs), batch_size):
+            await slots.acquire()
+            task = asyncio.create_task(insert(collection, docs[start:start + batch_size]))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+    started = time.perf_counter()
+    chunk = max(batch_size * concurrency, 10000)
+    if properties:
+        generated = inquired = 0
+        while generated < properties:
+            count = min(chunk, properties - generated)
+            listings = await asyncio.to_thread(synthetic_properties, rng, count, now)
+            generated += count
+            # Inquiries are spread over the listings in proportion, one chunk at a time
+            share = inquiries * generated // properties - inquired
+            inquired += share
+            docs = await asyncio.to_thread(synthetic_inquiries, rng, share, listings, now)
+            await enqueue("properties", listings)
+            await enqueue("inquiries", docs)
+    elif inquiries:
+        listings = await db.properties.aggregate([
+            {"$sample": {"size": SYNTHETIC_SAMPLE_LISTINGS}},
+            {"$project": {"_id": 0, "id": 1, "title": 1, "location": 1, "created_at": 1}},
+        ]).to_list(SYNTHETIC_SAMPLE_LISTINGS)
+        for start in range(0, inquiries if listings else 0, chunk):
+            docs = await asyncio.to_thread(synthetic_inquiries, rng, min(chunk, inquiries - start), listings, now)
+            await enqueue("inquiries", docs)
+    await asyncio.gather(*tasks)
+
+    elapsed = time.perf_counter() - started
+    if stats["properties"]:
+        clear_property_caches()
+        await collection_versions.bump("properties")
+    if stats["inquiries"]:
+        await collection_versions.bump("inquiries")
+    logger.info(f"Loaded {stats['properties']} synthetic listings and {stats['inquiries']} inquiries "
+                f"in {elapsed:.1f} s ({stats['failed']} failed)")
+    return {**stats, "seconds": round(elapsed, 2)}
+
+@api_router.post("/seed/synthetic")
+async def seed_synthetic_data(request: SyntheticDataRequest):
+    """Append generated listings and inquiries for load testing. Existing data is left alone."""
+    return await load_synthetic_data(request.properties, request.inquiries, request.seed)
+
 # ==================== SEED DATA ====================
 
 @api_router.post("/seed")
@@ -234,6 +3538,8 @@ async def seed_data():
             "id": str(uuid.uuid4()),
             "title": "The Midnight Estate",
             "location": "Beverly Hills, California",
+            "latitude": 34.0736,
+            "longitude": -118.4004,
             "price": 45000000,
             "property_type": "estate",
             "bedrooms": 8,
@@ -247,12 +3553,15 @@ async def seed_data():
                 "https://images.unsplash.com/photo-1600607687939-ce8a6c25118c?w=1200"
             ],
             "featured": True,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc),
+            "version": 1
         },
         {
             "id": str(uuid.uuid4()),
             "title": "Obsidian Penthouse",
             "location": "Manhattan, New York",
+            "latitude": 40.7831,
+            "longitude": -73.9712,
             "price": 32000000,
             "property_type": "penthouse",
             "bedrooms": 5,
@@ -266,12 +3575,15 @@ async def seed_data():
                 "https://images.unsplash.com/photo-1600573472550-8090b5e0745e?w=1200"
             ],
             "featured": True,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc),
+            "version": 1
         },
         {
             "id": str(uuid.uuid4()),
             "title": "Villa Serenità",
             "location": "Lake Como, Italy",
+            "latitude": 45.9868,
+            "longitude": 9.2572,
             "price": 28000000,
             "property_type": "villa",
             "bedrooms": 7,
@@ -285,12 +3597,15 @@ async def seed_data():
                 "https://images.unsplash.com/photo-1600566753190-17f0baa2a6c3?w=1200"
             ],
             "featured": True,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc),
+            "version": 1
         },
         {
             "id": str(uuid.uuid4()),
             "title": "The Glass Pavilion",
             "location": "Aspen, Colorado",
+            "latitude": 39.1911,
+            "longitude": -106.8175,
             "price": 38000000,
             "property_type": "estate",
             "bedrooms": 6,
@@ -304,12 +3619,15 @@ async def seed_data():
                 "https://images.unsplash.com/photo-1600607687644-c7171b42498f?w=1200"
             ],
             "featured": False,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc),
+            "version": 1
         },
         {
             "id": str(uuid.uuid4()),
             "title": "Maison Noir",
             "location": "Paris, France",
+            "latitude": 48.8566,
+            "longitude": 2.3522,
             "price": 22000000,
             "property_type": "apartment",
             "bedrooms": 4,
@@ -323,12 +3641,15 @@ async def seed_data():
                 "https://images.unsplash.com/photo-1600585154340-be6161a56a0c?w=1200"
             ],
             "featured": False,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc),
+            "version": 1
         },
         {
             "id": str(uuid.uuid4()),
             "title": "Harbour Sanctuary",
             "location": "Sydney, Australia",
+            "latitude": -33.8688,
+            "longitude": 151.2093,
             "price": 35000000,
             "property_type": "penthouse",
             "bedrooms": 5,
@@ -342,24 +3663,56 @@ async def seed_data():
                 "https://images.unsplash.com/photo-1600585154526-990dced4db0d?w=1200"
             ],
             "featured": False,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc),
+            "version": 1
         }
     ]
     
+    for prop in sample_properties:
+        prop["location_keys"] = location_tokens(prop["location"])
+        prop["geo"] = geo_point(prop["latitude"], prop["longitude"])
+        prop["updated_at"] = prop["created_at"]
     await db.properties.insert_many(sample_properties)
+    clear_property_caches()
+    await collection_versions.bump("properties")
     return {"message": f"Seeded {len(sample_properties)} properties"}
 
 # Include the router
 app.include_router(api_router)
 
+# ==================== HEALTH ====================
+
+@app.get("/healthz", include_in_schema=False)
+async def healthz():
+    """Liveness: the process is serving requests. Never touches MongoDB."""
+    return {"status": "ok", "pid": os.getpid(), "pool": pool_stats.snapshot()}
+
+@app.get("/readyz", include_in_schema=False)
+async def readyz():
+    """Readiness: startup has finished and MongoDB answers a ping."""
+    body = {"status": "ok", "pid": os.getpid(), "pool": pool_stats.snapshot()}
+    if not getattr(app.state, "ready", False):
+        return FastJSONResponse({**body, "status": "starting"}, status_code=503)
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(client.admin.command("ping"), MONGO_SERVER_SELECTION_TIMEOUT_MS / 1000)
+    except Exception as e:
+        return FastJSONResponse({**body, "status": "unavailable", "error": str(e)}, status_code=503)
+    body["mongo_ping_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return FastJSONResponse(body)
+
+if METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def get_metrics():
+        return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+    app.add_middleware(MetricsMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Retry-After", "Idempotent-Replayed"],
 )
-
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
@@ -1,10 +1,20 @@
 #!/usr/bin/env python3
 
+import argparse
+import asyncio
+import random
 import requests
 import sys
+import time
 import json
+from collections import Counter, defaultdict
 from datetime import datetime
 
+# Weighted request mix for load mode, modeled on real browsing sessions
+DEFAULT_LOAD_MIX = {"featured": 30, "search": 40, "detail": 25, "inquiry": 5}
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500]
+
 class RealEstateAPITester:
     def __init__(self, base_url="https://discretion-homes.preview.emergentagent.com/api"):
         self.base_url = base_url
@@ -283,6 +293,126 @@ class RealEstateAPITester:
         
         return self.get_results()
 
+    def _load_request(self, kind, property_ids, rng):
+        """Build (method, path, kwargs) for one request of the given kind"""
+        if kind == "featured":
+            return "GET", "/properties", {"params": {"featured": "true", "view": "summary", "limit": 3}}
+        if kind == "search":
+            params = {"view": "summary", "limit": 12}
+            if rng.random() < 0.6:
+                params["property_type"] = rng.choice(["villa", "penthouse", "estate", "apartment"])
+            if rng.random() < 0.4:
+                params["min_price"] = rng.choice([10000000, 20000000, 30000000])
+            if rng.random() < 0.3:
+                params["bedrooms"] = rng.randint(3, 6)
+            return "GET", "/properties", {"params": params}
+        if kind == "detail":
+            return "GET", f"/properties/{rng.choice(property_ids)}", {}
+        if kind == "inquiry":
+            return "POST", "/inquiries", {"json": {
+                "name": "Load Test",
+                "email": "loadtest@example.com",
+                "message": "Load test inquiry, please disregard.",
+                "property_id": rng.choice(property_ids),
+            }}
+        raise ValueError(f"Unknown request kind: {kind}")
+
+    async def run_load_test(self, concurrency=10, duration=30.0, ramp_up=5.0, mix=None, seed=None):
+        """Drive the API with concurrent virtual users for `duration` seconds"""
+        import httpx
+
+        mix = mix or DEFAULT_LOAD_MIX
+        kinds, weights = list(mix), list(mix.values())
+        rng = random.Random(seed)
+
+        print("🚀 Starting Real Estate API load test...")
+        print(f"Base URL: {self.base_url}")
+        print(f"Users: {concurrency}, ramp-up: {ramp_up:.0f}s, duration: {duration:.0f}s, mix: {mix}")
+        print("=" * 60)
+
+        latencies = defaultdict(list)
+        errors = Counter()
+        throttled = Counter()  # 429s are the inquiry rate limit doing its job, not failures
+
+        async with httpx.AsyncClient(base_url=self.base_url, timeout=30,
+                                     limits=httpx.Limits(max_connections=concurrency)) as client:
+            response = await client.get("/properties", params={"view": "summary", "limit": 100})
+            response.raise_for_status()
+            property_ids = [p["id"] for p in response.json()]
+            if not property_ids:
+                print("❌ No properties to browse - seed the database first")
+                return None
+
+            started = time.perf_counter()
+            deadline = started + duration
+
+            async def user(index):
+                # Stagger user start times evenly across the ramp-up window
+                await asyncio.sleep(ramp_up * index / concurrency)
+                while time.perf_counter() < deadline:
+                    kind = rng.choices(kinds, weights)[0]
+                    method, path, kwargs = self._load_request(kind, property_ids, rng)
+                    start = time.perf_counter()
+                    try:
+                        response = await client.request(method, path, **kwargs)
+                        if response.status_code == 429:
+                            throttled[kind] += 1
+                        elif response.status_code >= 400:
+                            errors[kind] += 1
+                    except httpx.HTTPError:
+                        errors[kind] += 1
+                    latencies[kind].append((time.perf_counter() - start) * 1000)
+
+            await asyncio.gather(*(user(i) for i in range(concurrency)))
+            elapsed = time.perf_counter() - started
+
+        return self.get_load_results(latencies, errors, elapsed, throttled)
+
+    def get_load_results(self, latencies, errors, elapsed, throttled=None):
+        """Print and return the latency histogram, error rates and achieved RPS"""
+        throttled = throttled or Counter()
+
+        def summarize(samples, error_count, throttled_count):
+            samples = sorted(samples)
+            pick = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))] if samples else 0
+            return {
+                "requests": len(samples),
+                "errors": error_count,
+                "throttled": throttled_count,
+                "error_rate": error_count / len(samples) * 100 if samples else 0,
+                "rps": len(samples) / elapsed if elapsed else 0,
+                "p50_ms": pick(0.50),
+                "p95_ms": pick(0.95),
+                "p99_ms": pick(0.99),
+                "max_ms": samples[-1] if samples else 0,
+            }
+
+        every = [ms for samples in latencies.values() for ms in samples]
+        results = {kind: summarize(samples, errors[kind], throttled[kind]) for kind, samples in latencies.items()}
+        results["total"] = summarize(every, sum(errors.values()), sum(throttled.values()))
+
+        print(f"{'request':<10}{'count':>8}{'rps':>9}{'err %':>8}{'429s':>7}{'p50':>9}{'p95':>9}{'p99':>9}")
+        for kind, row in results.items():
+            print(f"{kind:<10}{row['requests']:>8}{row['rps']:>9.1f}{row['error_rate']:>8.2f}{row['throttled']:>7}"
+                  f"{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}")
+
+        histogram = Counter()
+        for ms in every:
+            bucket = next((bound for bound in LATENCY_BUCKETS_MS if ms <= bound), None)
+            histogram[bucket] += 1
+        print()
+        print("📊 Latency histogram")
+        largest = max(histogram.values(), default=1)
+        for bound in LATENCY_BUCKETS_MS + [None]:
+            label = f"<= {bound} ms" if bound else f"> {LATENCY_BUCKETS_MS[-1]} ms"
+            count = histogram[bound]
+            print(f"  {label:>12} {count:>7} {'#' * round(40 * count / largest)}")
+        print("=" * 60)
+
+        results["histogram"] = {str(bound or "inf"): histogram[bound] for bound in LATENCY_BUCKETS_MS + [None]}
+        results["elapsed"] = elapsed
+        return results
+
     def get_results(self):
         """Get test results summary"""
         success_rate = (self.tests_passed / self.tests_run * 100) if self.tests_run > 0 else 0
@@ -304,10 +434,41 @@ class RealEstateAPITester:
             "all_passed": success_rate == 100
         }
 
+def parse_mix(value):
+    """Parse a request mix like 'featured=30,search=40,detail=25,inquiry=5'"""
+    mix = {}
+    for part in value.split(","):
+        kind, _, weight = part.partition("=")
+        if kind not in DEFAULT_LOAD_MIX:
+            raise argparse.ArgumentTypeError(f"unknown request kind '{kind}'")
+        mix[kind] = float(weight)
+    return mix
+
 def main():
-    tester = RealEstateAPITester()
-    results = tester.run_all_tests()
-    return 0 if results["all_passed"] else 1
+    parser = argparse.ArgumentParser(description="Real Estate API smoke test and load generator")
+    parser.add_argument("--base-url", default="https://discretion-homes.preview.emergentagent.com/api",
+                        help="API root, e.g. http://localhost:8001/api")
+    parser.add_argument("--load", action="store_true", help="run the concurrent load test instead of the smoke test")
+    parser.add_argument("--concurrency", type=int, default=10, help="virtual users in load mode")
+    parser.add_argument("--duration", type=float, default=30, help="load test length in seconds")
+    parser.add_argument("--ramp-up", type=float, default=5, help="seconds over which users are started")
+    parser.add_argument("--mix", type=parse_mix, help="weighted request mix, e.g. featured=30,search=40,detail=25,inquiry=5")
+    parser.add_argument("--seed", type=int, help="random seed for a reproducible request sequence")
+    parser.add_argument("--json", dest="json_path", help="write load test results here")
+    args = parser.parse_args()
+
+    tester = RealEstateAPITester(args.base_url)
+    if not args.load:
+        results = tester.run_all_tests()
+        return 0 if results["all_passed"] else 1
+
+    results = asyncio.run(tester.run_load_test(args.concurrency, args.duration, args.ramp_up, args.mix, args.seed))
+    if results is None:
+        return 1
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0 if results["total"]["errors"] == 0 else 1
 
 if __name__ == "__main__":
     sys.exit(main())
\ No newline at end of file
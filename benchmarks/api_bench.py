@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""Local load benchmark for the API, run in-process against a throwaway database.
+
+The FastAPI app is driven through httpx's ASGI transport, so no server has to
+be running. For each dataset size the database is reset, seeded with synthetic
+listings and the app's startup hooks are run; then every scenario is fired
+with the configured concurrency and its throughput and latency percentiles
+are recorded.
+
+Usage:
+    python benchmarks/api_bench.py --mongo-url mongodb://localhost:27017 --sizes 1000,10000
+    python benchmarks/api_bench.py --in-memory --sizes 1000   # needs mongomock-motor
+    python benchmarks/api_bench.py --compare benchmarks/results/api-<earlier>.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+
+PROPERTY_TYPES = ["villa", "penthouse", "estate", "apartment"]
+LOCATIONS = [
+    "Beverly Hills, California", "Manhattan, New York", "Lake Como, Italy", "Aspen, Colorado",
+    "Paris, France", "Sydney, Australia", "Monaco, Monaco", "London, United Kingdom",
+]
+FEATURES = ["Infinity Pool", "Wine Cellar", "Home Theater", "Guest House", "Spa", "Gym", "Library", "Terrace"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mongo-url", default=os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    parser.add_argument("--db-name", default="realestate_benchmark", help="dropped and recreated for every size")
+    parser.add_argument("--in-memory", action="store_true", help="use mongomock-motor instead of a mongod")
+    parser.add_argument("--sizes", default="1000,10000", help="comma-separated listing counts")
+    parser.add_argument("--requests", type=int, default=500, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--no-cache", action="store_true", help="disable the in-process read caches")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="results file (default: benchmarks/results/api-<timestamp>.json)")
+    parser.add_argument("--compare", help="earlier results file to diff p95 latency against")
+    return parser.parse_args()
+
+
+def load_server(args):
+    # Configure the app before it is imported: a scratch database and no real email
+    os.environ["MONGO_URL"] = args.mongo_url
+    os.environ["DB_NAME"] = args.db_name
+    os.environ["EMAIL_SENDER"] = "log"
+    # Every benchmark request comes from one address and email; measure the write path, not the limiter
+    os.environ["INQUIRY_LIMIT_PER_IP"] = "0"
+    os.environ["INQUIRY_LIMIT_PER_EMAIL"] = "0"
+    sys.path.insert(0, str(ROOT / "backend"))
+    import server
+
+    for name in (server.__name__, "httpx"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+    if args.in_memory:
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            sys.exit("--in-memory needs mongomock-motor: pip install mongomock-motor")
+        server.client = AsyncMongoMockClient()
+        server.db = server.client[args.db_name]
+        # mongomock ignores partialFilterExpression, so the sparse external_id key would collide on None
+        server.PROPERTY_INDEXES = [
+            index for index in server.PROPERTY_INDEXES
+            if "partialFilterExpression" not in index.document
+        ]
+    if args.no_cache:
+        for cache in (server.property_cache, server.listing_cache, server.facet_cache):
+            cache.maxsize = 0
+    return server
+
+
+def synthetic_property(rng: random.Random, server, created_at: datetime) -> dict:
+    location = rng.choice(LOCATIONS)
+    return {
+        "id": str(uuid.uuid4()),
+        "title": f"Residence {rng.randrange(10**6)}",
+        "location": location,
+        "location_keys": server.location_tokens(location),
+        "price": rng.randrange(1_000_000, 60_000_000, 50_000),
+        "property_type": rng.choice(PROPERTY_TYPES),
+        "bedrooms": rng.randint(1, 10),
+        "bathrooms": rng.randint(1, 12),
+        "area": rng.randrange(800, 20_000, 50),
+        "description": "An architectural statement of quiet luxury. " * 6,
+        "features": rng.sample(FEATURES, rng.randint(2, 6)),
+        "images": [f"https://images.unsplash.com/photo-{rng.randrange(10**9)}?w=1200" for _ in range(3)],
+        "featured": rng.random() < 0.05,
+        "created_at": created_at,
+        "updated_at": created_at,
+        "version": 1,
+    }
+
+
+def property_payload(rng: random.Random) -> dict:
+    return {
+        "title": "Benchmark Residence",
+        "location": rng.choice(LOCATIONS),
+        "price": rng.randrange(1_000_000, 60_000_000, 50_000),
+        "property_type": rng.choice(PROPERTY_TYPES),
+        "bedrooms": rng.randint(1, 10),
+        "bathrooms": rng.randint(1, 12),
+        "area": rng.randrange(800, 20_000, 50),
+        "description": "Created by the API benchmark.",
+        "features": rng.sample(FEATURES, 3),
+        "images": ["https://images.unsplash.com/photo-1?w=1200"],
+    }
+
+
+async def seed(server, size: int, rng: random.Random) -> list:
+    for name in ("properties", "inquiries", "outbox", "counters"):
+        await server.db.drop_collection(name)
+    now = datetime.now(timezone.utc)
+    ids = []
+    batch = []
+    for i in range(size):
+        doc = synthetic_property(rng, server, now - timedelta(minutes=i))
+        ids.append(doc["id"])
+        batch.append(doc)
+        if len(batch) == 1000:
+            await server.db.properties.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        await server.db.properties.insert_many(batch, ordered=False)
+    for cache in (server.property_cache, server.listing_cache, server.facet_cache):
+        cache.clear()
+    return ids
+
+
+def scenarios(ids: list):
+    def filtered_list(rng):
+        params = {"limit": 24, "view": "summary"}
+        if rng.random() < 0.5:
+            params["property_type"] = rng.choice(PROPERTY_TYPES)
+        if rng.random() < 0.5:
+            params["min_price"] = rng.choice([5_000_000, 10_000_000, 20_000_000])
+        if rng.random() < 0.3:
+            params["bedrooms"] = rng.randint(2, 6)
+        return "GET", "/api/properties", {"params": params}
+
+    def detail(rng):
+        return "GET", f"/api/properties/{rng.choice(ids)}", {}
+
+    def batch(rng):
+        # A favourites page: 20 listings in one request
+        return "POST", "/api/properties/batch", {"json": {"ids": rng.sample(ids, min(20, len(ids))), "view": "summary"}}
+
+    def create(rng):
+        return "POST", "/api/properties", {"json": property_payload(rng)}
+
+    def update(rng):
+        return "PUT", f"/api/properties/{rng.choice(ids)}", {"json": {"price": rng.randrange(1_000_000, 60_000_000, 50_000)}}
+
+    def inquiry(rng):
+        return "POST", "/api/inquiries", {"json": {
+            "property_id": rng.choice(ids),
+            "name": "Benchmark Visitor",
+            "email": "visitor@example.com",
+            "message": "I would like to arrange a private viewing.",
+        }}
+
+    return {
+        "filtered_list": filtered_list,
+        "detail": detail,
+        "batch": batch,
+        "create": create,
+        "update": update,
+        "inquiry": inquiry,
+    }
+
+
+async def run_scenario(http, build_request, total: int, concurrency: int, rng: random.Random) -> dict:
+    latencies = []
+    errors = 0
+    remaining = total
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            method, url, kwargs = build_request(rng)
+            start = time.perf_counter()
+            response = await http.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    cuts = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed if elapsed else None,
+        "mean_ms": statistics.fmean(latencies) * 1000,
+        "p50_ms": cuts[49] * 1000,
+        "p95_ms": cuts[94] * 1000,
+        "p99_ms": cuts[98] * 1000,
+    }
+
+
+async def run(args, server) -> list:
+    import httpx
+
+    rng = random.Random(args.seed)
+    results = []
+    for size in [int(s) for s in args.sizes.split(",") if s]:
+        ids = await seed(server, size, rng)
+        async with server.app.router.lifespan_context(server.app):
+            transport = httpx.ASGITransport(app=server.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as http:
+                for name, build_request in scenarios(ids).items():
+                    stats = await run_scenario(http, build_request, args.requests, args.concurrency, rng)
+                    results.append({"size": size, "endpoint": name, **stats})
+                    print(f"{size:>9,} {name:<14} {stats['rps']:>9.1f} rps  p50 {stats['p50_ms']:7.2f} ms"
+                          f"  p95 {stats['p95_ms']:7.2f} ms  p99 {stats['p99_ms']:7.2f} ms  errors {stats['errors']}")
+    for name in ("properties", "inquiries", "outbox", "counters"):
+        await server.db.drop_collection(name)
+    return results
+
+
+def compare(previous_path: str, results: list):
+    previous = {(r["size"], r["endpoint"]): r for r in json.loads(Path(previous_path).read_text())["results"]}
+    print(f"\np95 latency vs {previous_path}")
+    for result in results:
+        before = previous.get((result["size"], result["endpoint"]))
+        if before:
+            change = (result["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100
+            print(f"{result['size']:>9,} {result['endpoint']:<14} {before['p95_ms']:7.2f} -> {result['p95_ms']:7.2f} ms ({change:+.1f}%)")
+
+
+def main() -> int:
+    args = parse_args()
+    server = load_server(args)
+    print(f"{'listings':>9} {'endpoint':<14} {'throughput':>13}")
+    results = asyncio.run(run(args, server))
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"api-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "backend": "mongomock" if args.in_memory else "mongod",
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "cache": not args.no_cache,
+            "seed": args.seed,
+        },
+        "results": results,
+    }, indent=2))
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        compare(args.compare, results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
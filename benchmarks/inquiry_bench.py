@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""Admin inbox latency per query shape against a large synthetic inquiry collection.
+
+The database is seeded with --rows inquiries spread over a year and a few
+thousand listings, the app's startup hooks build the indexes, and each inbox
+query (newest, per listing, per email, word search, date range, a second
+keyset page and the per-listing summary) is issued through httpx's ASGI
+transport. Latency percentiles are reported together with the keys and
+documents the query plan examined.
+
+Usage:
+    python benchmarks/inquiry_bench.py --mongo-url mongodb://localhost:27017 --rows 1000000
+    python benchmarks/inquiry_bench.py --in-memory --rows 5000   # needs mongomock-motor
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from api_bench import load_server
+
+FIRST_NAMES = ["Amelia", "Hugo", "Sofia", "Kenji", "Isabel", "Omar", "Clara", "Luca", "Nadia", "Felix"]
+LAST_NAMES = ["Laurent", "Okafor", "Rossi", "Tanaka", "Moreau", "Haddad", "Lindqvist", "Novak"]
+WORDS = ("private viewing schedule weekend interested pool garden terrace offer financing broker "
+         "relocation family school harbour view renovation furnished lease purchase cash").split()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mongo-url", default="mongodb://localhost:27017")
+    parser.add_argument("--db-name", default="realestate_inquiry_benchmark", help="dropped and recreated")
+    parser.add_argument("--in-memory", action="store_true", help="use mongomock-motor instead of a mongod")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--listings", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=200, help="requests per query shape")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", dest="json_path", help="write machine-readable results here")
+    args = parser.parse_args()
+    args.no_cache = False
+    return args
+
+
+def synthetic_inquiry(rng: random.Random, server, property_ids: list, created_at: datetime) -> dict:
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    doc = {
+        "id": str(uuid.uuid4()),
+        "property_id": rng.choice(property_ids),
+        "property_title": None,
+        "name": f"{first} {last}",
+        "email": f"{first}.{last}{rng.randrange(20_000)}@example.com",
+        "phone": None,
+        "message": " ".join(rng.sample(WORDS, rng.randint(6, 14))),
+        "created_at": created_at,
+    }
+    doc.update(server.inquiry_keys(doc))
+    return doc
+
+
+async def seed(server, args, rng: random.Random) -> tuple:
+    await server.db.drop_collection("inquiries")
+    property_ids = [str(uuid.uuid4()) for _ in range(args.listings)]
+    now = datetime.now(timezone.utc)
+    step = timedelta(days=365) / args.rows
+    emails = []
+    batch = []
+    started = time.perf_counter()
+    for i in range(args.rows):
+        doc = synthetic_inquiry(rng, server, property_ids, now - step * i)
+        if i % 1000 == 0:
+            emails.append(doc["email"])
+        batch.append(doc)
+        if len(batch) == 5000:
+            await server.db.inquiries.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        await server.db.inquiries.insert_many(batch, ordered=False)
+    print(f"Seeded {args.rows:,} inquiries in {time.perf_counter() - started:.1f} s")
+    return property_ids, emails, now
+
+
+def scenarios(property_ids: list, emails: list, now: datetime) -> dict:
+    def month(rng):
+        since = now - timedelta(days=rng.randint(30, 365))
+        return {"since": since.isoformat(), "until": (since + timedelta(days=30)).isoformat()}
+
+    return {
+        "newest": lambda rng: {"limit": 50},
+        "by_listing": lambda rng: {"limit": 50, "property_id": rng.choice(property_ids)},
+        "by_email": lambda rng: {"limit": 50, "email": rng.choice(emails).upper()},
+        "search_one_word": lambda rng: {"limit": 50, "q": rng.choice(WORDS)},
+        "search_two_words": lambda rng: {"limit": 50, "q": " ".join(rng.sample(WORDS, 2))},
+        "date_range": lambda rng: {"limit": 50, **month(rng)},
+    }
+
+
+async def explain_counts(server, params: dict) -> dict:
+    query = server.build_inquiry_query(params.get("property_id"), params.get("email"),
+                                       params.get("since") and datetime.fromisoformat(params["since"]),
+                                       params.get("until") and datetime.fromisoformat(params["until"]),
+                                       params.get("q"))
+    explained = await server.db.inquiries.find(query, server.INQUIRY_PROJECTION).sort(
+        [("created_at", -1), ("id", -1)]).limit(51).explain()
+    stats = explained.get("executionStats", {})
+    return {"keys_examined": stats.get("totalKeysExamined"), "docs_examined": stats.get("totalDocsExamined")}
+
+
+def percentiles(latencies: list) -> dict:
+    cuts = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {"p50_ms": cuts[49] * 1000, "p95_ms": cuts[94] * 1000, "p99_ms": cuts[98] * 1000}
+
+
+async def run(args, server) -> list:
+    import httpx
+
+    rng = random.Random(args.seed)
+    property_ids, emails, now = await seed(server, args, rng)
+    results = []
+    async with server.app.router.lifespan_context(server.app):
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as http:
+            for name, build_params in scenarios(property_ids, emails, now).items():
+                latencies, second_pages = [], []
+                for _ in range(args.requests):
+                    params = build_params(rng)
+                    start = time.perf_counter()
+                    response = await http.get("/api/inquiries", params=params)
+                    latencies.append(time.perf_counter() - start)
+                    response.raise_for_status()
+                    cursor = response.headers.get("x-next-cursor")
+                    if cursor:
+                        start = time.perf_counter()
+                        (await http.get("/api/inquiries", params={**params, "cursor": cursor})).raise_for_status()
+                        second_pages.append(time.perf_counter() - start)
+                plan = {} if args.in_memory else await explain_counts(server, build_params(rng))
+                result = {"query": name, **percentiles(latencies), **plan}
+                if second_pages:
+                    result["page_2_p50_ms"] = percentiles(second_pages)["p50_ms"]
+                results.append(result)
+                print(f"{name:<17} p50 {result['p50_ms']:7.2f} ms  p95 {result['p95_ms']:7.2f} ms"
+                      f"  p99 {result['p99_ms']:7.2f} ms  page 2 p50 {result.get('page_2_p50_ms', 0):7.2f} ms"
+                      f"  keys {plan.get('keys_examined', '-')}  docs {plan.get('docs_examined', '-')}")
+
+            # Cold summary: every run is a cache miss on a fresh inquiries version
+            latencies = []
+            for _ in range(max(1, args.requests // 20)):
+                await server.collection_versions.bump("inquiries")
+                start = time.perf_counter()
+                (await http.get("/api/inquiries/summary")).raise_for_status()
+                latencies.append(time.perf_counter() - start)
+            results.append({"query": "summary", **percentiles(latencies)})
+            print(f"{'summary':<17} p50 {results[-1]['p50_ms']:7.2f} ms  p95 {results[-1]['p95_ms']:7.2f} ms")
+    await server.db.drop_collection("inquiries")
+    return results
+
+
+def main() -> int:
+    args = parse_args()
+    server = load_server(args)
+    results = asyncio.run(run(args, server))
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps({
+            "rows": args.rows,
+            "backend": "mongomock" if args.in_memory else "mongod",
+            "results": results,
+        }, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Serialization cost of the property list response, before and after the fast path.
+
+"before" replays what the read endpoints used to do for every request: parse
+ISO-8601 string created_at values row by row, validate the list against
+List[Property] and encode it with the stdlib json module. "after" encodes the
+documents exactly as Motor returns them (native datetimes) with FastJSONResponse.
+
+Usage: python benchmarks/serialization_bench.py [--rows 1000] [--repeat 50] [--json out.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import List
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "benchmark")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from pydantic import TypeAdapter  # noqa: E402
+
+from server import FastJSONResponse, Property  # noqa: E402
+
+
+def make_documents(rows: int) -> List[dict]:
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "title": f"Residence {i}",
+            "location": "Lake Como, Italy",
+            "price": 10_000_000 + i * 1_000,
+            "property_type": "villa",
+            "bedrooms": 3 + i % 5,
+            "bathrooms": 2 + i % 4,
+            "area": 4_000 + i,
+            "description": "A testament to Italian craftsmanship, this lakefront villa has hosted generations of quiet distinction. " * 3,
+            "features": ["Lake Access", "Historic Gardens", "Guest Quarters", "Wine Cellar", "Boat House"],
+            "images": [f"https://images.unsplash.com/photo-{i}-{n}?w=1200" for n in range(3)],
+            "featured": i % 7 == 0,
+            "created_at": now - timedelta(minutes=i),
+        }
+        for i in range(rows)
+    ]
+
+
+def legacy_path(adapter: TypeAdapter, stored: List[dict]) -> bytes:
+    properties = [dict(doc) for doc in stored]
+    for prop in properties:
+        if isinstance(prop.get('created_at'), str):
+            prop['created_at'] = datetime.fromisoformat(prop['created_at'])
+    validated = adapter.validate_python(properties)
+    return json.dumps(adapter.dump_python(validated, mode="json"), ensure_ascii=False,
+                      allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def fast_path(stored: List[dict]) -> bytes:
+    return FastJSONResponse(stored).body
+
+
+def measure(fn, repeat: int) -> List[float]:
+    fn()  # warm up
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--json", dest="json_path", help="write machine-readable results here")
+    args = parser.parse_args()
+
+    native = make_documents(args.rows)
+    legacy = [{**doc, "created_at": doc["created_at"].isoformat()} for doc in native]
+    adapter = TypeAdapter(List[Property])
+
+    results = {"rows": args.rows, "repeat": args.repeat, "paths": {}}
+    for name, fn in (("before", lambda: legacy_path(adapter, legacy)), ("after", lambda: fast_path(native))):
+        samples = measure(fn, args.repeat)
+        per_1000 = 1000 / args.rows
+        results["paths"][name] = {
+            "median_ms_per_1000": statistics.median(samples) * 1000 * per_1000,
+            "min_ms_per_1000": min(samples) * 1000 * per_1000,
+            "bytes": len(fn()),
+        }
+
+    before = results["paths"]["before"]["median_ms_per_1000"]
+    after = results["paths"]["after"]["median_ms_per_1000"]
+    results["speedup"] = before / after if after else None
+    print(f"Serialization of {args.rows} listings ({args.repeat} runs, median, per 1,000 listings)")
+    print(f"  before: {before:8.3f} ms")
+    print(f"  after:  {after:8.3f} ms")
+    print(f"  speedup: {results['speedup']:.1f}x")
+
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""Build, update and query cost of the in-memory similar-listings index.
+
+Synthetic listings are loaded straight into SimilarityIndex (no database), then
+/similar's scoring pass is timed for random listings, alongside single-row
+upserts and deletes. "baseline" scores the same listings with a plain Python
+loop over the documents, which is what answering the endpoint without the
+matrix would cost before even counting the Mongo round trips.
+
+Usage: python benchmarks/similarity_bench.py [--rows 100000] [--queries 200] [--k 6] [--json out.json]
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "benchmark")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from server import SIMILAR_MAX_FEATURES, SIMILARITY_WEIGHTS, SimilarityIndex, feature_key, similar_numeric_row  # noqa: E402
+
+PROPERTY_TYPES = ["villa", "penthouse", "estate", "apartment", "chalet", "townhouse"]
+# A long tail of amenities, as free-text features tend to be
+FEATURES = [f"Amenity {n}" for n in range(300)] + [
+    "Infinity Pool", "Wine Cellar", "Home Theater", "Guest House", "Spa", "Gym", "Library", "Terrace",
+]
+
+
+def make_documents(rows: int, rng: random.Random) -> list:
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "price": rng.randrange(1_000_000, 60_000_000, 50_000),
+            "area": rng.randrange(800, 20_000, 50),
+            "bedrooms": rng.randint(1, 10),
+            "bathrooms": rng.randint(1, 12),
+            "property_type": rng.choice(PROPERTY_TYPES),
+            "features": rng.sample(FEATURES, rng.randint(2, 8)),
+        }
+        for _ in range(rows)
+    ]
+
+
+def baseline_similar(docs: list, inv_var, target: dict, k: int) -> list:
+    """The same score computed document by document."""
+    target_numeric = similar_numeric_row(target)
+    target_features = {feature_key(f) for f in target["features"]}
+    scored = []
+    for doc in docs:
+        if doc["id"] == target["id"]:
+            continue
+        numeric = similar_numeric_row(doc)
+        distance = sum((a - b) ** 2 * w for a, b, w in zip(numeric, target_numeric, inv_var)) / len(numeric)
+        score = SIMILARITY_WEIGHTS["numeric"] / (1 + distance)
+        if doc["property_type"] == target["property_type"]:
+            score += SIMILARITY_WEIGHTS["type"]
+        features = {feature_key(f) for f in doc["features"]}
+        if target_features:
+            score += SIMILARITY_WEIGHTS["features"] * len(features & target_features) / math.sqrt(
+                max(len(features), 1) * len(target_features))
+        scored.append((score, doc["id"]))
+    scored.sort(reverse=True)
+    return scored[:k]
+
+
+def percentiles(samples: list) -> dict:
+    cuts = statistics.quantiles(samples, n=100) if len(samples) > 1 else samples * 99
+    return {"p50_ms": cuts[49] * 1000, "p95_ms": cuts[94] * 1000, "p99_ms": cuts[98] * 1000}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--baseline-queries", type=int, default=5, help="0 skips the pure-Python baseline")
+    parser.add_argument("--k", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", dest="json_path", help="write machine-readable results here")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    docs = make_documents(args.rows, rng)
+    index = SimilarityIndex(SIMILAR_MAX_FEATURES)
+
+    start = time.perf_counter()
+    for doc in docs:
+        index.upsert(doc)
+    index.fit()
+    build_s = time.perf_counter() - start
+
+    query_samples = []
+    for _ in range(args.queries):
+        property_id = rng.choice(docs)["id"]
+        start = time.perf_counter()
+        index.similar(property_id, args.k)
+        query_samples.append(time.perf_counter() - start)
+
+    upsert_samples = []
+    for _ in range(args.queries):
+        doc = {**rng.choice(docs), "price": rng.randrange(1_000_000, 60_000_000, 50_000)}
+        start = time.perf_counter()
+        index.upsert(doc)
+        upsert_samples.append(time.perf_counter() - start)
+
+    remove_samples = []
+    for doc in rng.sample(docs, args.queries):
+        start = time.perf_counter()
+        index.remove(doc["id"])
+        remove_samples.append(time.perf_counter() - start)
+        index.upsert(doc)
+
+    results = {
+        "rows": args.rows,
+        "k": args.k,
+        "build_s": build_s,
+        "index": index.stats(),
+        "similar": percentiles(query_samples),
+        "upsert": percentiles(upsert_samples),
+        "remove": percentiles(remove_samples),
+    }
+    print(f"Similarity index over {args.rows:,} listings ({index.stats()['bytes'] / 2**20:.1f} MiB, "
+          f"{index.stats()['features']} feature columns)")
+    print(f"  build:   {build_s:8.2f} s")
+    for name in ("similar", "upsert", "remove"):
+        stats = results[name]
+        print(f"  {name + ':':<8} p50 {stats['p50_ms']:8.3f} ms  p95 {stats['p95_ms']:8.3f} ms  p99 {stats['p99_ms']:8.3f} ms")
+
+    if args.baseline_queries:
+        samples = []
+        for _ in range(args.baseline_queries):
+            target = rng.choice(docs)
+            start = time.perf_counter()
+            baseline_similar(docs, index.inv_var.tolist(), target, args.k)
+            samples.append(time.perf_counter() - start)
+        results["baseline_ms"] = statistics.median(samples) * 1000
+        results["speedup"] = results["baseline_ms"] / results["similar"]["p50_ms"]
+        print(f"  baseline: {results['baseline_ms']:7.1f} ms median, {results['speedup']:.0f}x slower than the matrix")
+
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
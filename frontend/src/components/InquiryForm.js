@@ -1,10 +1,13 @@
-import { useState } from 'react';
+import { useRef, useState } from 'react';
 import { motion } from 'framer-motion';
 import axios from 'axios';
 import { toast } from 'sonner';
 
 const API = `${process.env.REACT_APP_BACKEND_URL}/api`;
 
+const newIdempotencyKey = () =>
+  window.crypto?.randomUUID?.() ?? `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+
 const InquiryForm = ({ propertyId, propertyTitle }) => {
   const [formData, setFormData] = useState({
     name: '',
@@ -13,8 +16,11 @@ const InquiryForm = ({ propertyId, propertyTitle }) => {
     message: '',
   });
   const [isSubmitting, setIsSubmitting] = useState(false);
+  // One key per message: retries and double submits of it are recorded once
+  const idempotencyKey = useRef(null);
 
   const handleChange = (e) => {
+    idempotencyKey.current = null;
     setFormData((prev) => ({
       ...prev,
       [e.target.name]: e.target.value,
@@ -23,20 +29,30 @@ const InquiryForm = ({ propertyId, propertyTitle }) => {
 
   const handleSubmit = async (e) => {
     e.preventDefault();
+    if (isSubmitting) return;
     setIsSubmitting(true);
+    idempotencyKey.current = idempotencyKey.current || newIdempotencyKey();
 
     try {
       await axios.post(`${API}/inquiries`, {
         ...formData,
         property_id: propertyId,
         property_title: propertyTitle,
+      }, {
+        headers: { 'Idempotency-Key': idempotencyKey.current },
       });
 
       toast.success('Your inquiry has been received. We will be in touch shortly.');
       setFormData({ name: '', email: '', phone: '', message: '' });
+      idempotencyKey.current = null;
     } catch (error) {
       console.error('Error submitting inquiry:', error);
-      toast.error('Unable to submit inquiry. Please try again.');
+      if (error.response?.status === 429) {
+        const minutes = Math.max(1, Math.ceil(Number(error.response.headers['retry-after'] || 60) / 60));
+        toast.error(`You have sent several inquiries recently. Please try again in ${minutes} minute${minutes === 1 ? '' : 's'}.`);
+      } else {
+        toast.error('Unable to submit inquiry. Please try again.');
+      }
     } finally {
       setIsSubmitting(false);
     }
@@ -1,6 +1,10 @@
 import { Link } from 'react-router-dom';
 import { motion } from 'framer-motion';
 import { MapPin } from 'lucide-react';
+import { imageVariants, mediaUrl, variantSrcSet } from '../lib/images';
+
+// Grid is 1/2/3 columns at the md/lg breakpoints
+const CARD_SIZES = '(min-width: 1024px) 33vw, (min-width: 768px) 50vw, 100vw';
 
 const PropertyCard = ({ property, index = 0 }) => {
   const formatPrice = (price) => {
@@ -12,6 +16,9 @@ const PropertyCard = ({ property, index = 0 }) => {
     }).format(price);
   };
 
+  const cover = property.images[0];
+  const variants = imageVariants(property, cover);
+
   return (
     <motion.div
       initial={{ opacity: 0, y: 20 }}
@@ -26,11 +33,20 @@ const PropertyCard = ({ property, index = 0 }) => {
       >
         {/* Image */}
         <div className="relative aspect-[4/5] overflow-hidden bg-charcoal">
-          <img
-            src={property.images[0]}
-            alt={property.title}
-            className="property-image w-full h-full object-cover img-muted"
-          />
+          <picture className="block w-full h-full">
+            {variants && (
+              <source type="image/webp" srcSet={variantSrcSet(variants, 'webp')} sizes={CARD_SIZES} />
+            )}
+            <img
+              src={mediaUrl(variants ? variants.card.jpeg : cover)}
+              srcSet={variants ? variantSrcSet(variants, 'jpeg') : undefined}
+              sizes={variants ? CARD_SIZES : undefined}
+              loading="lazy"
+              decoding="async"
+              alt={property.title}
+              className="property-image w-full h-full object-cover img-muted"
+            />
+          </picture>
           {property.featured && (
             <div className="absolute top-4 left-4">
               <span className="font-sans text-[10px] tracking-[0.2em] uppercase text-champagne bg-midnight/80 px-3 py-1">
@@ -47,7 +63,10 @@ const PropertyCard = ({ property, index = 0 }) => {
           </h3>
           <div className="flex items-center gap-2 text-stone">
             <MapPin strokeWidth={1} size={14} />
-            <span className="font-sans text-sm">{property.location}</span>
+            <span className="font-sans text-sm">
+              {property.location}
+              {property.distance_km !== undefined && ` · ${Math.round(property.distance_km).toLocaleString()} km away`}
+            </span>
           </div>
           <div className="flex items-center justify-between pt-2">
             <span className="font-serif text-lg text-champagne">
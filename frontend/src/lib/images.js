@@ -0,0 +1,15 @@
+const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
+
+// Uploaded images are served by the API under a relative /api/media path
+export const mediaUrl = (url) => (url && url.startsWith('/') ? `${BACKEND_URL}${url}` : url);
+
+// Resized renditions of one of a listing's images, if it was uploaded
+export const imageVariants = (property, src) =>
+  property.image_variants?.find((image) => image.src === src)?.variants;
+
+// "url 320w, url 800w, ..." for one format; small originals repeat a width, so dedupe
+export const variantSrcSet = (variants, format) => {
+  const byWidth = new Map();
+  Object.values(variants).forEach((variant) => byWidth.set(variant.width, variant[format]));
+  return [...byWidth].map(([width, url]) => `${mediaUrl(url)} ${width}w`).join(', ');
+};
@@ -1,19 +1,35 @@
-import { useEffect, useState } from 'react';
+import { useEffect, useRef, useState } from 'react';
 import { motion } from 'framer-motion';
 import axios from 'axios';
 import { toast } from 'sonner';
-import { Plus, Pencil, Trash2, X, Check, Eye } from 'lucide-react';
+import { Plus, Pencil, Trash2, X, Check, Eye, Upload } from 'lucide-react';
 import { Link } from 'react-router-dom';
+import { imageVariants, mediaUrl } from '../lib/images';
 
 const API = `${process.env.REACT_APP_BACKEND_URL}/api`;
+const PAGE_SIZE = 50;
+const STALE_INQUIRY_DAYS = 90;
+const INQUIRY_SEARCH_DELAY = 300;
+
+// Short summary of a bulk endpoint response for a toast
+const bulkMessage = (count, verb, failed) =>
+  `${count} ${verb}${failed ? `, ${failed} failed` : ''}`;
 
 const Admin = () => {
   const [properties, setProperties] = useState([]);
   const [inquiries, setInquiries] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [isLoading, setIsLoading] = useState(true);
   const [activeTab, setActiveTab] = useState('properties');
   const [isModalOpen, setIsModalOpen] = useState(false);
   const [editingProperty, setEditingProperty] = useState(null);
+  const [isUploading, setIsUploading] = useState(false);
+  const [selectedProperties, setSelectedProperties] = useState([]);
+  const [selectedInquiries, setSelectedInquiries] = useState([]);
+  const [inquiryFilters, setInquiryFilters] = useState({ q: '', property_id: '' });
+  const [inquiryCursor, setInquiryCursor] = useState(null);
+  const [inquirySummary, setInquirySummary] = useState([]);
+  const inquiryFiltersRef = useRef(inquiryFilters);
   const [formData, setFormData] = useState({
     title: '',
     location: '',
@@ -26,17 +42,41 @@ const Admin = () => {
     features: '',
     images: '',
     featured: false,
+    latitude: '',
+    longitude: '',
   });
 
+  const inquiryParams = (cursor) => {
+    const { q, property_id } = inquiryFiltersRef.current;
+    return {
+      limit: PAGE_SIZE,
+      ...(q.trim() && { q: q.trim() }),
+      ...(property_id && { property_id }),
+      ...(cursor && { cursor }),
+    };
+  };
+
+  const fetchInquiries = async () => {
+    const [inquiriesRes, summaryRes] = await Promise.all([
+      axios.get(`${API}/inquiries`, { params: inquiryParams() }),
+      axios.get(`${API}/inquiries/summary`),
+    ]);
+    setInquiries(inquiriesRes.data);
+    setInquiryCursor(inquiriesRes.headers['x-next-cursor'] || null);
+    setInquirySummary(summaryRes.data);
+    setSelectedInquiries([]);
+  };
+
   const fetchData = async () => {
     setIsLoading(true);
     try {
-      const [propertiesRes, inquiriesRes] = await Promise.all([
-        axios.get(`${API}/properties`),
-        axios.get(`${API}/inquiries`),
+      const [propertiesRes] = await Promise.all([
+        axios.get(`${API}/properties?limit=${PAGE_SIZE}`),
+        fetchInquiries(),
       ]);
       setProperties(propertiesRes.data);
-      setInquiries(inquiriesRes.data);
+      setNextCursor(propertiesRes.headers['x-next-cursor'] || null);
+      setSelectedProperties([]);
     } catch (error) {
       console.error('Error fetching data:', error);
       toast.error('Failed to load data');
@@ -45,6 +85,28 @@ const Admin = () => {
     }
   };
 
+  const loadMoreProperties = async () => {
+    try {
+      const response = await axios.get(`${API}/properties?limit=${PAGE_SIZE}&cursor=${nextCursor}`);
+      setProperties((prev) => [...prev, ...response.data]);
+      setNextCursor(response.headers['x-next-cursor'] || null);
+    } catch (error) {
+      console.error('Error loading properties:', error);
+      toast.error('Failed to load more properties');
+    }
+  };
+
+  const loadMoreInquiries = async () => {
+    try {
+      const response = await axios.get(`${API}/inquiries`, { params: inquiryParams(inquiryCursor) });
+      setInquiries((prev) => [...prev, ...response.data]);
+      setInquiryCursor(response.headers['x-next-cursor'] || null);
+    } catch (error) {
+      console.error('Error loading inquiries:', error);
+      toast.error('Failed to load more inquiries');
+    }
+  };
+
   const seedData = async () => {
     try {
       const response = await axios.post(`${API}/seed`);
@@ -56,10 +118,67 @@ const Admin = () => {
     }
   };
 
+  // Merge a listing into the loaded ones; a stale version never overwrites a newer one
+  const upsertProperty = (property, prepend = false) => {
+    setProperties((prev) => {
+      const current = prev.find((p) => p.id === property.id);
+      if (!current) return prepend ? [property, ...prev] : prev;
+      if ((property.version ?? 0) < (current.version ?? 0)) return prev;
+      return prev.map((p) => (p.id === property.id ? { ...p, ...property } : p));
+    });
+  };
+
+  const removeItem = (collection, id) => {
+    const keep = (item) => (item.id ?? item) !== id;
+    if (collection === 'properties') {
+      setProperties((prev) => prev.filter(keep));
+      setSelectedProperties((prev) => prev.filter(keep));
+    } else {
+      setInquiries((prev) => prev.filter(keep));
+      setSelectedInquiries((prev) => prev.filter(keep));
+    }
+  };
+
   useEffect(() => {
     fetchData();
   }, []);
 
+  // Refilter the inbox on the server once typing pauses
+  useEffect(() => {
+    if (inquiryFiltersRef.current === inquiryFilters) return undefined;
+    inquiryFiltersRef.current = inquiryFilters;
+    const timer = setTimeout(() => {
+      fetchInquiries().catch((error) => {
+        console.error('Error filtering inquiries:', error);
+        toast.error('Failed to load inquiries');
+      });
+    }, INQUIRY_SEARCH_DELAY);
+    return () => clearTimeout(timer);
+  }, [inquiryFilters]);
+
+  // Apply everyone's changes as deltas from the server instead of refetching after each action
+  useEffect(() => {
+    const source = new EventSource(`${API}/changes`);
+    const on = (type, handler) => source.addEventListener(type, (e) => handler(JSON.parse(e.data)));
+    on('insert', ({ collection, doc }) => {
+      if (collection === 'properties') {
+        upsertProperty(doc, true);
+      } else {
+        // A filtered inbox only shows what the server matched; new inquiries appear once filters are cleared
+        const { q, property_id } = inquiryFiltersRef.current;
+        if (q.trim() || property_id) return;
+        setInquiries((prev) => (prev.some((i) => i.id === doc.id) ? prev : [doc, ...prev]));
+      }
+    });
+    on('update', ({ collection, id, fields }) => {
+      if (collection === 'properties') upsertProperty({ ...fields, id });
+    });
+    on('delete', ({ collection, id }) => removeItem(collection, id));
+    // Deltas were missed (or a bulk write happened): start over from a full load
+    on('reset', () => fetchData());
+    return () => source.close();
+  }, []);
+
   const openModal = (property = null) => {
     if (property) {
       setEditingProperty(property);
@@ -75,6 +194,8 @@ const Admin = () => {
         features: property.features.join(', '),
         images: property.images.join('\n'),
         featured: property.featured,
+        latitude: property.latitude?.toString() ?? '',
+        longitude: property.longitude?.toString() ?? '',
       });
     } else {
       setEditingProperty(null);
@@ -90,6 +211,8 @@ const Admin = () => {
         features: '',
         images: '',
         featured: false,
+        latitude: '',
+        longitude: '',
       });
     }
     setIsModalOpen(true);
@@ -116,20 +239,61 @@ const Admin = () => {
       images: formData.images.split('\n').map((i) => i.trim()).filter((i) => i),
       featured: formData.featured,
     };
+    // Coordinates are optional but only meaningful as a pair
+    if (formData.latitude !== '' && formData.longitude !== '') {
+      propertyData.latitude = parseFloat(formData.latitude);
+      propertyData.longitude = parseFloat(formData.longitude);
+    }
 
     try {
       if (editingProperty) {
-        await axios.put(`${API}/properties/${editingProperty.id}`, propertyData);
+        const response = await axios.put(`${API}/properties/${editingProperty.id}`, propertyData, {
+          headers: { 'If-Match': `"${editingProperty.version}"` },
+        });
+        upsertProperty(response.data);
         toast.success('Property updated successfully');
       } else {
-        await axios.post(`${API}/properties`, propertyData);
+        const response = await axios.post(`${API}/properties`, propertyData);
+        upsertProperty(response.data, true);
         toast.success('Property created successfully');
       }
       closeModal();
-      fetchData();
     } catch (error) {
       console.error('Error saving property:', error);
-      toast.error('Failed to save property');
+      if (error.response?.status === 412) {
+        toast.error('This property was changed by someone else. Reload and try again.');
+        fetchData();
+      } else {
+        toast.error('Failed to save property');
+      }
+    }
+  };
+
+  const uploadImages = async (e) => {
+    const files = Array.from(e.target.files);
+    e.target.value = '';
+    if (!files.length || !editingProperty) return;
+
+    const body = new FormData();
+    files.forEach((file) => body.append('files', file));
+    setIsUploading(true);
+    try {
+      const response = await axios.post(`${API}/properties/${editingProperty.id}/images`, body, {
+        headers: { 'If-Match': `"${editingProperty.version}"` },
+      });
+      setEditingProperty(response.data);
+      setFormData((current) => ({ ...current, images: response.data.images.join('\n') }));
+      upsertProperty(response.data);
+      toast.success(files.length === 1 ? 'Image uploaded' : `${files.length} images uploaded`);
+    } catch (error) {
+      console.error('Error uploading images:', error);
+      if (error.response?.status === 412) {
+        toast.error('This property was changed by someone else. Reload and try again.');
+      } else {
+        toast.error(error.response?.data?.detail || 'Failed to upload images');
+      }
+    } finally {
+      setIsUploading(false);
     }
   };
 
@@ -139,7 +303,7 @@ const Admin = () => {
     try {
       await axios.delete(`${API}/properties/${id}`);
       toast.success('Property deleted');
-      fetchData();
+      removeItem('properties', id);
     } catch (error) {
       console.error('Error deleting property:', error);
       toast.error('Failed to delete property');
@@ -152,13 +316,85 @@ const Admin = () => {
     try {
       await axios.delete(`${API}/inquiries/${id}`);
       toast.success('Inquiry deleted');
-      fetchData();
+      removeItem('inquiries', id);
     } catch (error) {
       console.error('Error deleting inquiry:', error);
       toast.error('Failed to delete inquiry');
     }
   };
 
+  const toggleSelected = (setSelected, id) => {
+    setSelected((prev) => (prev.includes(id) ? prev.filter((s) => s !== id) : [...prev, id]));
+  };
+
+  const bulkUpdateProperties = async (change) => {
+    try {
+      const response = await axios.post(`${API}/properties/bulk-update`, { ids: selectedProperties, ...change });
+      const items = Object.fromEntries(response.data.items.map((item) => [item.id, item]));
+      setProperties((prev) => prev.map((p) => (items[p.id] ? { ...p, ...items[p.id] } : p)));
+      setSelectedProperties(response.data.errors.map((e) => e.id));
+      toast.success(bulkMessage(response.data.updated, 'updated', response.data.failed));
+    } catch (error) {
+      console.error('Error updating properties:', error);
+      toast.error(error.response?.data?.detail || 'Failed to update properties');
+    }
+  };
+
+  const adjustSelectedPrices = () => {
+    const input = window.prompt('Change prices by what percentage? (e.g. -5 for a 5% reduction)');
+    if (input === null) return;
+    const percent = parseFloat(input);
+    if (Number.isNaN(percent) || percent <= -100) {
+      toast.error('Enter a percentage above -100');
+      return;
+    }
+    bulkUpdateProperties({ price_percent: percent });
+  };
+
+  const deleteSelectedProperties = async () => {
+    if (!window.confirm(`Delete ${selectedProperties.length} selected properties?`)) return;
+    try {
+      const response = await axios.post(`${API}/properties/bulk-delete`, { ids: selectedProperties });
+      const remaining = new Set(response.data.errors.map((e) => e.id));
+      const removed = new Set(selectedProperties.filter((id) => !remaining.has(id)));
+      setProperties((prev) => prev.filter((p) => !removed.has(p.id)));
+      setSelectedProperties([...remaining]);
+      toast.success(bulkMessage(response.data.deleted, 'deleted', response.data.failed));
+    } catch (error) {
+      console.error('Error deleting properties:', error);
+      toast.error('Failed to delete properties');
+    }
+  };
+
+  const deleteSelectedInquiries = async () => {
+    if (!window.confirm(`Delete ${selectedInquiries.length} selected inquiries?`)) return;
+    try {
+      const response = await axios.post(`${API}/inquiries/bulk-delete`, { ids: selectedInquiries });
+      const remaining = new Set(response.data.errors.map((e) => e.id));
+      const removed = new Set(selectedInquiries.filter((id) => !remaining.has(id)));
+      setInquiries((prev) => prev.filter((i) => !removed.has(i.id)));
+      setSelectedInquiries([...remaining]);
+      toast.success(bulkMessage(response.data.deleted, 'deleted', response.data.failed));
+    } catch (error) {
+      console.error('Error deleting inquiries:', error);
+      toast.error('Failed to delete inquiries');
+    }
+  };
+
+  const deleteStaleInquiries = async () => {
+    if (!window.confirm(`Delete all inquiries older than ${STALE_INQUIRY_DAYS} days?`)) return;
+    const until = new Date(Date.now() - STALE_INQUIRY_DAYS * 24 * 60 * 60 * 1000);
+    try {
+      const response = await axios.post(`${API}/inquiries/bulk-delete`, { until: until.toISOString() });
+      setInquiries((prev) => prev.filter((i) => new Date(i.created_at) >= until));
+      setSelectedInquiries([]);
+      toast.success(bulkMessage(response.data.deleted, 'deleted', response.data.failed));
+    } catch (error) {
+      console.error('Error deleting inquiries:', error);
+      toast.error('Failed to delete inquiries');
+    }
+  };
+
   const formatPrice = (price) => {
     return new Intl.NumberFormat('en-US', {
       style: 'currency',
@@ -219,7 +455,7 @@ const Admin = () => {
             }`}
             data-testid="tab-properties"
           >
-            Properties ({properties.length})
+            Properties ({properties.length}{nextCursor ? '+' : ''})
           </button>
           <button
             onClick={() => setActiveTab('inquiries')}
@@ -228,7 +464,7 @@ const Admin = () => {
             }`}
             data-testid="tab-inquiries"
           >
-            Inquiries ({inquiries.length})
+            Inquiries ({inquiries.length}{inquiryCursor ? '+' : ''})
           </button>
         </div>
 
@@ -239,6 +475,40 @@ const Admin = () => {
           </div>
         ) : activeTab === 'properties' ? (
           <div className="space-y-4">
+            {properties.length > 0 && (
+              <div className="flex flex-wrap items-center gap-6 bg-charcoal px-6 py-4" data-testid="properties-bulk-bar">
+                <label className="flex items-center gap-3 font-sans text-sm text-stone">
+                  <input
+                    type="checkbox"
+                    checked={selectedProperties.length === properties.length}
+                    onChange={(e) => setSelectedProperties(e.target.checked ? properties.map((p) => p.id) : [])}
+                    className="w-4 h-4"
+                    data-testid="select-all-properties"
+                  />
+                  {selectedProperties.length ? `${selectedProperties.length} selected` : 'Select all'}
+                </label>
+                {selectedProperties.length > 0 && (
+                  <>
+                    <button onClick={() => bulkUpdateProperties({ featured: true })} className="font-sans text-xs tracking-[0.1em] uppercase text-stone hover:text-ivory transition-colors duration-300" data-testid="bulk-feature-btn">
+                      Feature
+                    </button>
+                    <button onClick={() => bulkUpdateProperties({ featured: false })} className="font-sans text-xs tracking-[0.1em] uppercase text-stone hover:text-ivory transition-colors duration-300" data-testid="bulk-unfeature-btn">
+                      Unfeature
+                    </button>
+                    <button onClick={adjustSelectedPrices} className="font-sans text-xs tracking-[0.1em] uppercase text-stone hover:text-ivory transition-colors duration-300" data-testid="bulk-price-btn">
+                      Adjust Price
+                    </button>
+                    <button
+                      onClick={deleteSelectedProperties}
+                      className="font-sans text-xs tracking-[0.1em] uppercase text-stone hover:text-red-400 transition-colors duration-300"
+                      data-testid="bulk-delete-properties-btn"
+                    >
+                      Delete
+                    </button>
+                  </>
+                )}
+              </div>
+            )}
             {properties.length === 0 ? (
               <div className="text-center py-12 bg-charcoal">
                 <p className="font-serif text-xl text-stone">No properties yet</p>
@@ -253,10 +523,19 @@ const Admin = () => {
                   className="bg-charcoal p-6 flex flex-col md:flex-row gap-6"
                   data-testid={`admin-property-${property.id}`}
                 >
+                  <input
+                    type="checkbox"
+                    checked={selectedProperties.includes(property.id)}
+                    onChange={() => toggleSelected(setSelectedProperties, property.id)}
+                    className="w-4 h-4 flex-shrink-0 self-start md:self-center"
+                    aria-label={`Select ${property.title}`}
+                    data-testid={`select-property-${property.id}`}
+                  />
                   <div className="w-full md:w-48 h-32 flex-shrink-0">
                     <img
-                      src={property.images[0]}
+                      src={mediaUrl(imageVariants(property, property.images[0])?.thumb.jpeg || property.images[0])}
                       alt={property.title}
+                      loading="lazy"
                       className="w-full h-full object-cover"
                     />
                   </div>
@@ -308,12 +587,74 @@ const Admin = () => {
                 </motion.div>
               ))
             )}
+            {nextCursor && (
+              <div className="text-center pt-4">
+                <button
+                  onClick={loadMoreProperties}
+                  className="btn-luxury"
+                  data-testid="load-more-properties-btn"
+                >
+                  Load More
+                </button>
+              </div>
+            )}
           </div>
         ) : (
           <div className="space-y-4">
+            <div className="flex flex-wrap items-center gap-4" data-testid="inquiries-filters">
+              <input
+                type="search"
+                value={inquiryFilters.q}
+                onChange={(e) => setInquiryFilters((prev) => ({ ...prev, q: e.target.value }))}
+                placeholder="Search name or message"
+                className="input-luxury flex-1 min-w-[200px]"
+                data-testid="inquiries-search"
+              />
+              <select
+                value={inquiryFilters.property_id}
+                onChange={(e) => setInquiryFilters((prev) => ({ ...prev, property_id: e.target.value }))}
+                className="input-luxury bg-transparent md:w-72"
+                data-testid="inquiries-property-filter"
+              >
+                <option value="">All properties</option>
+                {inquirySummary.filter((row) => row.property_id).map((row) => (
+                  <option key={row.property_id} value={row.property_id}>
+                    {row.title || 'Removed listing'} ({row.count})
+                  </option>
+                ))}
+              </select>
+            </div>
+            {inquiries.length > 0 && (
+              <div className="flex flex-wrap items-center gap-6 bg-charcoal px-6 py-4" data-testid="inquiries-bulk-bar">
+                <label className="flex items-center gap-3 font-sans text-sm text-stone">
+                  <input
+                    type="checkbox"
+                    checked={selectedInquiries.length === inquiries.length}
+                    onChange={(e) => setSelectedInquiries(e.target.checked ? inquiries.map((i) => i.id) : [])}
+                    className="w-4 h-4"
+                    data-testid="select-all-inquiries"
+                  />
+                  {selectedInquiries.length ? `${selectedInquiries.length} selected` : 'Select all'}
+                </label>
+                {selectedInquiries.length > 0 && (
+                  <button
+                    onClick={deleteSelectedInquiries}
+                    className="font-sans text-xs tracking-[0.1em] uppercase text-stone hover:text-red-400 transition-colors duration-300"
+                    data-testid="bulk-delete-inquiries-btn"
+                  >
+                    Delete
+                  </button>
+                )}
+                <button onClick={deleteStaleInquiries} className="font-sans text-xs tracking-[0.1em] uppercase text-stone hover:text-ivory transition-colors duration-300 ml-auto" data-testid="delete-stale-inquiries-btn">
+                  Delete Older Than {STALE_INQUIRY_DAYS} Days
+                </button>
+              </div>
+            )}
             {inquiries.length === 0 ? (
               <div className="text-center py-12 bg-charcoal">
-                <p className="font-serif text-xl text-stone">No inquiries yet</p>
+                <p className="font-serif text-xl text-stone">
+                  {inquiryFilters.q.trim() || inquiryFilters.property_id ? 'No matching inquiries' : 'No inquiries yet'}
+                </p>
               </div>
             ) : (
               inquiries.map((inquiry) => (
@@ -325,6 +666,14 @@ const Admin = () => {
                   data-testid={`admin-inquiry-${inquiry.id}`}
                 >
                   <div className="flex flex-col md:flex-row md:items-start justify-between gap-4">
+                    <input
+                      type="checkbox"
+                      checked={selectedInquiries.includes(inquiry.id)}
+                      onChange={() => toggleSelected(setSelectedInquiries, inquiry.id)}
+                      className="w-4 h-4 mt-2 flex-shrink-0"
+                      aria-label={`Select inquiry from ${inquiry.name}`}
+                      data-testid={`select-inquiry-${inquiry.id}`}
+                    />
                     <div className="flex-grow">
                       <div className="flex items-center gap-4 mb-2">
                         <h3 className="font-serif text-xl text-ivory">{inquiry.name}</h3>
@@ -351,6 +700,17 @@ const Admin = () => {
                 </motion.div>
               ))
             )}
+            {inquiryCursor && (
+              <div className="text-center pt-4">
+                <button
+                  onClick={loadMoreInquiries}
+                  className="btn-luxury"
+                  data-testid="load-more-inquiries-btn"
+                >
+                  Load More
+                </button>
+              </div>
+            )}
           </div>
         )}
       </div>
@@ -401,6 +761,37 @@ const Admin = () => {
                 </div>
               </div>
 
+              <div className="grid grid-cols-1 md:grid-cols-2 gap-6">
+                <div>
+                  <label className="block font-sans text-xs tracking-[0.1em] uppercase text-stone mb-2">Latitude</label>
+                  <input
+                    type="number"
+                    step="any"
+                    min="-90"
+                    max="90"
+                    value={formData.latitude}
+                    onChange={(e) => setFormData({ ...formData, latitude: e.target.value })}
+                    required={formData.longitude !== ''}
+                    className="input-luxury"
+                    data-testid="modal-latitude-input"
+                  />
+                </div>
+                <div>
+                  <label className="block font-sans text-xs tracking-[0.1em] uppercase text-stone mb-2">Longitude</label>
+                  <input
+                    type="number"
+                    step="any"
+                    min="-180"
+                    max="180"
+                    value={formData.longitude}
+                    onChange={(e) => setFormData({ ...formData, longitude: e.target.value })}
+                    required={formData.latitude !== ''}
+                    className="input-luxury"
+                    data-testid="modal-longitude-input"
+                  />
+                </div>
+              </div>
+
               <div className="grid grid-cols-1 md:grid-cols-3 gap-6">
                 <div>
                   <label className="block font-sans text-xs tracking-[0.1em] uppercase text-stone mb-2">Price ($)</label>
@@ -510,6 +901,20 @@ const Admin = () => {
                   rows={3}
                   data-testid="modal-images-input"
                 />
+                {editingProperty && (
+                  <label className="btn-luxury mt-3 inline-flex items-center gap-2 cursor-pointer" data-testid="modal-upload-images">
+                    <Upload strokeWidth={1} size={14} />
+                    {isUploading ? 'Uploading...' : 'Upload Images'}
+                    <input
+                      type="file"
+                      accept="image/jpeg,image/png,image/webp"
+                      multiple
+                      className="hidden"
+                      disabled={isUploading}
+                      onChange={uploadImages}
+                    />
+                  </label>
+                )}
               </div>
 
               <div className="flex gap-4 pt-4">
@@ -14,7 +14,7 @@ const Home = () => {
   useEffect(() => {
     const fetchFeatured = async () => {
       try {
-        const response = await axios.get(`${API}/properties?featured=true`);
+        const response = await axios.get(`${API}/properties?featured=true&view=summary&limit=3`);
         setFeaturedProperties(response.data.slice(0, 3));
       } catch (error) {
         console.error('Error fetching properties:', error);
@@ -6,39 +6,103 @@ import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from '.
 import { SlidersHorizontal, X } from 'lucide-react';
 
 const API = `${process.env.REACT_APP_BACKEND_URL}/api`;
+const PAGE_SIZE = 12;
 
 const Properties = () => {
   const [properties, setProperties] = useState([]);
   const [isLoading, setIsLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
+  const [typeCounts, setTypeCounts] = useState({});
   const [showFilters, setShowFilters] = useState(false);
+  const [origin, setOrigin] = useState(null);
   const [filters, setFilters] = useState({
     property_type: '',
     min_price: '',
     max_price: '',
     bedrooms: '',
+    radius: '',
   });
 
-  const fetchProperties = async () => {
-    setIsLoading(true);
+  // A distance filter searches around the visitor, sorted nearest first
+  const appendDistance = (params) => {
+    if (filters.radius && origin) {
+      params.append('near', `${origin.latitude},${origin.longitude}`);
+      params.append('radius', filters.radius);
+    }
+  };
+
+  const fetchProperties = async (cursor = null) => {
+    if (cursor) {
+      setIsLoadingMore(true);
+    } else {
+      setIsLoading(true);
+    }
     try {
       const params = new URLSearchParams();
       if (filters.property_type) params.append('property_type', filters.property_type);
       if (filters.min_price) params.append('min_price', filters.min_price);
       if (filters.max_price) params.append('max_price', filters.max_price);
       if (filters.bedrooms) params.append('bedrooms', filters.bedrooms);
+      appendDistance(params);
+      if (filters.radius && origin) params.append('sort', 'distance');
+      params.append('limit', PAGE_SIZE);
+      params.append('view', 'summary');
+      if (cursor) params.append('cursor', cursor);
 
       const response = await axios.get(`${API}/properties?${params.toString()}`);
-      setProperties(response.data);
+      setProperties((prev) => (cursor ? [...prev, ...response.data] : response.data));
+      setNextCursor(response.headers['x-next-cursor'] || null);
     } catch (error) {
       console.error('Error fetching properties:', error);
     } finally {
       setIsLoading(false);
+      setIsLoadingMore(false);
+    }
+  };
+
+  const fetchTypeCounts = async () => {
+    try {
+      // Leave the type filter out so every option shows how many listings it would match
+      const params = new URLSearchParams();
+      if (filters.min_price) params.append('min_price', filters.min_price);
+      if (filters.max_price) params.append('max_price', filters.max_price);
+      if (filters.bedrooms) params.append('bedrooms', filters.bedrooms);
+      appendDistance(params);
+
+      const response = await axios.get(`${API}/properties/facets?${params.toString()}`);
+      setTypeCounts(Object.fromEntries(response.data.property_type.map((f) => [f.value, f.count])));
+    } catch (error) {
+      console.error('Error fetching facets:', error);
     }
   };
 
   useEffect(() => {
+    if (!filters.radius || origin) return;
+    if (!navigator.geolocation) {
+      setFilters((prev) => ({ ...prev, radius: '' }));
+      return;
+    }
+    navigator.geolocation.getCurrentPosition(
+      ({ coords }) => setOrigin({ latitude: coords.latitude.toFixed(4), longitude: coords.longitude.toFixed(4) }),
+      (error) => {
+        console.error('Error getting location:', error);
+        setFilters((prev) => ({ ...prev, radius: '' }));
+      }
+    );
+  }, [filters.radius, origin]);
+
+  useEffect(() => {
+    if (filters.radius && !origin) return; // waiting for the browser's location
     fetchProperties();
-  }, [filters]);
+  }, [filters, origin]);
+
+  useEffect(() => {
+    if (filters.radius && !origin) return;
+    fetchTypeCounts();
+  }, [filters.min_price, filters.max_price, filters.bedrooms, filters.radius, origin]);
+
+  const typeLabel = (value, label) => (value in typeCounts ? `${label} (${typeCounts[value]})` : label);
 
   const clearFilters = () => {
     setFilters({
@@ -46,6 +110,7 @@ const Properties = () => {
       min_price: '',
       max_price: '',
       bedrooms: '',
+      radius: '',
     });
   };
 
@@ -106,7 +171,7 @@ const Properties = () => {
             transition={{ duration: 0.3 }}
             className="overflow-hidden"
           >
-            <div className="grid grid-cols-1 md:grid-cols-4 gap-6 pt-8">
+            <div className="grid grid-cols-1 md:grid-cols-5 gap-6 pt-8">
               <div>
                 <label className="block font-sans text-xs tracking-[0.1em] uppercase text-stone mb-3">
                   Property Type
@@ -119,10 +184,10 @@ const Properties = () => {
                     <SelectValue placeholder="All Types" />
                   </SelectTrigger>
                   <SelectContent className="bg-charcoal border-stone/20">
-                    <SelectItem value="estate" className="text-ivory">Estate</SelectItem>
-                    <SelectItem value="penthouse" className="text-ivory">Penthouse</SelectItem>
-                    <SelectItem value="villa" className="text-ivory">Villa</SelectItem>
-                    <SelectItem value="apartment" className="text-ivory">Apartment</SelectItem>
+                    <SelectItem value="estate" className="text-ivory">{typeLabel('estate', 'Estate')}</SelectItem>
+                    <SelectItem value="penthouse" className="text-ivory">{typeLabel('penthouse', 'Penthouse')}</SelectItem>
+                    <SelectItem value="villa" className="text-ivory">{typeLabel('villa', 'Villa')}</SelectItem>
+                    <SelectItem value="apartment" className="text-ivory">{typeLabel('apartment', 'Apartment')}</SelectItem>
                   </SelectContent>
                 </Select>
               </div>
@@ -186,6 +251,26 @@ const Properties = () => {
                   </SelectContent>
                 </Select>
               </div>
+
+              <div>
+                <label className="block font-sans text-xs tracking-[0.1em] uppercase text-stone mb-3">
+                  Distance
+                </label>
+                <Select
+                  value={filters.radius}
+                  onValueChange={(value) => setFilters((prev) => ({ ...prev, radius: value }))}
+                >
+                  <SelectTrigger className="w-full bg-charcoal border-stone/20 text-ivory" data-testid="filter-distance-select">
+                    <SelectValue placeholder="Anywhere" />
+                  </SelectTrigger>
+                  <SelectContent className="bg-charcoal border-stone/20">
+                    <SelectItem value="25" className="text-ivory">Within 25 km</SelectItem>
+                    <SelectItem value="100" className="text-ivory">Within 100 km</SelectItem>
+                    <SelectItem value="500" className="text-ivory">Within 500 km</SelectItem>
+                    <SelectItem value="2000" className="text-ivory">Within 2,000 km</SelectItem>
+                  </SelectContent>
+                </Select>
+              </div>
             </div>
           </motion.div>
         </div>
@@ -218,11 +303,25 @@ const Properties = () => {
               </button>
             </div>
           ) : (
-            <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-8 md:gap-12">
-              {properties.map((property, index) => (
-                <PropertyCard key={property.id} property={property} index={index} />
-              ))}
-            </div>
+            <>
+              <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-8 md:gap-12">
+                {properties.map((property, index) => (
+                  <PropertyCard key={property.id} property={property} index={index % PAGE_SIZE} />
+                ))}
+              </div>
+              {nextCursor && (
+                <div className="text-center mt-16">
+                  <button
+                    onClick={() => fetchProperties(nextCursor)}
+                    disabled={isLoadingMore}
+                    className="btn-luxury"
+                    data-testid="load-more-btn"
+                  >
+                    {isLoadingMore ? 'Loading...' : 'Load More'}
+                  </button>
+                </div>
+              )}
+            </>
           )}
         </div>
       </section>
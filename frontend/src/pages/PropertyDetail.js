@@ -3,6 +3,8 @@ import { useParams, Link } from 'react-router-dom';
 import { motion, AnimatePresence } from 'framer-motion';
 import axios from 'axios';
 import InquiryForm from '../components/InquiryForm';
+import PropertyCard from '../components/PropertyCard';
+import { imageVariants, mediaUrl, variantSrcSet } from '../lib/images';
 import { ArrowLeft, ChevronLeft, ChevronRight, MapPin, Bed, Bath, Square, X } from 'lucide-react';
 
 const API = `${process.env.REACT_APP_BACKEND_URL}/api`;
@@ -13,6 +15,7 @@ const PropertyDetail = () => {
   const [isLoading, setIsLoading] = useState(true);
   const [currentImageIndex, setCurrentImageIndex] = useState(0);
   const [isGalleryOpen, setIsGalleryOpen] = useState(false);
+  const [similar, setSimilar] = useState([]);
 
   useEffect(() => {
     const fetchProperty = async () => {
@@ -26,7 +29,19 @@ const PropertyDetail = () => {
       }
     };
 
+    const fetchSimilar = async () => {
+      try {
+        const response = await axios.get(`${API}/properties/${id}/similar`, { params: { k: 3 } });
+        setSimilar(response.data);
+      } catch (error) {
+        setSimilar([]);
+      }
+    };
+
+    // Following a similar listing reuses this page, so start its gallery from the cover
+    setCurrentImageIndex(0);
     fetchProperty();
+    fetchSimilar();
   }, [id]);
 
   const formatPrice = (price) => {
@@ -65,6 +80,9 @@ const PropertyDetail = () => {
     );
   }
 
+  const currentImage = property.images[currentImageIndex];
+  const variants = imageVariants(property, currentImage);
+
   return (
     <div className="bg-midnight min-h-screen" data-testid="property-detail-page">
       {/* Back Button */}
@@ -81,16 +99,21 @@ const PropertyDetail = () => {
 
       {/* Hero Image */}
       <section className="relative h-[70vh] md:h-[80vh]">
-        <motion.img
-          initial={{ opacity: 0 }}
-          animate={{ opacity: 1 }}
-          transition={{ duration: 0.9 }}
-          src={property.images[currentImageIndex]}
-          alt={property.title}
-          className="w-full h-full object-cover img-muted cursor-pointer"
-          onClick={() => setIsGalleryOpen(true)}
-          data-testid="property-hero-image"
-        />
+        <picture className="block w-full h-full">
+          {variants && <source type="image/webp" srcSet={variantSrcSet(variants, 'webp')} sizes="100vw" />}
+          <motion.img
+            initial={{ opacity: 0 }}
+            animate={{ opacity: 1 }}
+            transition={{ duration: 0.9 }}
+            src={mediaUrl(currentImage)}
+            srcSet={variants ? variantSrcSet(variants, 'jpeg') : undefined}
+            sizes={variants ? '100vw' : undefined}
+            alt={property.title}
+            className="w-full h-full object-cover img-muted cursor-pointer"
+            onClick={() => setIsGalleryOpen(true)}
+            data-testid="property-hero-image"
+          />
+        </picture>
         <div className="absolute inset-0 bg-gradient-to-t from-midnight via-transparent to-transparent" />
 
         {/* Image Navigation */}
@@ -229,6 +252,21 @@ const PropertyDetail = () => {
         </div>
       </section>
 
+      {/* Similar Properties */}
+      {similar.length > 0 && (
+        <section className="py-24 md:py-32 bg-charcoal" data-testid="similar-properties">
+          <div className="max-w-[1800px] mx-auto px-6 md:px-12">
+            <span className="font-sans text-xs tracking-[0.3em] uppercase text-champagne">You May Also Consider</span>
+            <h2 className="mt-4 mb-16 font-serif text-3xl md:text-4xl text-ivory">Similar Properties</h2>
+            <div className="grid grid-cols-1 md:grid-cols-3 gap-8">
+              {similar.map((item, index) => (
+                <PropertyCard key={item.id} property={item} index={index} />
+              ))}
+            </div>
+          </div>
+        </section>
+      )}
+
       {/* Fullscreen Gallery */}
       <AnimatePresence>
         {isGalleryOpen && (
@@ -258,11 +296,16 @@ const PropertyDetail = () => {
               <ChevronLeft strokeWidth={1} size={48} />
             </button>
 
-            <img
-              src={property.images[currentImageIndex]}
-              alt={property.title}
-              className="max-w-[90vw] max-h-[80vh] object-contain"
-            />
+            <picture>
+              {variants && <source type="image/webp" srcSet={variantSrcSet(variants, 'webp')} sizes="90vw" />}
+              <img
+                src={mediaUrl(currentImage)}
+                srcSet={variants ? variantSrcSet(variants, 'jpeg') : undefined}
+                sizes={variants ? '90vw' : undefined}
+                alt={property.title}
+                className="max-w-[90vw] max-h-[80vh] object-contain"
+              />
+            </picture>
 
             <button
               onClick={nextImage}
@@ -0,0 +1,69 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# server.py reads its configuration at import time
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "test_database")
+os.environ["EMAIL_SENDER"] = "log"
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import httpx  # noqa: E402
+from mongomock_motor import AsyncMongoMockClient  # noqa: E402
+
+import server  # noqa: E402
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(autouse=True)
+def db(monkeypatch):
+    """Point the app at a fresh in-memory database with empty per-process state."""
+    client = AsyncMongoMockClient()
+    database = client[os.environ["DB_NAME"]]
+    monkeypatch.setattr(server, "client", client)
+    monkeypatch.setattr(server, "db", database)
+    # mongomock ignores partialFilterExpression, so the unique external_id
+    # index would reject every listing without one
+    monkeypatch.setattr(server, "PROPERTY_INDEXES", [
+        index for index in server.PROPERTY_INDEXES
+        if "partialFilterExpression" not in index.document
+    ])
+    for cache in (server.property_cache, server.listing_cache, server.facet_cache, server.inquiry_summary_cache):
+        cache.clear()
+    monkeypatch.setattr(server.collection_versions, "_local", {})
+    monkeypatch.setattr(server, "similar_index", server.SimilarityIndex(server.SIMILAR_MAX_FEATURES))
+    monkeypatch.setattr(server, "rate_limiter", server.RateLimiter(server.RATE_LIMIT_MAX_KEYS))
+    monkeypatch.setattr(server, "idempotency_store", server.IdempotencyStore(
+        server.IDEMPOTENCY_CACHE_SIZE, server.IDEMPOTENCY_TTL
+    ))
+    monkeypatch.setattr(server, "inquiry_limits", {"ip": None, "email": None})
+    return database
+
+
+@pytest.fixture
+async def api(db):
+    async with server.app.router.lifespan_context(server.app):
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            yield http
+
+
+def listing(**overrides) -> dict:
+    """A valid PropertyCreate body."""
+    return {
+        "title": "Villa",
+        "location": "Rome, Italy",
+        "price": 1_000_000,
+        "property_type": "villa",
+        "bedrooms": 4,
+        "bathrooms": 3,
+        "area": 300,
+        "description": "Test listing",
+        **overrides,
+    }
@@ -0,0 +1,46 @@
+import pytest
+
+import server
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def feed(monkeypatch):
+    # ASGITransport buffers the whole response, so streams must end on their own
+    monkeypatch.setattr(server, "CHANGE_FEED_MAX_AGE", 0.3)
+    monkeypatch.setattr(server, "CHANGE_FEED_HEARTBEAT", 0.1)
+    feed = server.ChangeFeed(poll_interval=60)
+    monkeypatch.setattr(server, "change_feed", feed)
+    return feed
+
+
+def event_ids(body: str) -> list:
+    return [line[len("id: "):] for line in body.splitlines() if line.startswith("id: ")]
+
+
+async def test_quiet_stream_still_carries_the_head_id(api, feed):
+    body = (await api.get("/api/changes")).text
+
+    ids = event_ids(body)
+    assert len(ids) >= 2  # on connect and with each keep-alive
+    assert set(ids) == {feed.head}
+    assert "event:" not in body
+
+
+async def test_reconnect_after_a_quiet_stream_replays_the_gap(api, feed):
+    head = event_ids((await api.get("/api/changes")).text)[-1]
+    # published while the client is reconnecting
+    feed.publish("gap-1", {"op": "delete", "collection": "inquiries", "id": "a"})
+
+    body = (await api.get("/api/changes", headers={"Last-Event-ID": head})).text
+
+    assert "id: gap-1\nevent: delete\n" in body
+    assert "event: reset" not in body
+    assert event_ids(body)[-1] == "gap-1"
+
+
+async def test_reconnect_from_an_unknown_id_is_reset(api, feed):
+    body = (await api.get("/api/changes", headers={"Last-Event-ID": "forgotten"})).text
+
+    assert "event: reset" in body
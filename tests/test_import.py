@@ -0,0 +1,109 @@
+import json
+
+import pytest
+
+import server
+from tests.conftest import listing
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_ndjson_import_reports_errors_by_row(api, db):
+    body = "\n".join([
+        json.dumps(listing(title="First")),
+        "{not json",
+        json.dumps(listing(price="a lot")),
+        "",
+        json.dumps(["not", "an", "object"]),
+        json.dumps(listing(title="Last")),
+    ])
+
+    response = await api.post("/api/properties/import", params={"format": "ndjson"}, content=body)
+
+    assert response.status_code == 200, response.text
+    summary = response.json()
+    assert summary["received"] == 5
+    assert summary["inserted"] == 2
+    assert summary["failed"] == 3
+    assert [error["row"] for error in summary["errors"]] == [2, 3, 4]
+    assert "price" in summary["errors"][1]["error"]
+    assert summary["errors"][2]["error"] == "Row must be an object"
+    assert not summary["errors_truncated"]
+    assert sorted(p["title"] for p in await db.properties.find({}, {"title": 1}).to_list(None)) == ["First", "Last"]
+
+
+async def test_csv_import_splits_lists_and_flags_bad_rows(api, db):
+    body = "\n".join([
+        "title,location,price,property_type,bedrooms,bathrooms,area,description,features",
+        'Villa,"Rome, Italy",1000000,villa,4,3,300,"Two\nlines",Pool|Garden',
+        "Flat,Paris,,apartment,2,1,80,d,",
+        'Loft,Milan,500000,loft,1,1,60,"unterminated',
+    ])
+
+    response = await api.post("/api/properties/import", content=body, headers={"Content-Type": "text/csv"})
+
+    summary = response.json()
+    assert summary["received"] == 3
+    assert summary["inserted"] == 1
+    assert [error["row"] for error in summary["errors"]] == [2, 3]
+    assert "price" in summary["errors"][0]["error"]
+    assert "unterminated" in summary["errors"][1]["error"]
+    villa = await db.properties.find_one({"title": "Villa"})
+    assert villa["features"] == ["Pool", "Garden"]
+    assert villa["description"] == "Two\nlines"
+
+
+async def test_import_upserts_rows_with_external_id(api, db):
+    row = listing(external_id="feed-1", title="Original")
+    await api.post("/api/properties/import", content=json.dumps(row))
+    response = await api.post("/api/properties/import", content=json.dumps({**row, "title": "Renamed"}))
+
+    assert response.json()["updated"] == 1
+    stored = await db.properties.find({"external_id": "feed-1"}).to_list(None)
+    assert len(stored) == 1
+    assert stored[0]["title"] == "Renamed"
+    assert stored[0]["version"] == 2
+
+
+CSV_HEADER = "title,location,price,property_type,bedrooms,bathrooms,area,description"
+
+
+async def test_csv_quote_inside_an_unquoted_field_is_literal(api, db):
+    body = "\n".join([
+        CSV_HEADER,
+        'Loft with 10" beams,Milan,500000,loft,1,1,60,d',
+        *(f"Flat {n},Paris,400000,apartment,2,1,80,d" for n in range(3)),
+    ])
+
+    summary = (await api.post("/api/properties/import", params={"format": "csv"}, content=body)).json()
+
+    assert summary["inserted"] == 4
+    assert summary["errors"] == []
+    assert await db.properties.find_one({"title": 'Loft with 10" beams'})
+
+
+async def test_csv_runaway_quoted_field_fails_one_row(api, db, monkeypatch):
+    monkeypatch.setattr(server, "IMPORT_MAX_LINE", 200)
+    body = "\n".join([
+        CSV_HEADER,
+        'Villa,Rome,1000000,villa,4,3,300,"never closed',
+        *("filler text" for _ in range(30)),
+        *(f"Flat {n},Paris,400000,apartment,2,1,80,d" for n in range(3)),
+    ])
+
+    summary = (await api.post("/api/properties/import", params={"format": "csv"}, content=body)).json()
+
+    assert summary["errors"][0] == {"row": 1, "error": "Invalid CSV: quoted field runs past 200 characters"}
+    assert await db.properties.count_documents({"title": {"$regex": "^Flat"}}) == 3
+
+
+@pytest.mark.parametrize("line, quoted, expected", [
+    ('a,"b,c",d', False, False),
+    ('a,"b', False, True),
+    ('still open', True, True),
+    ('closed ""here"" now",x', True, False),
+    ('a "b,c', False, False),
+    ('"a""', False, True),
+])
+def test_csv_quote_open(line, quoted, expected):
+    assert server.csv_quote_open(line, quoted) is expected
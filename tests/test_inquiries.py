@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+from pymongo.errors import AutoReconnect
+
+import server
+
+pytestmark = pytest.mark.anyio
+
+
+def inquiry(**overrides) -> dict:
+    return {"name": "Ada", "email": "ada@example.com", "message": "Is it still available?", **overrides}
+
+
+async def test_retry_with_same_key_replays_the_response(api, db):
+    headers = {"Idempotency-Key": "key-1"}
+    first = await api.post("/api/inquiries", json=inquiry(), headers=headers)
+    second = await api.post("/api/inquiries", json=inquiry(), headers=headers)
+
+    assert first.status_code == second.status_code == 200
+    assert "Idempotent-Replayed" not in first.headers
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert second.json()["id"] == first.json()["id"]
+    assert await db.inquiries.count_documents({}) == 1
+
+
+async def test_key_reused_with_a_different_body_is_rejected(api, db):
+    headers = {"Idempotency-Key": "key-1"}
+    await api.post("/api/inquiries", json=inquiry(), headers=headers)
+    response = await api.post("/api/inquiries", json=inquiry(message="Something else"), headers=headers)
+
+    assert response.status_code == 422
+    assert await db.inquiries.count_documents({}) == 1
+
+
+async def test_per_email_limit_returns_429(api, monkeypatch):
+    monkeypatch.setitem(server.inquiry_limits, "email", server.parse_rate("2/3600"))
+
+    statuses = [(await api.post("/api/inquiries", json=inquiry())).status_code for _ in range(2)]
+    limited = await api.post("/api/inquiries", json=inquiry(email="ADA@example.com"))
+    other = await api.post("/api/inquiries", json=inquiry(email="grace@example.com"))
+
+    assert statuses == [200, 200]
+    assert limited.status_code == 429
+    assert int(limited.headers["Retry-After"]) > 0
+    assert other.status_code == 200
+
+
+async def test_replay_does_not_spend_the_rate_limit(api, monkeypatch):
+    monkeypatch.setitem(server.inquiry_limits, "email", server.parse_rate("1/3600"))
+    headers = {"Idempotency-Key": "key-1"}
+
+    first = await api.post("/api/inquiries", json=inquiry(), headers=headers)
+    replay = await api.post("/api/inquiries", json=inquiry(), headers=headers)
+
+    assert first.status_code == replay.status_code == 200
+    assert replay.headers["Idempotent-Replayed"] == "true"
+
+
+async def test_claim_releases_the_key_when_mongo_fails(db, monkeypatch):
+    store = server.IdempotencyStore(16, 60, shared=True)
+
+    async def unavailable(*args, **kwargs):
+        raise AutoReconnect("primary stepped down")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(type(db.idempotency_keys), "insert_one", unavailable)
+        with pytest.raises(AutoReconnect):
+            await store.claim("key-1", "fingerprint")
+    assert "key-1" not in store.pending
+
+    assert await store.claim("key-1", "fingerprint") is None
+
+
+async def test_cancelled_request_releases_its_key(api, db, monkeypatch):
+    started = asyncio.Event()
+
+    async def hang(inquiry_data):
+        started.set()
+        await asyncio.Event().wait()
+
+    headers = {"Idempotency-Key": "key-1"}
+    with monkeypatch.context() as patch:
+        patch.setattr(server, "save_inquiry", hang)
+        original = asyncio.ensure_future(api.post("/api/inquiries", json=inquiry(), headers=headers))
+        await started.wait()
+        duplicate = asyncio.ensure_future(api.post("/api/inquiries", json=inquiry(), headers=headers))
+        await asyncio.sleep(0.05)
+        original.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await original
+        assert (await duplicate).status_code == 409
+    assert "inquiries:key-1" not in server.idempotency_store.pending
+
+    retry = await api.post("/api/inquiries", json=inquiry(), headers=headers)
+    assert retry.status_code == 200
+    assert "Idempotent-Replayed" not in retry.headers
+
+
+async def test_forwarded_for_is_ignored_without_proxy_hops(api, monkeypatch):
+    monkeypatch.setitem(server.inquiry_limits, "ip", server.parse_rate("1/3600"))
+
+    first = await api.post("/api/inquiries", json=inquiry(), headers={"X-Forwarded-For": "203.0.113.1"})
+    spoofed = await api.post("/api/inquiries", json=inquiry(), headers={"X-Forwarded-For": "203.0.113.2"})
+
+    assert first.status_code == 200
+    assert spoofed.status_code == 429
+
+
+async def test_forwarded_for_names_the_client_behind_a_proxy(api, monkeypatch):
+    monkeypatch.setattr(server, "PROXY_HOPS", 1)
+    monkeypatch.setitem(server.inquiry_limits, "ip", server.parse_rate("1/3600"))
+
+    first = await api.post("/api/inquiries", json=inquiry(), headers={"X-Forwarded-For": "198.51.100.7, 203.0.113.1"})
+    other = await api.post("/api/inquiries", json=inquiry(), headers={"X-Forwarded-For": "203.0.113.2"})
+    again = await api.post("/api/inquiries", json=inquiry(), headers={"X-Forwarded-For": "203.0.113.1"})
+
+    assert [first.status_code, other.status_code, again.status_code] == [200, 200, 429]
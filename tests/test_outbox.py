@@ -0,0 +1,154 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from pymongo.errors import AutoReconnect
+
+import server
+
+pytestmark = pytest.mark.anyio
+
+
+class FlakySender(server.LogMailSender):
+    """LogMailSender whose first `failures` batches raise."""
+
+    def __init__(self, failures: int):
+        super().__init__()
+        self.failures = failures
+        self.keys = []
+
+    async def send_batch(self, messages, idempotency_key):
+        self.keys.append(idempotency_key)
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("provider unavailable")
+        await super().send_batch(messages, idempotency_key)
+
+
+def message(n: int = 1) -> dict:
+    return {"from": "a@example.com", "to": ["b@example.com"], "subject": f"Inquiry {n}", "html": "<p>hi</p>"}
+
+
+async def make_due(db):
+    await db.outbox.update_many({}, {"$set": {"next_attempt_at": datetime(1970, 1, 1, tzinfo=timezone.utc)}})
+
+
+async def test_enqueue_deduplicates_by_key(db):
+    sender = FlakySender(0)
+    worker = server.OutboxWorker(sender)
+    await worker.enqueue(message(1), "inquiry:1")
+    await worker.enqueue(message(2), "inquiry:1")
+
+    assert await db.outbox.count_documents({}) == 1
+    assert await worker.drain_once() == 1
+    assert [m["subject"] for m in sender.sent] == ["Inquiry 1"]
+    assert await worker.drain_once() == 0
+
+    await worker.enqueue(message(3), "inquiry:1")
+    assert await worker.drain_once() == 0
+    assert len(sender.sent) == 1
+
+
+async def test_failed_batch_is_retried_after_backoff(db):
+    sender = FlakySender(1)
+    worker = server.OutboxWorker(sender, base_backoff=60)
+    await worker.enqueue(message(), "inquiry:1")
+
+    before = datetime.now(timezone.utc)
+    assert await worker.drain_once() == 1
+    record = await db.outbox.find_one({"_id": "inquiry:1"})
+    assert record["status"] == "pending"
+    assert record["attempts"] == 1
+    assert record["last_error"] == "provider unavailable"
+    assert "claim" not in record
+    # mongomock, like a client without tz_aware, hands datetimes back naive
+    retry_at = record["next_attempt_at"].replace(tzinfo=timezone.utc)
+    assert before + timedelta(seconds=29) <= retry_at <= before + timedelta(seconds=61)
+
+    # not due yet
+    assert await worker.drain_once() == 0
+
+    await make_due(db)
+    assert await worker.drain_once() == 1
+    record = await db.outbox.find_one({"_id": "inquiry:1"})
+    assert record["status"] == "sent"
+    assert record["attempts"] == 2
+    assert len(sender.sent) == 1
+    # the retried batch reuses the provider idempotency key
+    assert sender.keys[0] == sender.keys[1]
+
+
+async def test_backoff_grows_and_is_capped():
+    worker = server.OutboxWorker(None, base_backoff=2, max_backoff=10)
+    assert 1 <= worker._backoff(1) <= 2
+    assert 4 <= worker._backoff(3) <= 8
+    assert 5 <= worker._backoff(20) <= 10
+
+
+async def test_gives_up_after_max_attempts(db):
+    sender = FlakySender(10)
+    worker = server.OutboxWorker(sender, max_attempts=3)
+    await worker.enqueue(message(), "inquiry:1")
+
+    for _ in range(3):
+        await make_due(db)
+        assert await worker.drain_once() == 1
+    record = await db.outbox.find_one({"_id": "inquiry:1"})
+    assert record["status"] == "failed"
+    assert record["attempts"] == 3
+
+    await make_due(db)
+    assert await worker.drain_once() == 0
+    assert sender.sent == []
+
+
+async def test_claims_at_most_one_batch(db):
+    sender = FlakySender(0)
+    worker = server.OutboxWorker(sender, batch_size=2)
+    for n in range(3):
+        await worker.enqueue(message(n), f"inquiry:{n}")
+
+    assert await worker.drain_once() == 2
+    assert await worker.drain_once() == 1
+    assert await worker.drain_once() == 0
+    assert await db.outbox.count_documents({"status": "sent"}) == 3
+
+
+def inquiry() -> server.InquiryCreate:
+    return server.InquiryCreate(name="Ada", email="ada@example.com", message="Is it still available?")
+
+
+async def test_inquiry_without_transaction_is_queued_and_unmarked(db):
+    saved = await server.save_inquiry(inquiry())
+
+    assert await db.outbox.count_documents({"_id": f"inquiry:{saved.id}"}) == 1
+    assert "notification_pending" not in await db.inquiries.find_one({"id": saved.id})
+
+
+async def test_failed_enqueue_is_picked_up_by_the_sweep(db, monkeypatch):
+    async def unavailable(*args, **kwargs):
+        raise AutoReconnect("primary stepped down")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(server.outbox_worker, "enqueue", unavailable)
+        saved = await server.save_inquiry(inquiry())
+    assert await db.outbox.count_documents({}) == 0
+    assert (await db.inquiries.find_one({"id": saved.id}))["notification_pending"] is True
+
+    assert await server.sweep_inquiry_notifications() == 1
+    record = await db.outbox.find_one({"_id": f"inquiry:{saved.id}"})
+    assert record["params"]["subject"] == "New Inquiry: General Contact"
+    assert "notification_pending" not in await db.inquiries.find_one({"id": saved.id})
+    assert await server.sweep_inquiry_notifications() == 0
+
+
+async def test_marker_is_hidden_from_inquiry_reads(api, db, monkeypatch):
+    async def unavailable(*args, **kwargs):
+        raise AutoReconnect("primary stepped down")
+
+    monkeypatch.setattr(server.outbox_worker, "enqueue", unavailable)
+    response = await api.post("/api/inquiries", json=inquiry().model_dump())
+    assert response.status_code == 200
+
+    listed = (await api.get("/api/inquiries")).json()
+    assert [item["id"] for item in listed] == [response.json()["id"]]
+    assert "notification_pending" not in listed[0]
@@ -0,0 +1,138 @@
+import pytest
+from fastapi import HTTPException
+
+import server
+from tests.conftest import listing
+
+pytestmark = pytest.mark.anyio
+
+
+async def create(api, **overrides) -> dict:
+    response = await api.post("/api/properties", json=listing(**overrides))
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+async def walk(api, **params) -> list:
+    """Follow X-Next-Cursor to the end and return every page."""
+    pages = []
+    cursor = None
+    while True:
+        response = await api.get("/api/properties", params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200, response.text
+        pages.append(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return pages
+
+
+@pytest.mark.parametrize("sort", ["price", "-price", "-created_at"])
+async def test_keyset_cursor_visits_every_listing_once(api, sort):
+    # repeated prices make the id tiebreaker matter
+    created = [await create(api, title=f"Listing {n}", price=100_000 * (n % 3 + 1)) for n in range(7)]
+
+    pages = await walk(api, sort=sort, limit=3)
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    seen = [prop["id"] for page in pages for prop in page]
+    assert sorted(seen) == sorted(prop["id"] for prop in created)
+    if sort.lstrip("-") == "price":
+        prices = [prop["price"] for page in pages for prop in page]
+        assert prices == sorted(prices, reverse=sort.startswith("-"))
+
+
+async def test_cursor_pages_exclude_listings_deleted_behind_them(api):
+    created = [await create(api, price=100_000 * (n + 1)) for n in range(4)]
+    first = await api.get("/api/properties", params={"sort": "price", "limit": 2})
+    await api.delete(f"/api/properties/{created[0]['id']}")
+
+    rest = await api.get("/api/properties", params={"sort": "price", "limit": 2, "cursor": first.headers["X-Next-Cursor"]})
+
+    assert [prop["id"] for prop in rest.json()] == [created[2]["id"], created[3]["id"]]
+
+
+async def test_invalid_cursor_is_rejected(api):
+    response = await api.get("/api/properties", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+async def test_update_with_stale_if_match_is_rejected(api):
+    prop = await create(api)
+    assert prop["version"] == 1
+
+    updated = await api.put(f"/api/properties/{prop['id']}", json={"title": "First"}, headers={"If-Match": '"1"'})
+    assert updated.status_code == 200
+    assert updated.json()["version"] == 2
+
+    stale = await api.put(f"/api/properties/{prop['id']}", json={"title": "Second"}, headers={"If-Match": '"1"'})
+    assert stale.status_code == 412
+    stored = await api.get(f"/api/properties/{prop['id']}")
+    assert stored.json()["title"] == "First"
+
+    weak = await api.put(f"/api/properties/{prop['id']}", json={"title": "Third"}, headers={"If-Match": 'W/"2"'})
+    assert weak.status_code == 200
+    assert weak.json()["version"] == 3
+
+
+async def test_if_match_on_missing_listing_is_not_found(api):
+    response = await api.put("/api/properties/missing", json={"title": "x"}, headers={"If-Match": '"1"'})
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize("value, expected", [(None, None), ("*", None), ("3", 3), ('"3"', 3), ('W/"3"', 3)])
+def test_parse_if_match(value, expected):
+    assert server.parse_if_match(value) == expected
+
+
+def test_parse_if_match_rejects_garbage():
+    with pytest.raises(HTTPException) as exc:
+        server.parse_if_match('"abc"')
+    assert exc.value.status_code == 400
+
+
+async def test_write_by_another_worker_drops_cached_listings(api, db, monkeypatch):
+    monkeypatch.setattr(server.collection_versions, "ttl", 0)
+    prop = await create(api, price=500_000)
+    first = await api.get("/api/properties")
+
+    # another process updates the listing and bumps the shared counter
+    await db.properties.update_one({"id": prop["id"]}, {"$set": {"price": 1}})
+    await db.counters.update_one({"_id": "properties"}, {"$inc": {"version": 1}})
+
+    second = await api.get("/api/properties")
+    assert second.headers["etag"] != first.headers["etag"]
+    assert second.json()[0]["price"] == 1
+
+
+
+async def test_write_by_another_worker_drops_cached_listing_detail(api, db, monkeypatch):
+    monkeypatch.setattr(server.collection_versions, "ttl", 0)
+    prop = await create(api, title="Villa")
+    first = await api.get(f"/api/properties/{prop['id']}")
+    assert first.headers["etag"] == '"1"'
+
+    await db.properties.update_one({"id": prop["id"]}, {"$set": {"title": "Changed"}, "$inc": {"version": 1}})
+    await db.counters.update_one({"_id": "properties"}, {"$inc": {"version": 1}})
+
+    second = await api.get(f"/api/properties/{prop['id']}")
+    assert second.headers["etag"] == '"2"'
+    assert second.json()["title"] == "Changed"
+    saved = await api.put(f"/api/properties/{prop['id']}", json={"title": "Mine"}, headers={"If-Match": second.headers["etag"]})
+    assert saved.status_code == 200
+
+@pytest.mark.parametrize("point, inside", [
+    ((30, 30), True),
+    ((73, 0), True),   # the great-circle top edge peaks near 73.9 north
+    ((75, 0), False),
+    ((71, 30), True),
+    ((72, 30), False),
+    ((30, 61), False),
+    ((-61, 30), True),
+])
+def test_in_bbox_follows_great_circle_edges(point, inside):
+    assert server.in_bbox(*point, (-60, -60, 60, 60)) is inside
+
+
+def test_bbox_must_span_less_than_half_the_globe():
+    with pytest.raises(HTTPException):
+        server.parse_bbox("-90,-10,90,10")